@@ -28,7 +28,14 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ("title", "description", "body_text_for_search")
     prepopulated_fields = {"slug": ("title",)}
     filter_horizontal = ("tags",)
-    readonly_fields = ("created_at", "updated_at", "body_text_for_search")
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "body_text_for_search",
+        "rating_count",
+        "rating_sum",
+        *Post.RATING_SCORE_FIELDS.values(),
+    )
 
     fieldsets = (
         (None, {"fields": ("title", "slug")}),
@@ -45,7 +52,14 @@ class PostAdmin(admin.ModelAdmin):
             "Служебная информация",
             {
                 "classes": ("collapse",),
-                "fields": ("created_at", "updated_at", "body_text_for_search"),
+                "fields": (
+                    "created_at",
+                    "updated_at",
+                    "body_text_for_search",
+                    "rating_count",
+                    "rating_sum",
+                    *Post.RATING_SCORE_FIELDS.values(),
+                ),
             },
         ),
     )
@@ -65,9 +79,10 @@ class PostAdmin(admin.ModelAdmin):
 class TagAdmin(admin.ModelAdmin):
     """Админка для тегов."""
 
-    list_display = ("name", "slug")
+    list_display = ("name", "slug", "published_posts_count")
     search_fields = ("name", "slug")
     prepopulated_fields = {"slug": ("name",)}
+    readonly_fields = ("published_posts_count",)
 
 
 @admin.register(Rating)
@@ -0,0 +1,356 @@
+"""
+Бенчмарк API блога: детерминированный набор данных и замеры эндпоинтов.
+
+seed_dataset() наполняет базу без сети и файлов (bulk_create пачками),
+run_benchmarks() прогоняет эндпоинты тестовым клиентом и считает
+перцентили задержки и число SQL-запросов, compare_with_baseline()
+сравнивает результат с сохранённой базовой линией. Запускается командой
+manage.py benchmark_api.
+"""
+
+import datetime
+import random
+import time
+
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from .models import Post, PostRanking, Rating, RelatedPost, ShortLink, Tag
+
+DEFAULT_DATASET = {"posts": 20000, "tags": 200, "ratings": 500000}
+DEFAULT_SEED = 42
+BATCH_SIZE = 2000
+# Сколько разных объектов каждого вида перебирают запросы бенчмарка
+SAMPLE_SIZE = 50
+
+PUBLISHED_SHARE = 0.95
+PERIOD_START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+PERIOD_MINUTES = 5 * 365 * 24 * 60
+WORDS = (
+    "ветер",
+    "море",
+    "город",
+    "дорога",
+    "кофе",
+    "книга",
+    "осень",
+    "музыка",
+    "камера",
+    "горы",
+    "python",
+    "django",
+    "поезд",
+    "остров",
+    "рецепт",
+    "сад",
+)
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def _sentence(rng, words=8):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _body(rng):
+    paragraphs = [
+        {
+            "type": "paragraph",
+            "content": [{"type": "text", "text": _sentence(rng, 20)}],
+        }
+        for _ in range(rng.randint(2, 6))
+    ]
+    heading = {
+        "type": "heading",
+        "attrs": {"level": 2},
+        "content": [{"type": "text", "text": _sentence(rng, 4)}],
+    }
+    return {"type": "doc", "content": [heading, *paragraphs]}
+
+
+def _log(stdout, message):
+    if stdout is not None:
+        stdout.write(message)
+
+
+@transaction.atomic
+def seed_dataset(
+    posts=DEFAULT_DATASET["posts"],
+    tags=DEFAULT_DATASET["tags"],
+    ratings=DEFAULT_DATASET["ratings"],
+    seed=DEFAULT_SEED,
+    stdout=None,
+):
+    """
+    Наполняет базу детерминированным набором данных для бенчмарка.
+
+    Одинаковые параметры дают одинаковые данные: все случайные величины
+    берутся из random.Random(seed), даты отсчитываются от фиксированного
+    момента. Ожидает пустые таблицы блога.
+    """
+    rng = random.Random(seed)
+
+    tag_objs = Tag.objects.bulk_create(
+        [Tag(name=f"Тег {i}", slug=f"bench-tag-{i}") for i in range(tags)],
+        batch_size=BATCH_SIZE,
+    )
+    _log(stdout, f"Тегов: {len(tag_objs)}")
+
+    post_ids = []
+    for start in range(0, posts, BATCH_SIZE):
+        batch = []
+        for i in range(start, min(start + BATCH_SIZE, posts)):
+            is_published = rng.random() < PUBLISHED_SHARE
+            published_at = PERIOD_START + datetime.timedelta(
+                minutes=rng.randrange(PERIOD_MINUTES)
+            )
+            batch.append(
+                Post(
+                    title=_sentence(rng, 5),
+                    slug=f"bench-post-{i}",
+                    description=_sentence(rng, 15),
+                    body=_body(rng),
+                    is_published=is_published,
+                    first_published_at=published_at if is_published else None,
+                )
+            )
+        post_ids.extend(post.pk for post in Post.objects.bulk_create(batch))
+    _log(stdout, f"Постов: {len(post_ids)}")
+
+    through = Post.tags.through
+    links = []
+    for post_id in post_ids:
+        for tag in rng.sample(tag_objs, min(rng.randint(1, 5), len(tag_objs))):
+            links.append(through(post_id=post_id, tag_id=tag.pk))
+    through.objects.bulk_create(links, batch_size=BATCH_SIZE)
+    # Связи вставлены в обход m2m_changed — счётчики тегов пересчитываем явно
+    Tag.objects.recalculate_published_posts_count()
+    RelatedPost.rebuild()
+
+    ShortLink.objects.bulk_create(
+        [
+            ShortLink(post_id=post_id, code=f"b{index:07d}")
+            for index, post_id in enumerate(post_ids)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    first_code = ShortLink.objects.filter(post=OuterRef("pk")).order_by("pk")
+    Post.objects.update(
+        short_code=Coalesce(Subquery(first_code.values("code")[:1]), Value(""))
+    )
+
+    # Пара (post, user_hash) уникальна: i-я оценка поста получает user_hash i
+    for start in range(0, ratings, BATCH_SIZE):
+        Rating.objects.bulk_create(
+            [
+                Rating(
+                    post_id=post_ids[index % len(post_ids)],
+                    user_hash=f"bench-user-{index // len(post_ids)}",
+                    score=rng.randint(1, 5),
+                )
+                for index in range(start, min(start + BATCH_SIZE, ratings))
+            ]
+        )
+    Post.objects.recalculate_ratings()
+    PostRanking.rebuild()
+    _log(stdout, f"Оценок: {ratings}")
+
+    return {"posts": posts, "tags": tags, "ratings": ratings, "seed": seed}
+
+
+def collect_samples(seed=DEFAULT_SEED):
+    """Детерминированная выборка объектов, по которым ходят запросы."""
+    rng = random.Random(seed)
+    published = list(
+        Post.objects.filter(is_published=True)
+        .order_by("pk")
+        .values_list("slug", "first_published_at")[: SAMPLE_SIZE * 20]
+    )
+    posts = rng.sample(published, min(SAMPLE_SIZE, len(published)))
+    tag_slugs = list(Tag.objects.order_by("pk").values_list("slug", flat=True))
+    codes = list(
+        ShortLink.objects.filter(post__is_published=True)
+        .order_by("pk")
+        .values_list("code", flat=True)[:SAMPLE_SIZE]
+    )
+    days = [timezone.localtime(published_at).date() for _, published_at in posts]
+    page_size = api_settings.PAGE_SIZE or 10
+    published_count = Post.objects.filter(is_published=True).count()
+    return {
+        # Страница из середины списка: показывает цену OFFSET
+        "middle_page": max(1, published_count // page_size // 2),
+        "slugs": [slug for slug, _ in posts],
+        "tags": rng.sample(tag_slugs, min(SAMPLE_SIZE, len(tag_slugs))),
+        "codes": codes,
+        "days": days,
+        "words": list(WORDS),
+    }
+
+
+def build_endpoints(samples):
+    """
+    Эндпоинты бенчмарка: имя -> (список URL, только для PostgreSQL).
+
+    Запросы перебирают URL по кругу, чтобы не мерить один и тот же объект.
+    """
+    days = samples["days"]
+    tags = samples["tags"]
+    return {
+        "posts_list": (["/api/v1/posts/"], False),
+        "posts_list_middle_page": (
+            [f"/api/v1/posts/?page={samples['middle_page']}"],
+            False,
+        ),
+        "posts_list_cursor": (["/api/v1/posts/?pagination=cursor"], False),
+        "posts_detail": ([f"/api/v1/posts/{s}/" for s in samples["slugs"]], False),
+        "batch_posts": (
+            [f"/api/v1/batch/posts/?slugs={','.join(samples['slugs'])}"],
+            False,
+        ),
+        "batch_ratings": (
+            [f"/api/v1/batch/ratings/?slugs={','.join(samples['slugs'])}"],
+            False,
+        ),
+        "rankings_top": (["/api/v1/rankings/top/"], False),
+        "posts_related": (
+            [f"/api/v1/posts/{s}/related/" for s in samples["slugs"]],
+            False,
+        ),
+        "posts_search": (
+            [f"/api/v1/posts/?search={word}" for word in samples["words"]],
+            True,
+        ),
+        "posts_tags_all": (
+            [f"/api/v1/posts/?tags={a},{b}" for a, b in zip(tags, tags[1:])],
+            False,
+        ),
+        "posts_tags_any": (
+            [f"/api/v1/posts/?tags={a},{b}&mode=any" for a, b in zip(tags, tags[1:])],
+            False,
+        ),
+        "tags_list": (["/api/v1/tags/"], False),
+        "tag_posts": ([f"/api/v1/tags/{s}/posts/" for s in samples["tags"]], False),
+        "archive_years": (["/api/v1/archive/summary/"], False),
+        "archive_months": (
+            sorted({f"/api/v1/archive/{d.year}/summary/" for d in days}),
+            False,
+        ),
+        "archive_days": (
+            sorted({f"/api/v1/archive/{d.year}/{d.month}/summary/" for d in days}),
+            False,
+        ),
+        "archive_day_posts": (
+            [f"/api/v1/archive/{d.year}/{d.month}/{d.day}/" for d in days],
+            False,
+        ),
+        "archive_tree": (["/api/v1/archive/tree/"], False),
+        "shortlink_redirect": ([f"/s/{code}/" for code in samples["codes"]], False),
+        "sitemap": (["/api/v1/sitemap/posts/"], False),
+    }
+
+
+def percentile(values, fraction):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(client, urls, iterations, warmup):
+    """Замер одного эндпоинта: перцентили в мс и максимум SQL-запросов."""
+    for index in range(warmup):
+        client.get(urls[index % len(urls)])
+
+    timings = []
+    max_queries = 0
+    for index in range(iterations):
+        url = urls[index % len(urls)]
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f"{url} ответил {response.status_code}")
+        timings.append(elapsed * 1000)
+        max_queries = max(max_queries, len(queries))
+
+    return {
+        "p50_ms": round(percentile(timings, 0.50), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+        "p99_ms": round(percentile(timings, 0.99), 2),
+        "queries": max_queries,
+    }
+
+
+def run_benchmarks(
+    iterations=30, warmup=3, seed=DEFAULT_SEED, use_cache=False, stdout=None
+):
+    """
+    Прогоняет все эндпоинты и возвращает отчёт.
+
+    По умолчанию кэш ответов отключён: меряется стоимость самих запросов.
+    Эндпоинты, которым нужен PostgreSQL, на других СУБД пропускаются.
+    """
+    vendor = connection.vendor
+    endpoints = build_endpoints(collect_samples(seed))
+    client = Client()
+    results = {}
+    with override_settings(**({} if use_cache else {"CACHES": NO_CACHE})):
+        for name, (urls, postgres_only) in endpoints.items():
+            if postgres_only and vendor != "postgresql":
+                _log(stdout, f"{name}: пропущен (нужен PostgreSQL)")
+                continue
+            if not urls:
+                continue
+            results[name] = measure(client, urls, iterations, warmup)
+            _log(stdout, f"{name}: {results[name]}")
+    return {
+        "meta": {"vendor": vendor, "iterations": iterations, "cache": use_cache},
+        "endpoints": results,
+    }
+
+
+def compare_with_baseline(report, baseline, threshold=0.25, min_delta_ms=2.0):
+    """
+    Список регрессий относительно базовой линии.
+
+    Число запросов детерминировано и сравнивается строго. Задержка p95
+    считается регрессией, если выросла больше чем на threshold и больше
+    чем на min_delta_ms (шумовой порог); сравнивается только при совпадении
+    СУБД и набора данных, иначе цифры несопоставимы. Эндпоинт без записи
+    в базовой линии тоже считается ошибкой: новый эндпоинт должен прийти
+    вместе со своей базовой линией, иначе он не проверяется вовсе.
+    """
+    regressions = []
+    same_environment = all(
+        report["meta"].get(key) == baseline.get("meta", {}).get(key)
+        for key in ("vendor", "dataset", "cache")
+    )
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            regressions.append(
+                f"{name}: нет в базовой линии (обновите её с --update-baseline)"
+            )
+            continue
+        if current["queries"] > previous["queries"]:
+            regressions.append(
+                f"{name}: запросов {current['queries']} > {previous['queries']}"
+            )
+        if not same_environment:
+            continue
+        limit = max(
+            previous["p95_ms"] * (1 + threshold), previous["p95_ms"] + min_delta_ms
+        )
+        if current["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']} мс > {previous['p95_ms']} мс"
+                f" (+{threshold:.0%})"
+            )
+    return regressions
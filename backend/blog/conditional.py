@@ -0,0 +1,144 @@
+"""Условные GET-запросы (ETag / Last-Modified / 304) для API блога."""
+
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Tag
+
+
+def _latest(*moments):
+    """Максимальная из дат, игнорируя None."""
+    moments = [moment for moment in moments if moment is not None]
+    return max(moments) if moments else None
+
+
+def post_list_fingerprint(queryset):
+    """
+    Дешёвый отпечаток отфильтрованного списка постов.
+
+    Один агрегатный запрос по постам (COUNT/MAX) и один по тегам: любое
+    изменение поста, его оценок, состава списка или переименование тега
+    меняет отпечаток. Last-Modified у списков нет: когда самый свежий пост
+    выбывает из списка (снят с публикации, удалён), MAX(updated_at)
+    уменьшается, и If-Modified-Since отдал бы 304 на устаревший список.
+    Изменение состава замечает только ETag — в нём есть COUNT.
+    """
+    stats = queryset.order_by().aggregate(
+        total=Count("id"),
+        last_updated=Max("updated_at"),
+        last_rated=Max("rating_updated_at"),
+    )
+    last_tag = Tag.objects.aggregate(last=Max("updated_at"))["last"]
+    parts = (stats["total"], stats["last_updated"], stats["last_rated"], last_tag)
+    return parts, None
+
+
+def post_object_fingerprint(queryset):
+    """Отпечаток одного поста: дата правки, счётчики оценок и последняя правка тегов."""
+    tags_changed = (
+        Tag.objects.filter(posts=OuterRef("pk"))
+        .order_by("-updated_at")
+        .values("updated_at")[:1]
+    )
+    row = (
+        queryset.order_by()
+        .annotate(tags_changed=Subquery(tags_changed))
+        .values(
+            "pk",
+            "updated_at",
+            "rating_count",
+            "rating_sum",
+            "rating_updated_at",
+            "tags_changed",
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    parts = tuple(row.values())
+    return parts, _latest(
+        row["updated_at"], row["rating_updated_at"], row["tags_changed"]
+    )
+
+
+def tag_list_fingerprint(queryset):
+    """
+    Отпечаток списка тегов.
+
+    Изменение счётчика published_posts_count обновляет и updated_at тега,
+    поэтому достаточно агрегата по самим тегам. Как и у списка постов,
+    только ETag: после удаления тега MAX(updated_at) может уменьшиться.
+    """
+    stats = queryset.order_by().aggregate(
+        total=Count("id"), last_updated=Max("updated_at")
+    )
+    return (stats["total"], stats["last_updated"]), None
+
+
+def sitemap_fingerprint(queryset):
+    """
+    Отпечаток данных sitemap: число постов и последняя правка.
+
+    Как и у остальных списков, только ETag: после снятия с публикации
+    самого свежего поста MAX(updated_at) уменьшается.
+    """
+    stats = queryset.order_by().aggregate(
+        total=Count("id"), last_updated=Max("updated_at")
+    )
+    return (stats["total"], stats["last_updated"]), None
+
+
+def build_validators(request, fingerprint):
+    """(ETag, Last-Modified в секундах или None) по отпечатку данных."""
+    parts, last_modified = fingerprint
+    # Путь с query string различает страницы, фильтры и режимы пагинации
+    source = "|".join(str(part) for part in (request.get_full_path(), *parts))
+    etag = quote_etag(hashlib.md5(source.encode("utf-8")).hexdigest())
+    timestamp = (
+        timegm(last_modified.utctimetuple()) if last_modified is not None else None
+    )
+    return etag, timestamp
+
+
+def not_modified_response(request, validators):
+    """Готовый ответ 304 (или 412), если валидаторы клиента совпали, иначе None."""
+    etag, timestamp = validators
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, validators):
+    """Проставляет ETag и Last-Modified, если представление их ещё не задало."""
+    etag, timestamp = validators
+    if not response.has_header("ETag"):
+        response["ETag"] = etag
+    if timestamp is not None and not response.has_header("Last-Modified"):
+        response["Last-Modified"] = http_date(timestamp)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Примесь для ViewSet-ов: отвечает 304 до запуска сериализатора.
+
+    Представление вычисляет отпечаток (части ETag и дату Last-Modified)
+    и вызывает check_not_modified(); при совпадении валидаторов клиента
+    возвращается готовый ответ 304, иначе None. Валидаторы также
+    проставляются в заголовки обычного ответа 200.
+    """
+
+    def check_not_modified(self, request, fingerprint):
+        if fingerprint is None or request.method not in ("GET", "HEAD"):
+            return None
+        self._conditional_validators = build_validators(request, fingerprint)
+        return not_modified_response(request, self._conditional_validators)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "_conditional_validators", None)
+        if validators and response.status_code in (200, 304):
+            set_validators(response, validators)
+        return response
@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+
+from blog.benchmark import (
+    DEFAULT_DATASET,
+    DEFAULT_SEED,
+    compare_with_baseline,
+    run_benchmarks,
+    seed_dataset,
+)
+from blog.models import Post
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк API блога на детерминированном наборе данных во временной "
+        "тестовой базе: перцентили задержки и число SQL-запросов по эндпоинтам, "
+        "сравнение с базовой линией."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=DEFAULT_DATASET["posts"])
+        parser.add_argument("--tags", type=int, default=DEFAULT_DATASET["tags"])
+        parser.add_argument("--ratings", type=int, default=DEFAULT_DATASET["ratings"])
+        parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=30,
+            help="Количество замеров на эндпоинт. По умолчанию 30.",
+        )
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument(
+            "--baseline",
+            default=str(DEFAULT_BASELINE),
+            help="Файл базовой линии (JSON).",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Допустимый относительный рост p95. По умолчанию 0.25 (25%%).",
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=2.0,
+            help="Рост p95 меньше этого порога считается шумом.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Записать результат как новую базовую линию вместо сравнения.",
+        )
+        parser.add_argument(
+            "--with-cache",
+            action="store_true",
+            help="Мерить с включённым кэшем ответов.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Не удалять тестовую базу; заполненная база используется повторно.",
+        )
+        parser.add_argument("--output", help="Сохранить отчёт в JSON-файл.")
+
+    def handle(self, *args, **options):
+        dataset = {
+            "posts": options["posts"],
+            "tags": options["tags"],
+            "ratings": options["ratings"],
+            "seed": options["seed"],
+        }
+
+        # Данные бенчмарка живут во временной тестовой базе, рабочая не трогается
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            if Post.objects.exists():
+                self.stdout.write("Используем ранее заполненную тестовую базу.")
+            else:
+                self.stdout.write("Заполняем тестовую базу...")
+                seed_dataset(stdout=self.stdout, **dataset)
+            report = run_benchmarks(
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                seed=options["seed"],
+                use_cache=options["with_cache"],
+                stdout=self.stdout,
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+        report["meta"]["dataset"] = dataset
+
+        content = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+        if options["output"]:
+            Path(options["output"]).write_text(content + "\n", encoding="utf-8")
+
+        baseline_path = Path(options["baseline"])
+        if options["update_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(content + "\n", encoding="utf-8")
+            self.stdout.write(
+                self.style.SUCCESS(f"Базовая линия записана: {baseline_path}")
+            )
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(
+                self.style.WARNING(f"Базовая линия не найдена: {baseline_path}")
+            )
+            return
+
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("vendor") != report["meta"]["vendor"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Базовая линия снята на другой СУБД: сравнивается только "
+                    "число запросов."
+                )
+            )
+        regressions = compare_with_baseline(
+            report,
+            baseline,
+            threshold=options["threshold"],
+            min_delta_ms=options["min_delta_ms"],
+        )
+        if regressions:
+            raise CommandError(
+                "Регрессии производительности:\n" + "\n".join(regressions)
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Регрессий относительно базовой линии нет.")
+        )
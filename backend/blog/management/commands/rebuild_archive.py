@@ -0,0 +1,15 @@
+from blog.models import ArchiveBucket
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает календарь архива (ArchiveBucket) по опубликованным постам. "
+        "Нужен после массовых изменений постов в обход Post.save()."
+    )
+
+    def handle(self, *args, **options):
+        days = ArchiveBucket.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Календарь архива пересобран, дней: {days}")
+        )
@@ -0,0 +1,14 @@
+from blog.models import PostRanking
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Полностью пересобирает рейтинг «лучших» постов (PostRanking) по "
+        "денормализованным счётчикам оценок. Нужен после правок счётчиков в обход "
+        "модели и после смены настроек TOP_RATED_*."
+    )
+
+    def handle(self, *args, **options):
+        ranked = PostRanking.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Постов в рейтинге: {ranked}"))
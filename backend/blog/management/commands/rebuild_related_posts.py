@@ -0,0 +1,16 @@
+from blog.models import RelatedPost
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Полностью пересобирает таблицу похожих постов (RelatedPost) с текущими "
+        "IDF-весами тегов. Нужен после массовых изменений постов и тегов в обход "
+        "сигналов и для выравнивания накопившегося дрейфа весов."
+    )
+
+    def handle(self, *args, **options):
+        posts = RelatedPost.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Похожие посты пересобраны для постов: {posts}")
+        )
@@ -0,0 +1,33 @@
+from blog.models import Post, PostRanking
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает денормализованные счётчики рейтинга постов (rating_count, "
+        "rating_sum, rating_1_count–rating_5_count) и места постов в рейтинге "
+        "«лучших» (PostRanking)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--slug",
+            action="append",
+            dest="slugs",
+            help="Пересчитать только указанные посты (можно передать несколько раз).",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options["slugs"]:
+            queryset = queryset.filter(slug__in=options["slugs"])
+
+        updated = queryset.recalculate_ratings()
+        # Места в рейтинге считаются из тех же счётчиков
+        if options["slugs"]:
+            PostRanking.refresh_for_posts(list(queryset.values_list("pk", flat=True)))
+        else:
+            PostRanking.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Счётчики рейтинга пересчитаны для постов: {updated}")
+        )
@@ -0,0 +1,15 @@
+from blog.models import Tag
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает денормализованный счётчик опубликованных постов у тегов "
+        "(published_posts_count)."
+    )
+
+    def handle(self, *args, **options):
+        updated = Tag.objects.recalculate_published_posts_count()
+        self.stdout.write(
+            self.style.SUCCESS(f"Счётчики постов пересчитаны для тегов: {updated}")
+        )
@@ -0,0 +1,47 @@
+from blog.models import Post
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Пересобирает поисковый индекс постов (колонку search_vector)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество постов, обновляемых одним UPDATE. По умолчанию 1000.",
+        )
+        parser.add_argument(
+            "--refresh-text",
+            action="store_true",
+            help="Предварительно заново извлечь body_text_for_search из body.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(
+                self.style.WARNING(
+                    "Полнотекстовый поиск доступен только на PostgreSQL. Пропускаем."
+                )
+            )
+            return
+
+        batch_size = options["batch_size"]
+        pks = list(Post.objects.order_by("pk").values_list("pk", flat=True))
+
+        if options["refresh_text"]:
+            for post in Post.objects.only("id", "body").iterator(chunk_size=batch_size):
+                Post.objects.filter(pk=post.pk).update(
+                    body_text_for_search=post.extract_text_from_tiptap_json(post.body)
+                )
+
+        updated = 0
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start : start + batch_size]
+            updated += Post.objects.filter(pk__in=batch).update_search_vector()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Поисковый индекс обновлён для постов: {updated}")
+        )
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    """Заполняет счётчики рейтинга для уже существующих постов."""
+    Post = apps.get_model("blog", "Post")
+    Rating = apps.get_model("blog", "Rating")
+    ratings = Rating.objects.filter(post=OuterRef("pk")).values("post")
+    Post.objects.update(
+        rating_count=Coalesce(
+            Subquery(
+                ratings.annotate(total=Count("id")).values("total"),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+        rating_sum=Coalesce(
+            Subquery(
+                ratings.annotate(total=Sum("score")).values("total"),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0014_alter_post_image_alter_post_slug_alter_post_title"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="rating_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество оценок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="rating_sum",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Сумма оценок"
+            ),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
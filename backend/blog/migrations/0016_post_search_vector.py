@@ -0,0 +1,70 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_VECTOR_INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=["search_vector"], name="blog_post_search_vector_gin"
+)
+
+
+def add_search_vector_index(apps, schema_editor):
+    """GIN-индекс поддерживается только PostgreSQL (тесты работают на SQLite)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Post = apps.get_model("blog", "Post")
+    schema_editor.add_index(Post, SEARCH_VECTOR_INDEX)
+
+
+def remove_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Post = apps.get_model("blog", "Post")
+    schema_editor.remove_index(Post, SEARCH_VECTOR_INDEX)
+
+
+def populate_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from django.conf import settings
+
+    config = getattr(settings, "SEARCH_LANGUAGE", "russian")
+    Post = apps.get_model("blog", "Post")
+    Post.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config=config)
+            + SearchVector("slug", weight="B", config=config)
+            + SearchVector("description", weight="C", config=config)
+            + SearchVector("body_text_for_search", weight="D", config=config)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0015_post_rating_count_post_rating_sum"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="post", index=SEARCH_VECTOR_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    add_search_vector_index, remove_search_vector_index
+                ),
+            ],
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
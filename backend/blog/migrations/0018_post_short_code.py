@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_short_code(apps, schema_editor):
+    """Заполняет short_code кодом самой ранней короткой ссылки поста."""
+    Post = apps.get_model("blog", "Post")
+    ShortLink = apps.get_model("blog", "ShortLink")
+    first_code = (
+        ShortLink.objects.filter(post=OuterRef("pk")).order_by("pk").values("code")[:1]
+    )
+    Post.objects.update(short_code=Coalesce(Subquery(first_code), Value("")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0017_post_rating_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="short_code",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=8,
+                verbose_name="Код короткой ссылки",
+            ),
+        ),
+        migrations.RunPython(backfill_short_code, migrations.RunPython.noop),
+    ]
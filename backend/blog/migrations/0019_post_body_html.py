@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from blog.tiptap import render_tiptap_html
+from django.db import migrations, models
+
+
+def backfill_body_html(apps, schema_editor):
+    """Рендерит body_html для уже существующих постов."""
+    Post = apps.get_model("blog", "Post")
+    posts = Post.objects.only("pk", "body").order_by("pk")
+    batch = []
+    for post in posts.iterator(chunk_size=500):
+        post.body_html = render_tiptap_html(post.body)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ["body_html"])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ["body_html"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0018_post_short_code"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="body_html",
+            field=models.TextField(
+                blank=True, default="", editable=False, verbose_name="HTML контента"
+            ),
+        ),
+        migrations.RunPython(backfill_body_html, migrations.RunPython.noop),
+    ]
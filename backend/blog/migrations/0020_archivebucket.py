@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_archive(apps, schema_editor):
+    """Строит календарь архива по уже опубликованным постам."""
+    Post = apps.get_model("blog", "Post")
+    ArchiveBucket = apps.get_model("blog", "ArchiveBucket")
+    zone = timezone.get_default_timezone()
+    dates = Counter(
+        timezone.localtime(published_at, zone).date()
+        for published_at in Post.objects.filter(
+            is_published=True, first_published_at__isnull=False
+        )
+        .values_list("first_published_at", flat=True)
+        .iterator(chunk_size=2000)
+    )
+    ArchiveBucket.objects.bulk_create(
+        [
+            ArchiveBucket(year=date.year, month=date.month, day=date.day, count=count)
+            for date, count in sorted(dates.items())
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0019_post_body_html"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchiveBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField(verbose_name="Год")),
+                ("month", models.PositiveSmallIntegerField(verbose_name="Месяц")),
+                ("day", models.PositiveSmallIntegerField(verbose_name="День")),
+                (
+                    "count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Количество постов"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ячейка архива",
+                "verbose_name_plural": "Ячейки архива",
+                "ordering": ["year", "month", "day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("year", "month", "day"),
+                        name="blog_archivebucket_unique_day",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_archive, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0020_archivebucket"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["is_published", "first_published_at"],
+                name="blog_post_published_date_idx",
+            ),
+        ),
+    ]
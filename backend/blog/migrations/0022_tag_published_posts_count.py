@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_published_posts_count(apps, schema_editor):
+    """Заполняет счётчик опубликованных постов у существующих тегов."""
+    Tag = apps.get_model("blog", "Tag")
+    Post = apps.get_model("blog", "Post")
+    through = Post.tags.through
+    published = (
+        through.objects.filter(tag=OuterRef("pk"), post__is_published=True)
+        .values("tag")
+        .annotate(total=Count("post"))
+        .values("total")
+    )
+    Tag.objects.update(
+        published_posts_count=Coalesce(
+            Subquery(published, output_field=IntegerField()), 0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0021_post_blog_post_published_date_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tag",
+            name="published_posts_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Опубликованных постов"
+            ),
+        ),
+        migrations.RunPython(backfill_published_posts_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+import django.db.models.deletion
+from blog.related import (
+    group_members,
+    group_tags,
+    score_candidates,
+    tag_weight,
+    top_related,
+)
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_related_posts(apps, schema_editor):
+    """Строит top-K похожих постов по уже существующим связям с тегами."""
+    Post = apps.get_model("blog", "Post")
+    Tag = apps.get_model("blog", "Tag")
+    RelatedPost = apps.get_model("blog", "RelatedPost")
+    limit = getattr(settings, "RELATED_POSTS_LIMIT", 6)
+    links = list(
+        Post.tags.through.objects.filter(post__is_published=True).values_list(
+            "post_id", "tag_id"
+        )
+    )
+    total = Post.objects.filter(is_published=True).count()
+    weights = {
+        tag_id: tag_weight(total, tag_posts)
+        for tag_id, tag_posts in Tag.objects.values_list("pk", "published_posts_count")
+    }
+    members = group_members(links)
+    RelatedPost.objects.bulk_create(
+        [
+            RelatedPost(post_id=post_id, related_id=related_id, score=score)
+            for post_id, tag_ids in group_tags(links).items()
+            for related_id, score in top_related(
+                score_candidates(post_id, tag_ids, members, weights), limit
+            )
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0022_tag_published_posts_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedPost",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Вес")),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_entries",
+                        to="blog.post",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_to",
+                        to="blog.post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Похожий пост",
+                "verbose_name_plural": "Похожие посты",
+                "ordering": ["post", "-score", "-related"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("post", "related"), name="blog_relatedpost_unique_pair"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_related_posts, migrations.RunPython.noop),
+    ]
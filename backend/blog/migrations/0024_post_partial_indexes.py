@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0023_relatedpost"),
+    ]
+
+    operations = [
+        # Дублирует индекс ограничения UNIQUE на slug
+        migrations.RemoveIndex(
+            model_name="post",
+            name="blog_post_slug_cdb902_idx",
+        ),
+        # Заменяется частичным индексом опубликованных постов
+        migrations.RemoveIndex(
+            model_name="post",
+            name="blog_post_published_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-first_published_at", "-id"],
+                name="blog_post_published_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", True), ("sitemap_include", True)),
+                fields=["-first_published_at", "-id"],
+                name="blog_post_sitemap_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", False)),
+                fields=["-first_published_at", "-id"],
+                name="blog_post_drafts_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_score_counts(apps, schema_editor):
+    """Заполняет распределение оценок у существующих постов."""
+    Post = apps.get_model("blog", "Post")
+    Rating = apps.get_model("blog", "Rating")
+    ratings = Rating.objects.filter(post=OuterRef("pk")).values("post")
+    Post.objects.update(
+        **{
+            f"rating_{score}_count": Coalesce(
+                Subquery(
+                    ratings.filter(score=score)
+                    .annotate(total=Count("id"))
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+            for score in range(1, 6)
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0024_post_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Оценок «1»"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Оценок «2»"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Оценок «3»"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Оценок «4»"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Оценок «5»"
+            ),
+        ),
+        migrations.RunPython(backfill_rating_score_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+import django.db.models.deletion
+from blog.ranking import bayesian_average, is_ranked
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_post_rankings(apps, schema_editor):
+    """Строит рейтинг «лучших» постов по уже накопленным счётчикам."""
+    Post = apps.get_model("blog", "Post")
+    PostRanking = apps.get_model("blog", "PostRanking")
+    prior_mean = getattr(settings, "TOP_RATED_PRIOR_MEAN", 3.0)
+    prior_weight = getattr(settings, "TOP_RATED_PRIOR_WEIGHT", 5)
+    min_votes = getattr(settings, "TOP_RATED_MIN_VOTES", 1)
+    PostRanking.objects.bulk_create(
+        [
+            PostRanking(
+                post_id=post_id,
+                score=bayesian_average(
+                    rating_sum, rating_count, prior_mean, prior_weight
+                ),
+                rating_count=rating_count,
+            )
+            for post_id, is_published, rating_count, rating_sum in Post.objects.filter(
+                is_published=True, rating_count__gt=0
+            ).values_list("pk", "is_published", "rating_count", "rating_sum")
+            if is_ranked(is_published, rating_count, min_votes)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0025_post_rating_score_counts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostRanking",
+            fields=[
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="ranking",
+                        serialize=False,
+                        to="blog.post",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Байесовская оценка")),
+                (
+                    "rating_count",
+                    models.PositiveIntegerField(verbose_name="Количество оценок"),
+                ),
+            ],
+            options={
+                "verbose_name": "Место в рейтинге",
+                "verbose_name_plural": "Рейтинг постов",
+                "ordering": ["-score", "-rating_count", "-post"],
+                "indexes": [
+                    models.Index(
+                        fields=["-score", "-rating_count", "-post"],
+                        name="blog_postranking_top_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_post_rankings, migrations.RunPython.noop),
+    ]
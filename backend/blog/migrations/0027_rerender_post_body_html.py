@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from blog.tiptap import render_tiptap_html
+from django.db import migrations
+
+
+def rerender_body_html(apps, schema_editor):
+    """Перерисовывает body_html: старый фильтр пропускал "java\\tscript:"."""
+    Post = apps.get_model("blog", "Post")
+    posts = Post.objects.only("pk", "body").order_by("pk")
+    batch = []
+    for post in posts.iterator(chunk_size=500):
+        post.body_html = render_tiptap_html(post.body)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ["body_html"])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ["body_html"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0026_postranking"),
+    ]
+
+    operations = [
+        migrations.RunPython(rerender_body_html, migrations.RunPython.noop),
+    ]
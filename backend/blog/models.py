@@ -1,16 +1,33 @@
+import datetime
 import json
 import logging
 import os
 import secrets
 import string
+from collections import Counter
 
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import connections, models, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 
+from .ranking import bayesian_average, is_ranked
+from .related import (
+    group_members,
+    group_tags,
+    score_candidates,
+    tag_weight,
+    top_related,
+)
+from .tiptap import render_tiptap_html
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,11 +63,38 @@ def validate_webp(value):
     #         raise ValidationError('Неверный MIME тип. Разрешены только WEBP изображения (image/webp).')
 
 
+class TagQuerySet(models.QuerySet):
+    """QuerySet тегов с пересчётом денормализованного счётчика постов."""
+
+    def recalculate_published_posts_count(self):
+        """Пересчитывает published_posts_count одним UPDATE по таблице связей."""
+        through = Tag.posts.through
+        published = (
+            through.objects.filter(tag=OuterRef("pk"), post__is_published=True)
+            .values("tag")
+            .annotate(total=Count("post"))
+            .values("total")
+        )
+        return self.update(
+            published_posts_count=Coalesce(
+                Subquery(published, output_field=IntegerField()), 0
+            ),
+            updated_at=timezone.now(),
+        )
+
+
 class Tag(AbstractBaseModel):
     """Модель тега для классификации постов."""
 
     name = models.CharField(max_length=64, unique=True)
     slug = models.SlugField(unique=True)
+    # Число опубликованных постов с тегом; поддерживается сигналами m2m_changed
+    # и сменой публикации поста (см. Post.save и adjust_published_posts_count)
+    published_posts_count = models.PositiveIntegerField(
+        "Опубликованных постов", default=0, editable=False
+    )
+
+    objects = TagQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Тег"
@@ -59,15 +103,196 @@ class Tag(AbstractBaseModel):
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def adjust_published_posts_count(deltas, using=None):
+        """
+        Сдвигает счётчики тегов: deltas — {tag_id: delta}.
+
+        updated_at тоже обновляется, чтобы изменился ETag списка тегов.
+        """
+        by_delta = {}
+        for tag_id, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(tag_id)
+        for delta, tag_ids in by_delta.items():
+            Tag.objects.db_manager(using).filter(pk__in=tag_ids).update(
+                published_posts_count=shifted("published_posts_count", delta),
+                updated_at=timezone.now(),
+            )
+
+
+def shifted(field, delta):
+    """F(field) + delta; уменьшение не опускает счётчик ниже нуля.
+
+    Счётчик мог разойтись с данными после update()/bulk_update в обход
+    сигналов: без нижней границы UPDATE упал бы на ограничении
+    PositiveIntegerField, и, например, пост нельзя было бы удалить.
+    """
+    if delta < 0:
+        return Greatest(F(field) + delta, 0)
+    return F(field) + delta
+
 
 def get_default_tiptap_json_string():
     """Возвращает пустую структуру Tiptap JSON по умолчанию в виде СТРОКИ."""
     return json.dumps({"type": "doc", "content": []})
 
 
+def build_post_search_vector():
+    """Взвешенный tsvector поста: заголовок важнее описания и текста."""
+    config = getattr(settings, "SEARCH_LANGUAGE", "russian")
+    return (
+        SearchVector("title", weight="A", config=config)
+        + SearchVector("slug", weight="B", config=config)
+        + SearchVector("description", weight="C", config=config)
+        + SearchVector("body_text_for_search", weight="D", config=config)
+    )
+
+
+def archive_period(year, month=None, day=None):
+    """
+    Полуоткрытый интервал [start, end) года, месяца или дня архива.
+
+    Границы считаются в TIME_ZONE проекта (Europe/Moscow), как и дни
+    ArchiveBucket. Сравнение first_published_at с готовыми границами,
+    в отличие от __date/__year, не оборачивает колонку в функцию и
+    использует индекс. Некорректная дата вызывает ValueError.
+    """
+    zone = timezone.get_default_timezone()
+    if day is not None:
+        start = datetime.date(year, month, day)
+        end = start + datetime.timedelta(days=1)
+    elif month is not None:
+        start = datetime.date(year, month, 1)
+        end = datetime.date(year + month // 12, month % 12 + 1, 1)
+    else:
+        start = datetime.date(year, 1, 1)
+        end = datetime.date(year + 1, 1, 1)
+    return (
+        datetime.datetime.combine(start, datetime.time.min, tzinfo=zone),
+        datetime.datetime.combine(end, datetime.time.min, tzinfo=zone),
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    """QuerySet постов с операциями массового пересчёта денормализованных полей."""
+
+    def published_in(self, year, month=None, day=None):
+        """Опубликованные посты за год, месяц или день архива."""
+        start, end = archive_period(year, month, day)
+        return self.filter(
+            is_published=True,
+            first_published_at__gte=start,
+            first_published_at__lt=end,
+        )
+
+    def with_tags(self, slugs, mode="all"):
+        """
+        Посты с тегами из slugs: со всеми сразу (mode="all") или с любым ("any").
+
+        Фильтр — одно полусоединение pk IN (...) по таблице связей
+        blog_post_tags, сколько бы тегов ни было. Для "all" подзапрос
+        группирует связи по посту и оставляет посты, у которых нашлись все
+        теги (GROUP BY post_id HAVING COUNT(*) = число тегов); неизвестный
+        slug в этом режиме даёт пустой результат.
+        """
+        slugs = sorted(set(slugs))
+        if not slugs:
+            return self
+        links = Post.tags.through.objects.filter(tag__slug__in=slugs)
+        if mode == "all":
+            links = (
+                links.values("post_id")
+                .annotate(matched=Count("tag_id"))
+                .filter(matched=len(slugs))
+            )
+        elif mode != "any":
+            raise ValueError(f"Неизвестный режим фильтра по тегам: {mode}")
+        return self.filter(pk__in=links.values("post_id"))
+
+    def update_search_vector(self):
+        """Пересобирает search_vector одним UPDATE (только для PostgreSQL)."""
+        if connections[self.db].vendor != "postgresql":
+            return 0
+        return self.update(search_vector=build_post_search_vector())
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """bulk_create минует Post.save, поэтому производные поля заполняем здесь."""
+        for obj in objs:
+            obj.body_text_for_search = obj.extract_text_from_tiptap_json(obj.body)
+            obj.body_html = render_tiptap_html(obj.body)
+        objs = super().bulk_create(objs, *args, **kwargs)
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        if pks:
+            self.model.objects.using(self.db).filter(pk__in=pks).update_search_vector()
+        ArchiveBucket.apply_deltas(
+            Counter(
+                obj.archive_date
+                for obj in objs
+                if obj.pk is not None and obj.archive_date is not None
+            ),
+            using=self.db,
+        )
+        return objs
+
+    def recalculate_ratings(self):
+        """Пересчитывает агрегаты и распределение оценок одним UPDATE."""
+        ratings = Rating.objects.filter(post=OuterRef("pk")).values("post")
+        buckets = {
+            field: Coalesce(
+                Subquery(
+                    ratings.filter(score=score)
+                    .annotate(total=Count("id"))
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+            for score, field in Post.RATING_SCORE_FIELDS.items()
+        }
+        return self.update(
+            **buckets,
+            rating_count=Coalesce(
+                Subquery(
+                    ratings.annotate(total=Count("id")).values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+            rating_sum=Coalesce(
+                Subquery(
+                    ratings.annotate(total=Sum("score")).values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+        )
+
+
 class Post(AbstractBaseModel):
     """Модель поста блога."""
 
+    # Поля, которые поддерживаются атомарными UPDATE-ами извне и не должны
+    # перезаписываться устаревшими значениями при обычном save()
+    DENORMALIZED_FIELDS = (
+        "rating_count",
+        "rating_sum",
+        "rating_updated_at",
+        "search_vector",
+        "short_code",
+        "rating_1_count",
+        "rating_2_count",
+        "rating_3_count",
+        "rating_4_count",
+        "rating_5_count",
+    )
+    # Счётчики распределения оценок: оценка -> поле
+    RATING_SCORE_FIELDS = {score: f"rating_{score}_count" for score in range(1, 6)}
+    # Поля, вычисляемые из body в save()
+    BODY_DERIVED_FIELDS = ("body_text_for_search", "body_html")
+    # Поля, из которых собирается search_vector
+    SEARCH_SOURCE_FIELDS = ("title", "slug", "description", "body_text_for_search")
+
     title = models.CharField(max_length=255, verbose_name="Заголовок")
     slug = models.SlugField(
         max_length=255, unique=True, editable=True, verbose_name="URL (слаг)"
@@ -84,6 +309,11 @@ class Post(AbstractBaseModel):
     )
 
     body_text_for_search = models.TextField(editable=False, null=True, blank=True)
+    # HTML, отрендеренный из body при сохранении (см. blog.tiptap)
+    body_html = models.TextField(
+        "HTML контента", blank=True, default="", editable=False
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
 
     image = models.ImageField(
         upload_to="posts/uploads/",
@@ -127,15 +357,99 @@ class Post(AbstractBaseModel):
         default="weekly",
     )
 
+    # Денормализованные агрегаты рейтинга (поддерживаются моделью Rating)
+    rating_count = models.PositiveIntegerField(
+        "Количество оценок", default=0, editable=False
+    )
+    rating_sum = models.PositiveIntegerField("Сумма оценок", default=0, editable=False)
+    rating_updated_at = models.DateTimeField(
+        "Последнее изменение оценок", null=True, blank=True, editable=False
+    )
+    # Распределение оценок 1–5 (гистограмма) без GROUP BY по таблице оценок
+    rating_1_count = models.PositiveIntegerField(
+        "Оценок «1»", default=0, editable=False
+    )
+    rating_2_count = models.PositiveIntegerField(
+        "Оценок «2»", default=0, editable=False
+    )
+    rating_3_count = models.PositiveIntegerField(
+        "Оценок «3»", default=0, editable=False
+    )
+    rating_4_count = models.PositiveIntegerField(
+        "Оценок «4»", default=0, editable=False
+    )
+    rating_5_count = models.PositiveIntegerField(
+        "Оценок «5»", default=0, editable=False
+    )
+    # Код основной (самой ранней) короткой ссылки; поддерживается моделью ShortLink
+    short_code = models.CharField(
+        "Код короткой ссылки", max_length=8, blank=True, default="", editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ["-first_published_at"]
-        indexes = [models.Index(fields=["slug"])]
+        # slug уникален и индексирован ограничением UNIQUE, отдельный индекс не нужен
+        indexes = [
+            # Ленты, теги, keyset-пагинация и диапазоны архива: только
+            # опубликованные посты в порядке (-first_published_at, -id)
+            models.Index(
+                fields=["-first_published_at", "-id"],
+                name="blog_post_published_feed_idx",
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=["-first_published_at", "-id"],
+                name="blog_post_sitemap_feed_idx",
+                condition=models.Q(is_published=True, sitemap_include=True),
+            ),
+            models.Index(
+                fields=["-first_published_at", "-id"],
+                name="blog_post_drafts_idx",
+                condition=models.Q(is_published=False),
+            ),
+            GinIndex(fields=["search_vector"], name="blog_post_search_vector_gin"),
+        ]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
 
     def get_absolute_url(self):
         return f"/posts/{self.slug}/"
 
+    @property
+    def average_rating(self):
+        """Средняя оценка, вычисленная из денормализованных счётчиков."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def rating_distribution(self):
+        """Количество оценок каждого значения 1–5 из денормализованных счётчиков."""
+        return {
+            score: getattr(self, field)
+            for score, field in self.RATING_SCORE_FIELDS.items()
+        }
+
+    @staticmethod
+    def get_archive_date(is_published, first_published_at):
+        """День архива (по TIME_ZONE проекта), в который попадает пост."""
+        if not is_published or first_published_at is None:
+            return None
+        # До перечитывания из БД в поле может лежать строка (например, из фикстур)
+        moment = Post._meta.get_field("first_published_at").to_python(
+            first_published_at
+        )
+        zone = timezone.get_default_timezone()
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment, zone)
+        return timezone.localtime(moment, zone).date()
+
+    @property
+    def archive_date(self):
+        return self.get_archive_date(self.is_published, self.first_published_at)
+
     def extract_text_from_tiptap_json(self, json_data_or_str):
         json_data = None
         if isinstance(json_data_or_str, str) and json_data_or_str.strip():
@@ -166,12 +480,419 @@ class Post(AbstractBaseModel):
         return " ".join(filter(None, text_content)).strip()
 
     def save(self, *args, **kwargs):
-        self.body_text_for_search = self.extract_text_from_tiptap_json(self.body)
+        # Отложенные (.only()/.defer()) поля не читаем и не пишем: каждое
+        # обращение к ним стоило бы отдельного запроса
+        deferred = self.get_deferred_fields()
+        if "body" not in deferred:
+            self.body_text_for_search = self.extract_text_from_tiptap_json(self.body)
+            self.body_html = render_tiptap_html(self.body)
 
         if self.is_published and self.first_published_at is None:
             self.first_published_at = timezone.now()
 
-        super().save(*args, **kwargs)
+        # Копия через pk = None сохраняется обычным INSERT
+        if (
+            not self._state.adding
+            and self.pk is not None
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DENORMALIZED_FIELDS
+                and field.attname not in deferred
+            ]
+        elif (
+            kwargs.get("update_fields") is not None
+            and "body" in kwargs["update_fields"]
+        ):
+            # Производные от body поля сохраняются вместе с ним
+            kwargs["update_fields"] = list(
+                dict.fromkeys([*kwargs["update_fields"], *self.BODY_DERIVED_FIELDS])
+            )
+
+        update_fields = kwargs.get("update_fields")
+        archive_fields = {"is_published", "first_published_at"}
+        track_archive = update_fields is None or bool(
+            set(update_fields) & archive_fields
+        )
+        db = kwargs.get("using") or self._state.db
+        previous = None
+        if track_archive and not self._state.adding:
+            previous = (
+                Post.objects.using(db)
+                .filter(pk=self.pk)
+                .values_list("is_published", "first_published_at")
+                .first()
+            )
+        previous_date = self.get_archive_date(*previous) if previous else None
+        # Сигнал кэша ответов сбрасывает архив, только если пост в нём сдвинулся
+        if self._state.adding:
+            self._archive_changed = self.is_published
+        else:
+            self._archive_changed = previous is not None and tuple(previous) != (
+                self.is_published,
+                self.first_published_at,
+            )
+
+        with transaction.atomic(using=db):
+            super().save(*args, **kwargs)
+            if track_archive:
+                ArchiveBucket.move(previous_date, self.archive_date, using=db)
+            # У нового поста тегов ещё нет: их добавит m2m_changed
+            if previous is not None and previous[0] != self.is_published:
+                delta = 1 if self.is_published else -1
+                tag_ids = Tag.objects.using(db).filter(posts=self.pk)
+                Tag.adjust_published_posts_count(
+                    {tag_id: delta for tag_id in tag_ids.values_list("pk", flat=True)},
+                    using=db,
+                )
+                RelatedPost.refresh_for_post(self.pk, using=db)
+                PostRanking.refresh_for_posts([self.pk], using=db)
+
+        # tsvector считается на стороне БД, поэтому обновляем его отдельным UPDATE
+        if update_fields is None or set(update_fields) & set(self.SEARCH_SOURCE_FIELDS):
+            Post.objects.using(self._state.db).filter(pk=self.pk).update_search_vector()
+
+
+class ArchiveBucket(models.Model):
+    """
+    Количество опубликованных постов за день архива.
+
+    Материализованный календарь для сводок архива: поддерживается
+    инкрементально из Post.save, PostQuerySet.bulk_create и удаления поста.
+    Массовые QuerySet.update() его минуют — после них нужна команда
+    rebuild_archive.
+    """
+
+    year = models.PositiveSmallIntegerField("Год")
+    month = models.PositiveSmallIntegerField("Месяц")
+    day = models.PositiveSmallIntegerField("День")
+    count = models.PositiveIntegerField("Количество постов", default=0)
+
+    class Meta:
+        ordering = ["year", "month", "day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month", "day"], name="blog_archivebucket_unique_day"
+            )
+        ]
+        verbose_name = "Ячейка архива"
+        verbose_name_plural = "Ячейки архива"
+
+    def __str__(self):
+        return f"{self.year:04d}-{self.month:02d}-{self.day:02d}: {self.count}"
+
+    @classmethod
+    def apply_deltas(cls, deltas, using=None):
+        """Сдвигает счётчики дней на заданные величины ({date: delta})."""
+        manager = cls.objects.db_manager(using)
+        with transaction.atomic(using=manager.db):
+            for date, delta in deltas.items():
+                if not delta:
+                    continue
+                key = {"year": date.year, "month": date.month, "day": date.day}
+                if delta > 0:
+                    manager.get_or_create(**key)
+                manager.filter(**key).update(count=F("count") + delta)
+                # Пустые дни не храним: сводки не должны их показывать
+                manager.filter(count__lte=0, **key).delete()
+
+    @classmethod
+    def move(cls, previous_date, new_date, using=None):
+        """Переносит пост из одного дня архива в другой (любой может быть None)."""
+        if previous_date == new_date:
+            return
+        deltas = Counter()
+        if previous_date is not None:
+            deltas[previous_date] -= 1
+        if new_date is not None:
+            deltas[new_date] += 1
+        cls.apply_deltas(deltas, using=using)
+
+    @classmethod
+    def rebuild(cls, using=None):
+        """Полностью пересобирает календарь по таблице постов."""
+        manager = cls.objects.db_manager(using)
+        dates = Counter(
+            Post.get_archive_date(True, published_at)
+            for published_at in Post.objects.db_manager(manager.db)
+            .filter(is_published=True, first_published_at__isnull=False)
+            .values_list("first_published_at", flat=True)
+            .iterator(chunk_size=2000)
+        )
+        with transaction.atomic(using=manager.db):
+            manager.all().delete()
+            manager.bulk_create(
+                [
+                    cls(year=date.year, month=date.month, day=date.day, count=count)
+                    for date, count in sorted(dates.items())
+                ],
+                batch_size=1000,
+            )
+        return len(dates)
+
+
+def get_related_posts_limit():
+    """Сколько похожих постов хранится для каждого поста (top-K)."""
+    return getattr(settings, "RELATED_POSTS_LIMIT", 6)
+
+
+class RelatedPost(models.Model):
+    """
+    Предвычисленные похожие посты: top-K по IDF-взвешенным общим тегам.
+
+    Хранятся только опубликованные посты с обеих сторон. Список поста
+    пересчитывается при изменении его тегов и публикации (refresh_for_post),
+    его вклад в списки соседей сливается инкрементально. Веса тегов берутся
+    на момент пересчёта, поэтому со временем списки далёких от изменений
+    постов слегка «дрейфуют» — их выравнивает команда rebuild_related_posts.
+    """
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="related_entries"
+    )
+    related = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="related_to"
+    )
+    score = models.FloatField("Вес")
+
+    class Meta:
+        ordering = ["post", "-score", "-related"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "related"], name="blog_relatedpost_unique_pair"
+            )
+        ]
+        verbose_name = "Похожий пост"
+        verbose_name_plural = "Похожие посты"
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id}: {self.score}"
+
+    @staticmethod
+    def _published_links(using):
+        return Post.tags.through.objects.using(using).filter(post__is_published=True)
+
+    @staticmethod
+    def _tag_weights(tag_ids, using):
+        total = Post.objects.using(using).filter(is_published=True).count()
+        tags = Tag.objects.using(using).filter(published_posts_count__gt=0)
+        if tag_ids is not None:
+            tags = tags.filter(pk__in=tag_ids)
+        return {
+            tag_id: tag_weight(total, tag_posts)
+            for tag_id, tag_posts in tags.values_list("pk", "published_posts_count")
+        }
+
+    @classmethod
+    def _score(cls, post_ids, using):
+        """{post_id: {related_id: score}} для опубликованных постов из post_ids."""
+        links = cls._published_links(using)
+        post_tags = group_tags(
+            links.filter(post_id__in=post_ids).values_list("post_id", "tag_id")
+        )
+        tag_ids = {tag_id for tag_ids in post_tags.values() for tag_id in tag_ids}
+        members = group_members(
+            links.filter(tag_id__in=tag_ids).values_list("post_id", "tag_id")
+        )
+        weights = cls._tag_weights(tag_ids, using)
+        return {
+            post_id: score_candidates(post_id, tag_ids, members, weights)
+            for post_id, tag_ids in post_tags.items()
+        }
+
+    @classmethod
+    def rebuild_for(cls, post_ids, using=None):
+        """Полностью пересчитывает списки заданных постов."""
+        post_ids = set(post_ids)
+        if not post_ids:
+            return
+        manager = cls.objects.db_manager(using)
+        limit = get_related_posts_limit()
+        with transaction.atomic(using=manager.db):
+            scores = cls._score(post_ids, manager.db)
+            manager.filter(post_id__in=post_ids).delete()
+            manager.bulk_create(
+                [
+                    cls(post_id=post_id, related_id=related_id, score=score)
+                    for post_id, candidates in scores.items()
+                    for related_id, score in top_related(candidates, limit)
+                ]
+            )
+
+    @classmethod
+    def refresh_for_post(cls, post_id, using=None):
+        """
+        Инкрементальный пересчёт после изменения тегов или публикации поста.
+
+        Собственный список поста строится заново. Вес пары симметричен,
+        поэтому те же веса сливаются в списки соседей: пост вставляется туда,
+        где проходит в top-K, и вытесняет последний элемент. Полный пересчёт
+        нужен лишь соседу с заполненным списком, в котором вес поста упал
+        или пропал: на освободившееся место мог претендовать кто-то ещё.
+        """
+        manager = cls.objects.db_manager(using)
+        limit = get_related_posts_limit()
+        with transaction.atomic(using=manager.db):
+            scores = cls._score([post_id], manager.db).get(post_id, {})
+            manager.filter(post_id=post_id).delete()
+            manager.bulk_create(
+                [
+                    cls(post_id=post_id, related_id=related_id, score=score)
+                    for related_id, score in top_related(scores, limit)
+                ]
+            )
+
+            previous = dict(
+                manager.filter(related_id=post_id).values_list("post_id", "score")
+            )
+            manager.filter(related_id=post_id).delete()
+            neighbour_ids = set(scores) | set(previous)
+            entries = {}
+            for pk, owner_id, related_id, score in manager.filter(
+                post_id__in=neighbour_ids
+            ).values_list("pk", "post_id", "related_id", "score"):
+                entries.setdefault(owner_id, []).append((pk, related_id, score))
+
+            to_rebuild, to_create, to_delete = [], [], []
+            for owner_id in neighbour_ids:
+                current = entries.get(owner_id, [])
+                score = scores.get(owner_id)
+                old_score = previous.get(owner_id)
+                was_full = len(current) + (old_score is not None) >= limit
+                if old_score is not None and was_full and (score or 0) < old_score:
+                    to_rebuild.append(owner_id)
+                    continue
+                if score is None:
+                    continue
+                if len(current) >= limit:
+                    pk, lowest_id, lowest_score = min(
+                        current, key=lambda entry: (entry[2], entry[1])
+                    )
+                    if (score, post_id) < (lowest_score, lowest_id):
+                        continue
+                    to_delete.append(pk)
+                to_create.append(cls(post_id=owner_id, related_id=post_id, score=score))
+            manager.filter(pk__in=to_delete).delete()
+            manager.bulk_create(to_create)
+            cls.rebuild_for(to_rebuild, using=manager.db)
+
+    @classmethod
+    def rebuild(cls, using=None):
+        """Полностью пересобирает таблицу по связям опубликованных постов."""
+        manager = cls.objects.db_manager(using)
+        limit = get_related_posts_limit()
+        links = list(cls._published_links(manager.db).values_list("post_id", "tag_id"))
+        members = group_members(links)
+        weights = cls._tag_weights(None, manager.db)
+        with transaction.atomic(using=manager.db):
+            manager.all().delete()
+            batch = []
+            for post_id, tag_ids in group_tags(links).items():
+                scores = score_candidates(post_id, tag_ids, members, weights)
+                batch.extend(
+                    cls(post_id=post_id, related_id=related_id, score=score)
+                    for related_id, score in top_related(scores, limit)
+                )
+                if len(batch) >= 2000:
+                    manager.bulk_create(batch)
+                    batch = []
+            manager.bulk_create(batch)
+        return len({post_id for post_id, _ in links})
+
+
+def get_top_rated_prior():
+    """Априорные (среднее, вес, минимум голосов) рейтинга «лучших» постов."""
+    return (
+        getattr(settings, "TOP_RATED_PRIOR_MEAN", 3.0),
+        getattr(settings, "TOP_RATED_PRIOR_WEIGHT", 5),
+        getattr(settings, "TOP_RATED_MIN_VOTES", 1),
+    )
+
+
+class PostRanking(models.Model):
+    """
+    Предвычисленный рейтинг «лучших» постов по байесовской средней оценке.
+
+    Строка есть только у опубликованного поста с достаточным числом голосов.
+    Оценка считается из денормализованных счётчиков поста и обновляется
+    вместе с ними (refresh_for_posts), поэтому чтение топа — проход по
+    индексу на размер страницы. Полная пересборка — команда
+    rebuild_post_rankings, нужна после правок счётчиков в обход модели
+    и смены априорных настроек.
+    """
+
+    post = models.OneToOneField(
+        Post, on_delete=models.CASCADE, primary_key=True, related_name="ranking"
+    )
+    score = models.FloatField("Байесовская оценка")
+    rating_count = models.PositiveIntegerField("Количество оценок")
+
+    class Meta:
+        ordering = ["-score", "-rating_count", "-post"]
+        indexes = [
+            models.Index(
+                fields=["-score", "-rating_count", "-post"],
+                name="blog_postranking_top_idx",
+            )
+        ]
+        verbose_name = "Место в рейтинге"
+        verbose_name_plural = "Рейтинг постов"
+
+    def __str__(self):
+        return f"{self.post_id}: {self.score}"
+
+    @classmethod
+    def _rows(cls, posts):
+        prior_mean, prior_weight, min_votes = get_top_rated_prior()
+        return [
+            cls(
+                post_id=post_id,
+                score=bayesian_average(
+                    rating_sum, rating_count, prior_mean, prior_weight
+                ),
+                rating_count=rating_count,
+            )
+            for post_id, is_published, rating_count, rating_sum in posts
+            if is_ranked(is_published, rating_count, min_votes)
+        ]
+
+    @staticmethod
+    def _counters(queryset):
+        return queryset.values_list("pk", "is_published", "rating_count", "rating_sum")
+
+    @classmethod
+    def refresh_for_posts(cls, post_ids, using=None):
+        """Пересчитывает места постов из post_ids по их текущим счётчикам."""
+        manager = cls.objects.db_manager(using)
+        posts = Post.objects.using(manager.db).filter(pk__in=post_ids)
+        rows = cls._rows(cls._counters(posts))
+        with transaction.atomic(using=manager.db):
+            manager.filter(post_id__in=post_ids).exclude(
+                post_id__in=[row.post_id for row in rows]
+            ).delete()
+            manager.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["post"],
+                update_fields=["score", "rating_count"],
+            )
+
+    @classmethod
+    def rebuild(cls, using=None):
+        """Полностью пересобирает рейтинг по счётчикам опубликованных постов."""
+        manager = cls.objects.db_manager(using)
+        posts = Post.objects.using(manager.db).filter(
+            is_published=True, rating_count__gt=0
+        )
+        rows = cls._rows(cls._counters(posts).iterator(chunk_size=2000))
+        with transaction.atomic(using=manager.db):
+            manager.all().delete()
+            manager.bulk_create(rows, batch_size=2000)
+        return len(rows)
 
 
 class Rating(models.Model):
@@ -189,6 +910,99 @@ class Rating(models.Model):
         verbose_name = "Рейтинг"
         verbose_name_plural = "Рейтинги"
 
+    @staticmethod
+    def apply_to_post(post_id, score_deltas):
+        """
+        Атомарно сдвигает счётчики рейтинга поста: score_deltas — {оценка: delta}.
+
+        Количество, сумма и счётчики по оценкам меняются одним UPDATE.
+        """
+        score_deltas = {score: delta for score, delta in score_deltas.items() if delta}
+        if not score_deltas:
+            return
+        updates = {
+            Post.RATING_SCORE_FIELDS[score]: shifted(
+                Post.RATING_SCORE_FIELDS[score], delta
+            )
+            for score, delta in score_deltas.items()
+        }
+        Post.objects.filter(pk=post_id).update(
+            rating_count=shifted("rating_count", sum(score_deltas.values())),
+            rating_sum=shifted(
+                "rating_sum",
+                sum(score * delta for score, delta in score_deltas.items()),
+            ),
+            rating_updated_at=timezone.now(),
+            **updates,
+        )
+        PostRanking.refresh_for_posts([post_id])
+
+    @classmethod
+    def upsert(cls, post_id, user_hash, score, using=None):
+        """
+        Ставит или меняет оценку пользователя: (rating, created).
+
+        Оценка пишется одним INSERT ... ON CONFLICT (post, user_hash) DO
+        UPDATE (PostgreSQL и SQLite), счётчики поста сдвигаются в той же
+        транзакции. Строка поста блокируется до чтения прежней оценки:
+        параллельные голоса за пост выстраиваются в очередь, и повторный
+        голос не может быть засчитан как новый.
+        """
+        manager = cls.objects.db_manager(using)
+        with transaction.atomic(using=manager.db):
+            locked = (
+                Post.objects.using(manager.db)
+                .select_for_update()
+                .filter(pk=post_id)
+                .values_list("pk", flat=True)
+            )
+            if not locked:
+                raise Post.DoesNotExist(f"Пост {post_id} не найден")
+            previous = (
+                manager.filter(post_id=post_id, user_hash=user_hash)
+                .values("score", "created_at")
+                .first()
+            )
+            (rating,) = manager.bulk_create(
+                [cls(post_id=post_id, user_hash=user_hash, score=score)],
+                update_conflicts=True,
+                unique_fields=["post", "user_hash"],
+                update_fields=["score"],
+            )
+            created = previous is None
+            deltas = Counter({score: 1})
+            if not created:
+                # created_at при конфликте не перезаписывается
+                rating.created_at = previous["created_at"]
+                deltas[previous["score"]] -= 1
+            cls.apply_to_post(post_id, deltas)
+        # bulk_create не шлёт post_save, а на нём держится инвалидация кэша
+        post_save.send(
+            sender=cls,
+            instance=rating,
+            created=created,
+            update_fields=None,
+            raw=False,
+            using=manager.db,
+        )
+        return rating, created
+
+    def save(self, *args, **kwargs):
+        # Счётчики поста обновляются в той же транзакции, что и сама оценка
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Rating.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("post_id", "score")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            if previous is not None:
+                self.apply_to_post(previous[0], {previous[1]: -1})
+            self.apply_to_post(self.post_id, {self.score: 1})
+
 
 class ShortLink(models.Model):
     """Короткая ссылка на пост."""
@@ -215,11 +1029,168 @@ class ShortLink(models.Model):
         if not self.code:
             self.code = self._generate_unique_code()
         super().save(*args, **kwargs)
+        # Первая ссылка поста становится его основной (Post.short_code)
+        Post.objects.filter(pk=self.post_id, short_code="").update(short_code=self.code)
 
     class Meta:
         verbose_name = "Короткая ссылка"
         verbose_name_plural = "Короткие ссылки"
 
+    @staticmethod
+    def refresh_post_short_code(post_id):
+        """Переназначает основную короткую ссылку поста на самую раннюю из оставшихся."""
+        code = (
+            ShortLink.objects.filter(post_id=post_id)
+            .order_by("pk")
+            .values_list("code", flat=True)
+            .first()
+        )
+        Post.objects.filter(pk=post_id).update(short_code=code or "")
+
+
+@receiver(pre_delete, sender=Post)
+def decrement_tag_counts_on_post_delete(sender, instance, **kwargs):
+    """Удаляемый опубликованный пост уменьшает счётчики своих тегов."""
+    # Связи с тегами удаляются каскадом без m2m_changed, поэтому до удаления
+    if not instance.is_published:
+        return
+    db = instance._state.db
+    tag_ids = (
+        Tag.objects.using(db).filter(posts=instance.pk).values_list("pk", flat=True)
+    )
+    Tag.adjust_published_posts_count({tag_id: -1 for tag_id in tag_ids}, using=db)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_counts_on_m2m_change(
+    sender, instance, action, reverse, pk_set, using, **kwargs
+):
+    """
+    Поддерживает Tag.published_posts_count при изменении связей пост-тег.
+
+    Для remove/clear набор реально существующих связей вычисляется в pre_*
+    (pk_set у remove может содержать несвязанные объекты), а применяется
+    в post_*. Для add Django сам исключает уже существующие связи.
+    """
+    if action not in (
+        "post_add",
+        "pre_remove",
+        "post_remove",
+        "pre_clear",
+        "post_clear",
+    ):
+        return
+    if action in ("post_remove", "post_clear"):
+        deltas = getattr(instance, "_pending_tag_count_deltas", None) or {}
+        instance._pending_tag_count_deltas = None
+        Tag.adjust_published_posts_count(deltas, using=using)
+        return
+
+    links = sender.objects.using(using).filter(post__is_published=True)
+    if reverse:
+        links = links.filter(tag_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(post_id__in=pk_set)
+    else:
+        links = links.filter(post_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(tag_id__in=pk_set)
+    deltas = Counter(links.values_list("tag_id", flat=True))
+
+    if action == "post_add":
+        Tag.adjust_published_posts_count(deltas, using=using)
+    else:
+        instance._pending_tag_count_deltas = {
+            tag_id: -count for tag_id, count in deltas.items()
+        }
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_related_posts_on_m2m_change(
+    sender, instance, action, reverse, pk_set, using, **kwargs
+):
+    """Пересчитывает похожие посты у постов, чьи теги изменились."""
+    if reverse and action == "pre_clear":
+        # После clear() со стороны тега его посты уже не найти
+        instance._pending_related_post_ids = list(
+            sender.objects.using(using)
+            .filter(tag_id=instance.pk)
+            .values_list("post_id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        post_ids = [instance.pk]
+    elif action == "post_clear":
+        post_ids = getattr(instance, "_pending_related_post_ids", None) or []
+        instance._pending_related_post_ids = None
+    else:
+        post_ids = pk_set or ()
+    for post_id in post_ids:
+        RelatedPost.refresh_for_post(post_id, using=using)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_related_neighbours(sender, instance, **kwargs):
+    """Запоминает посты, в чьих списках похожих стоит удаляемый пост."""
+    # Строки с ним удалятся каскадом, и соседей будет уже не найти
+    instance._related_neighbour_ids = list(
+        RelatedPost.objects.using(instance._state.db)
+        .filter(related_id=instance.pk)
+        .values_list("post_id", flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_posts(sender, instance, **kwargs):
+    """Запоминает посты удаляемого тега: связи удалятся без m2m_changed."""
+    instance._related_post_ids = list(
+        instance.posts.using(instance._state.db).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+def refresh_related_posts_on_tag_delete(sender, instance, **kwargs):
+    """Пересчитывает похожие посты у всех постов удалённого тега."""
+    # Обе стороны каждой пары с этим тегом входят в набор, пересчёт точный
+    RelatedPost.rebuild_for(
+        getattr(instance, "_related_post_ids", ()), using=instance._state.db
+    )
+
+
+@receiver(post_delete, sender=Post)
+def refresh_related_neighbours(sender, instance, **kwargs):
+    """Дополняет списки соседей удалённого поста."""
+    RelatedPost.rebuild_for(
+        getattr(instance, "_related_neighbour_ids", ()), using=instance._state.db
+    )
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_archive(sender, instance, **kwargs):
+    """Удалённый опубликованный пост выбывает из своего дня архива."""
+    ArchiveBucket.move(instance.archive_date, None, using=instance._state.db)
+
+
+@receiver(post_delete, sender=Rating)
+def decrement_post_rating(sender, instance, origin=None, **kwargs):
+    """Вычитает удалённую оценку из счётчиков поста."""
+    # При каскадном удалении самого поста обновлять его счётчики незачем
+    origin_model = getattr(origin, "model", type(origin))
+    if origin_model is Post:
+        return
+    Rating.apply_to_post(instance.post_id, {instance.score: -1})
+
+
+@receiver(post_delete, sender=ShortLink)
+def refresh_post_short_code(sender, instance, origin=None, **kwargs):
+    """После удаления основной короткой ссылки выбирает следующую."""
+    origin_model = getattr(origin, "model", type(origin))
+    if origin_model is Post:
+        return
+    ShortLink.refresh_post_short_code(instance.post_id)
+
 
 @receiver(post_save, sender=Post)
 def create_shortlink_for_post(sender, instance, created, **kwargs):
@@ -228,5 +1199,7 @@ def create_shortlink_for_post(sender, instance, created, **kwargs):
         # Проверяем, есть ли уже ShortLink (на случай если ForeignKey останется и их может быть несколько)
         # Для OneToOneField проверка будет проще: if not hasattr(instance, 'shortlink') or not instance.shortlink:
         if not ShortLink.objects.filter(post=instance).exists():
-            ShortLink.objects.create(post=instance)
+            shortlink = ShortLink.objects.create(post=instance)
+            # Код сразу нужен сериализатору только что созданного поста
+            instance.short_code = shortlink.code
             # logger.info(f"Создана короткая ссылка для поста {instance.id}") # Опционально для логирования
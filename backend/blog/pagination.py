@@ -0,0 +1,123 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset-пагинация постов по (first_published_at, id).
+
+    Вместо COUNT(*) и OFFSET следующая страница выбирается условием
+    «строго раньше последнего показанного поста», поэтому глубокие страницы
+    стоят столько же, сколько первая. Пагинация однонаправленная:
+    ответ содержит только ссылку next.
+    """
+
+    page_size = api_settings.PAGE_SIZE or 10
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Некорректный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.filter(first_published_at__isnull=False).order_by(
+            "-first_published_at", "-id"
+        )
+        position = self.decode_cursor(request)
+        if position is not None:
+            published_at, pk = position
+            queryset = queryset.filter(
+                Q(first_published_at__lt=published_at)
+                | Q(first_published_at=published_at, id__lt=pk)
+            )
+
+        # Берём на одну запись больше, чтобы узнать, есть ли следующая страница
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = remove_query_param(self.base_url, "page")
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(last.first_published_at, last.pk),
+        )
+
+    def encode_cursor(self, published_at, pk):
+        raw = f"{published_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            published_part, pk_part = raw.rsplit("|", 1)
+            published_at = parse_datetime(published_part)
+            pk = int(pk_part)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if published_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return published_at, pk
+
+
+class PostPagination(PageNumberPagination):
+    """
+    Пагинация списков постов.
+
+    По умолчанию работает как обычный PageNumberPagination (обратная
+    совместимость). Параметр ?pagination=cursor или переданный cursor включают
+    keyset-режим, если представление его допускает (метод
+    keyset_pagination_allowed).
+    """
+
+    keyset_class = KeysetPagination
+    mode_query_param = "pagination"
+
+    def use_keyset(self, request, view=None):
+        requested = (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+        allowed = getattr(view, "keyset_pagination_allowed", None)
+        return requested and (allowed is None or allowed())
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,108 @@
+"""
+Бюджет SQL-запросов на запрос к API.
+
+Представление объявляет, сколько запросов ему положено: декоратором
+@with_query_budget(n) (функция или action ViewSet-а) либо атрибутом класса
+query_budget — числом или словарём {action: число}. QueryBudgetMiddleware
+считает запросы ко всем базам за время обработки запроса и при
+превышении, в зависимости от QUERY_BUDGET_MODE, поднимает
+QueryBudgetExceeded ("raise", тесты), пишет предупреждение в лог ("log",
+DEBUG) или ничего не делает ("off", по умолчанию в продакшене).
+"""
+
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "log", "raise")
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше SQL-запросов, чем объявило."""
+
+
+def with_query_budget(limit):
+    """Декоратор: объявляет бюджет запросов функции-представления или action."""
+
+    def decorator(view):
+        view.query_budget = limit
+        return view
+
+    return decorator
+
+
+def get_mode():
+    default = "log" if settings.DEBUG else "off"
+    mode = getattr(settings, "QUERY_BUDGET_MODE", default)
+    return mode if mode in MODES else default
+
+
+def resolve_budget(request, view_func):
+    """Бюджет представления для запроса или None, если он не объявлен."""
+    budget = getattr(view_func, "query_budget", None)
+    if budget is not None:
+        return budget
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return None
+    # ViewSet: метод HTTP -> имя action, у action может быть свой декоратор
+    actions = getattr(view_func, "actions", None) or {}
+    method = request.method.lower()
+    # HEAD ViewSet обслуживает тем же action, что и GET
+    action = actions.get(method) or (actions.get("get") if method == "head" else None)
+    if action is not None:
+        budget = getattr(getattr(view_class, action, None), "query_budget", None)
+        if budget is not None:
+            return budget
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(action or method)
+    return budget
+
+
+class QueryCounter:
+    """execute_wrapper, считающий выполненные запросы."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы запроса и сверяет их с бюджетом представления."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = get_mode()
+        if mode == "off":
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        budget = getattr(request, "_query_budget", None)
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path}: {counter.count} SQL-запросов "
+                f"при бюджете {budget}"
+            )
+            if mode == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = resolve_budget(request, view_func)
+        return None
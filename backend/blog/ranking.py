@@ -0,0 +1,29 @@
+"""
+Байесовская (сглаженная) средняя оценка для рейтинга «лучших» постов.
+
+Оценка поста — (C * m + сумма оценок) / (C + число оценок): к реальным
+голосам добавляется C «виртуальных» голосов со средним m. Пост с одной
+пятёркой получает почти m, а высокое место занимают посты, где высокий
+средний балл подтверждён многими голосами. Априорные m и C фиксированы
+настройками, поэтому оценка поста зависит только от его собственных
+счётчиков и пересчитывается точно, без дрейфа. Функции не зависят от ORM
+и используются моделью PostRanking и миграцией, заполняющей таблицу.
+"""
+
+# Точность хранимой оценки: одинаковые счётчики дают одинаковый ключ сортировки
+SCORE_PRECISION = 6
+
+
+def bayesian_average(rating_sum, rating_count, prior_mean, prior_weight):
+    """Сглаженная средняя оценка; без голосов равна prior_mean."""
+    if prior_weight + rating_count <= 0:
+        return float(prior_mean)
+    return round(
+        (prior_weight * prior_mean + rating_sum) / (prior_weight + rating_count),
+        SCORE_PRECISION,
+    )
+
+
+def is_ranked(is_published, rating_count, min_votes):
+    """Попадает ли пост в рейтинг: опубликован и набрал min_votes голосов."""
+    return bool(is_published) and rating_count >= max(min_votes, 1)
@@ -0,0 +1,183 @@
+"""
+Буферизованный (write-behind) приём оценок для всплесков трафика.
+
+В режиме RATING_BUFFER_ENABLED RatingViewSet не пишет оценку сразу, а
+кладёт проверенную оценку в очередь процесса и отвечает 202. Фоновый
+поток сбрасывает очередь одной транзакцией: bulk_create(update_conflicts=True)
+по всем накопленным оценкам и по одному UPDATE счётчиков на пост. Сброс
+происходит раз в RATING_BUFFER_FLUSH_INTERVAL_MS или сразу, как только
+накопилось RATING_BUFFER_MAX_ITEMS оценок, а также при завершении процесса.
+
+Граница устаревания: принятая оценка попадает в базу (и в счётчики поста,
+и в кэш ответов) не позже чем через FLUSH_INTERVAL_MS плюс время самого
+сброса. Повторные голоса одного user_hash за пост внутри окна сливаются,
+побеждает последний. Цена режима — оценки из очереди теряются при
+аварийном завершении процесса (SIGKILL, OOM); при штатной остановке
+очередь сбрасывается через atexit.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import Post, Rating
+from .response_cache import POSTS_TAG, invalidate, post_tag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL_MS = 500
+DEFAULT_MAX_ITEMS = 200
+
+
+def is_enabled():
+    return getattr(settings, "RATING_BUFFER_ENABLED", False)
+
+
+class RatingBuffer:
+    """Очередь оценок процесса с периодическим сбросом в базу."""
+
+    def __init__(self, interval_ms=None, max_items=None, start_worker=True):
+        self.interval_ms = interval_ms or getattr(
+            settings, "RATING_BUFFER_FLUSH_INTERVAL_MS", DEFAULT_FLUSH_INTERVAL_MS
+        )
+        self.max_items = max_items or getattr(
+            settings, "RATING_BUFFER_MAX_ITEMS", DEFAULT_MAX_ITEMS
+        )
+        self.start_worker = start_worker
+        # (post_id, user_hash) -> score: повторный голос заменяет прежний
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._worker = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def add(self, post_id, user_hash, score):
+        with self._lock:
+            self._pending[(post_id, user_hash)] = score
+            full = len(self._pending) >= self.max_items
+        if self.start_worker and not self._stopped:
+            self._ensure_worker()
+            if full:
+                self._wake.set()
+        elif full:
+            self.flush()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="rating-buffer", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval_ms / 1000)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Не удалось сбросить буфер оценок")
+            finally:
+                close_old_connections()
+
+    def close(self):
+        """Останавливает фоновый поток и сбрасывает остаток очереди."""
+        self._stopped = True
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.interval_ms / 1000 + 5)
+        return self.flush()
+
+    def flush(self):
+        """Пишет накопленные оценки в базу; возвращает их количество."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                slugs = self._write(batch)
+            except Exception:
+                # Возвращаем пачку в очередь; более свежие голоса важнее
+                with self._lock:
+                    self._pending = {**batch, **self._pending}
+                raise
+        invalidate(POSTS_TAG, *(post_tag(slug) for slug in slugs))
+        return len(batch)
+
+    @staticmethod
+    def _write(batch):
+        post_ids = sorted({post_id for post_id, _ in batch})
+        with transaction.atomic():
+            # Блокировка постов (в порядке pk) сериализует сброс с Rating.upsert
+            # и буферами других процессов: прежние оценки читаются достоверно
+            slugs = dict(
+                Post.objects.select_for_update()
+                .filter(pk__in=post_ids)
+                .order_by("pk")
+                .values_list("pk", "slug")
+            )
+            batch = {key: score for key, score in batch.items() if key[0] in slugs}
+            if not batch:
+                return []
+            previous = {
+                (post_id, user_hash): score
+                for post_id, user_hash, score in Rating.objects.filter(
+                    post_id__in=slugs,
+                    user_hash__in={user_hash for _, user_hash in batch},
+                ).values_list("post_id", "user_hash", "score")
+            }
+            Rating.objects.bulk_create(
+                [
+                    Rating(post_id=post_id, user_hash=user_hash, score=score)
+                    for (post_id, user_hash), score in batch.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["post", "user_hash"],
+                update_fields=["score"],
+            )
+            deltas = defaultdict(Counter)
+            for key, score in batch.items():
+                deltas[key[0]][score] += 1
+                if key in previous:
+                    deltas[key[0]][previous[key]] -= 1
+            for post_id, score_deltas in deltas.items():
+                Rating.apply_to_post(post_id, score_deltas)
+        return [slugs[post_id] for post_id in deltas]
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """Буфер процесса; создаётся при первом обращении."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = RatingBuffer()
+                atexit.register(flush_on_shutdown)
+    return _buffer
+
+
+def flush_on_shutdown():
+    if _buffer is None:
+        return
+    try:
+        _buffer.close()
+    except Exception:
+        logger.exception("Не удалось сбросить буфер оценок при остановке")
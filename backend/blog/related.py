@@ -0,0 +1,65 @@
+"""
+Оценка похожести постов по общим тегам.
+
+Вес тега — IDF: log(1 + N / df), где N — число опубликованных постов,
+df — число опубликованных постов с тегом. Похожесть двух постов — сумма
+весов их общих тегов, так что совпадение по редкому тегу значит больше,
+чем по популярному. Функции здесь не зависят от ORM и используются
+моделью RelatedPost и миграцией, заполняющей таблицу.
+"""
+
+import heapq
+import math
+from collections import Counter, defaultdict
+
+# Точность хранимого веса: убирает шум порядка суммирования float
+SCORE_PRECISION = 6
+
+
+def tag_weight(total_posts, tag_posts):
+    """IDF-вес тега; у тега без опубликованных постов вес нулевой."""
+    if tag_posts <= 0 or total_posts <= 0:
+        return 0.0
+    return math.log(1 + total_posts / tag_posts)
+
+
+def group_members(links):
+    """Пары (post_id, tag_id) -> {tag_id: [post_id, ...]}."""
+    members = defaultdict(list)
+    for post_id, tag_id in links:
+        members[tag_id].append(post_id)
+    return members
+
+
+def group_tags(links):
+    """Пары (post_id, tag_id) -> {post_id: [tag_id, ...]}."""
+    tags = defaultdict(list)
+    for post_id, tag_id in links:
+        tags[post_id].append(tag_id)
+    return tags
+
+
+def score_candidates(post_id, tag_ids, members, weights):
+    """Веса всех постов, у которых есть общие теги с post_id."""
+    scores = Counter()
+    for tag_id in tag_ids:
+        weight = weights.get(tag_id)
+        if not weight:
+            continue
+        for other_id in members.get(tag_id, ()):
+            if other_id != post_id:
+                scores[other_id] += weight
+    return {
+        other_id: round(score, SCORE_PRECISION) for other_id, score in scores.items()
+    }
+
+
+def rank_key(item):
+    """Порядок кандидатов: вес, при равенстве — более новый пост (больший id)."""
+    related_id, score = item
+    return score, related_id
+
+
+def top_related(scores, limit):
+    """Лучшие limit кандидатов: список (related_id, score) по убыванию."""
+    return heapq.nlargest(limit, scores.items(), key=rank_key)
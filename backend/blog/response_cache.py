@@ -0,0 +1,210 @@
+"""
+Кэш ответов анонимных GET-запросов с инвалидацией по тегам.
+
+Запись кэша хранит готовый ответ и «версии» своих тегов на момент
+вычисления. Инвалидация тега заменяет его версию на новую, после чего
+все записи со старой версией считаются промахом. Тайм-аут
+RESPONSE_CACHE_TIMEOUT — лишь страховка, свежесть обеспечивают сигналы
+(см. blog.signals).
+"""
+
+import functools
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+KEY_PREFIX = "blog:respcache"
+
+# Теги кэша: инвалидируются сигналами из blog.signals
+POSTS_TAG = "posts"
+TAGS_TAG = "tags"
+ARCHIVE_TAG = "archive"
+SHORTLINKS_TAG = "shortlinks"
+# Заголовки, которые переносятся из исходного ответа в закэшированный
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Location", "Vary", "Allow")
+CACHEABLE_STATUSES = (200, 301, 302)
+
+
+def post_tag(slug):
+    """Тег детальной страницы поста."""
+    return f"post:{slug}"
+
+
+def _tag_key(tag):
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _entry_key(request):
+    # Хост и схема входят в ключ: сериализаторы строят абсолютные URL
+    source = "|".join(
+        (
+            request.scheme,
+            request.get_host(),
+            request.get_full_path(),
+            request.META.get("HTTP_ACCEPT", ""),
+        )
+    )
+    return f"{KEY_PREFIX}:entry:{hashlib.md5(source.encode('utf-8')).hexdigest()}"
+
+
+def get_timeout():
+    return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300)
+
+
+def tag_versions(tags):
+    """Текущие версии тегов; отсутствующие версии создаются заново."""
+    keys = {tag: _tag_key(tag) for tag in tags}
+    stored = cache.get_many(list(keys.values()))
+    versions = {}
+    for tag, key in keys.items():
+        version = stored.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.set(key, version, None)
+        versions[tag] = version
+    return versions
+
+
+def _bump(tags):
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def invalidate(*tags):
+    """
+    Инвалидирует теги сразу и ещё раз после коммита транзакции.
+
+    Повтор после коммита закрывает гонку, когда параллельный запрос успел
+    закэшировать данные, прочитанные до фиксации изменений.
+    """
+    tags = [tag for tag in tags if tag]
+    if not tags:
+        return
+    _bump(tags)
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def is_cacheable_request(request):
+    """Кэшируются только анонимные GET/HEAD без запроса черновиков."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.META.get("HTTP_AUTHORIZATION"):
+        return False
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return False
+    return request.GET.get("drafts", "false").lower() != "true"
+
+
+def _build_response(request, entry):
+    response = HttpResponse(entry["content"], status=entry["status"])
+    for header, value in entry["headers"].items():
+        response[header] = value
+    response["X-Cache"] = "HIT"
+    last_modified = parse_http_date_safe(entry["headers"].get("Last-Modified", ""))
+    return (
+        get_conditional_response(
+            request,
+            etag=entry["headers"].get("ETag"),
+            last_modified=last_modified,
+            response=response,
+        )
+        or response
+    )
+
+
+def get_cached_response(request):
+    entry = cache.get(_entry_key(request))
+    if entry is None:
+        return None
+    current = tag_versions(entry["tags"])
+    if current != entry["tags"]:
+        return None
+    return _build_response(request, entry)
+
+
+def store_response(request, response, versions):
+    if request.method != "GET" or response.status_code not in CACHEABLE_STATUSES:
+        return
+    if hasattr(response, "render") and not response.is_rendered:
+        response.render()
+    entry = {
+        "content": response.content,
+        "status": response.status_code,
+        "headers": {
+            header: response[header]
+            for header in STORED_HEADERS
+            if response.has_header(header)
+        },
+        "tags": versions,
+    }
+    cache.set(_entry_key(request), entry, get_timeout())
+    response["X-Cache"] = "MISS"
+
+
+def serve(request, tags, get_response, should_cache=None):
+    """Отдаёт ответ из кэша либо вычисляет его через get_response и сохраняет."""
+    if not tags or not is_cacheable_request(request):
+        return get_response()
+
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+
+    # Версии фиксируются до вычисления ответа, чтобы инвалидация во время
+    # обработки запроса не «узаконила» устаревшие данные
+    versions = tag_versions(tags)
+    response = get_response()
+    if should_cache is None or should_cache(response):
+        store_response(request, response, versions)
+    return response
+
+
+def cache_response(tags):
+    """Декоратор функционального представления; tags — список или callable."""
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            view_tags = tags(request, *args, **kwargs) if callable(tags) else tags
+            return serve(
+                request, view_tags, lambda: view_func(request, *args, **kwargs)
+            )
+
+        return wrapped
+
+    return decorator
+
+
+class ResponseCacheMixin:
+    """
+    Примесь для представлений: кэширует анонимные GET-ответы.
+
+    Теги задаются атрибутом response_cache_tags или методом
+    get_response_cache_tags(); пустой список отключает кэш для запроса.
+    """
+
+    response_cache_tags = ()
+
+    def get_response_cache_tags(self, request, *args, **kwargs):
+        return list(self.response_cache_tags)
+
+    def should_cache_response(self, response):
+        # Черновики (например, детальная страница неопубликованного поста)
+        # в общий кэш не попадают
+        data = getattr(response, "data", None)
+        return not (isinstance(data, dict) and data.get("is_published") is False)
+
+    def dispatch(self, request, *args, **kwargs):
+        tags = self.get_response_cache_tags(request, *args, **kwargs)
+        return serve(
+            request,
+            tags,
+            lambda: super(ResponseCacheMixin, self).dispatch(request, *args, **kwargs),
+            self.should_cache_response,
+        )
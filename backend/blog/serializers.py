@@ -1,7 +1,6 @@
 import logging
 
 from django.conf import settings
-from django.db.models import Avg
 from rest_framework import serializers
 from rest_framework.settings import api_settings
 
@@ -160,7 +159,10 @@ class CustomImageField(serializers.ImageField):
 class TagSerializer(serializers.ModelSerializer):
     """Сериализатор для тегов."""
 
-    posts_count = serializers.IntegerField(read_only=True, required=False)
+    # Денормализованный счётчик опубликованных постов (без агрегации на чтении)
+    posts_count = serializers.IntegerField(
+        source="published_posts_count", read_only=True
+    )
 
     class Meta:
         model = Tag
@@ -176,7 +178,20 @@ class ShortLinkSerializer(serializers.ModelSerializer):
 
 
 class PostSerializer(serializers.ModelSerializer):
-    """Сериализатор для постов блога."""
+    """
+    Сериализатор для постов блога.
+
+    Параметр запроса ?body_format выбирает представление контента:
+    json (по умолчанию) — исходный документ Tiptap в body, html — готовый
+    body_html без body, both — оба поля.
+    """
+
+    BODY_FORMAT_QUERY_PARAM = "body_format"
+    BODY_FORMAT_FIELDS = {
+        "json": ("body",),
+        "html": ("body_html",),
+        "both": ("body", "body_html"),
+    }
 
     tags_details = TagSerializer(source="tags", many=True, read_only=True)
     tags = serializers.PrimaryKeyRelatedField(
@@ -184,6 +199,7 @@ class PostSerializer(serializers.ModelSerializer):
     )
     shortlink = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
+    rating_distribution = serializers.SerializerMethodField()
     # Используем наше кастомное поле
     image = CustomImageField(
         required=False, allow_null=True, use_url=True, max_length=None
@@ -197,6 +213,7 @@ class PostSerializer(serializers.ModelSerializer):
             "slug",
             "description",
             "body",
+            "body_html",
             "image",
             "tags",
             "tags_details",
@@ -206,52 +223,135 @@ class PostSerializer(serializers.ModelSerializer):
             "updated_at",
             "shortlink",
             "average_rating",
+            "rating_distribution",
             "sitemap_include",
             "sitemap_priority",
             "sitemap_changefreq",
         ]
 
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        body_format = (
+            request.query_params.get(self.BODY_FORMAT_QUERY_PARAM, "json").lower()
+            if request is not None and hasattr(request, "query_params")
+            else "json"
+        )
+        wanted = self.BODY_FORMAT_FIELDS.get(body_format, ("body",))
+        for name in ("body", "body_html"):
+            if name in wanted or name not in fields:
+                continue
+            if fields[name].read_only:
+                fields.pop(name)
+            else:
+                # body остаётся доступным для записи при любом формате ответа
+                fields[name].write_only = True
+        return fields
+
     def get_shortlink(self, obj: Post):
-        """Получить данные короткой ссылки поста, если она существует."""
-        try:
-            short_link_instance = obj.shortlinks.first()
+        """Получить данные основной короткой ссылки поста (без запросов к БД)."""
+        if not obj.short_code:
+            return None
 
-            if short_link_instance and short_link_instance.code:
-                request = self.context.get("request")
-                host = request.get_host() if request else None
-                protocol = "https" if request and request.is_secure() else "http"
-                base_url = str(protocol) + "://" + (str(host) if host else "")
+        request = self.context.get("request")
+        host = request.get_host() if request else None
+        protocol = "https" if request and request.is_secure() else "http"
+        base_url = str(protocol) + "://" + (str(host) if host else "")
 
-                relative_url = "/s/" + str(short_link_instance.code) + "/"
+        relative_url = "/s/" + str(obj.short_code) + "/"
 
-                return {
-                    "code": short_link_instance.code,
-                    "url": relative_url,
-                    "full_url": (base_url + relative_url) if base_url else None,
-                }
-            return None
-        except Exception as e:
-            logger.error(
-                "Ошибка при получении короткой ссылки для поста "
-                + str(obj.id)
-                + ": "
-                + str(e)
-            )
-            return None
+        return {
+            "code": obj.short_code,
+            "url": relative_url,
+            "full_url": (base_url + relative_url) if base_url else None,
+        }
 
     def get_average_rating(self, obj: Post):
-        """Получить среднюю оценку поста."""
-        avg_data = obj.ratings.aggregate(avg_score=Avg("score"))
-        avg_score = avg_data.get("avg_score")
+        """Получить среднюю оценку поста из денормализованных счётчиков."""
+        avg_score = obj.average_rating
         return round(avg_score, 1) if avg_score is not None else None
 
+    def get_rating_distribution(self, obj: Post):
+        """Число оценок каждого значения: {"1": n, ..., "5": n}, без запросов к БД."""
+        return {str(score): count for score, count in obj.rating_distribution.items()}
+
+
+class PostListSerializer(PostSerializer):
+    """Облегчённое представление поста для карточек в списках (без body)."""
+
+    # Колонки, которые нужно загрузить для карточки; используется в .only()
+    LIST_ONLY_FIELDS = (
+        "id",
+        "title",
+        "slug",
+        "description",
+        "image",
+        "first_published_at",
+        "is_published",
+        "updated_at",
+        "rating_count",
+        "rating_sum",
+        "short_code",
+    )
+
+    class Meta(PostSerializer.Meta):
+        fields = [
+            "id",
+            "title",
+            "slug",
+            "description",
+            "image",
+            "tags_details",
+            "first_published_at",
+            "is_published",
+            "updated_at",
+            "shortlink",
+            "average_rating",
+        ]
+
+
+class PostRatingSummarySerializer(serializers.ModelSerializer):
+    """Сводка рейтинга поста: агрегаты и распределение оценок без тела поста."""
+
+    ONLY_FIELDS = (
+        "id",
+        "slug",
+        "rating_count",
+        "rating_sum",
+        *Post.RATING_SCORE_FIELDS.values(),
+    )
+
+    average_rating = serializers.SerializerMethodField()
+    rating_distribution = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = ["id", "slug", "rating_count", "average_rating", "rating_distribution"]
+
+    get_average_rating = PostSerializer.get_average_rating
+    get_rating_distribution = PostSerializer.get_rating_distribution
+
 
 class RatingSerializer(serializers.ModelSerializer):
-    """Сериализатор для рейтинга поста."""
+    """Сериализатор для рейтинга поста.
+
+    Повторный голос того же user_hash не ошибка, а смена оценки:
+    create() делает upsert (см. Rating.upsert), поэтому проверка
+    уникальности пары (post, user_hash) отключена.
+    """
 
     class Meta:
         model = Rating
         fields = ["id", "post", "score", "user_hash", "created_at"]
+        validators = []
+
+    def create(self, validated_data):
+        rating, self.created = Rating.upsert(
+            validated_data["post"].pk,
+            validated_data["user_hash"],
+            validated_data["score"],
+        )
+        return rating
 
 
 # Сериализаторы для API Архива
@@ -274,3 +374,15 @@ class DayArchiveSerializer(serializers.Serializer):
 
     day = serializers.IntegerField()
     posts_count = serializers.IntegerField()
+
+
+class MonthArchiveTreeSerializer(MonthArchiveSerializer):
+    """Месяц дерева архива вместе с его днями."""
+
+    days = DayArchiveSerializer(many=True)
+
+
+class YearArchiveTreeSerializer(YearArchiveSerializer):
+    """Год дерева архива вместе с его месяцами."""
+
+    months = MonthArchiveTreeSerializer(many=True)
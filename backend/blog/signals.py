@@ -0,0 +1,83 @@
+"""Инвалидация кэша ответов API при изменении данных блога."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Post, Rating, ShortLink, Tag
+from .response_cache import (
+    ARCHIVE_TAG,
+    POSTS_TAG,
+    SHORTLINKS_TAG,
+    TAGS_TAG,
+    invalidate,
+    post_tag,
+)
+
+
+def _is_post_cascade(origin):
+    """True, если удаление запущено удалением поста (его сигнал сбросит всё сам)."""
+    return getattr(origin, "model", type(origin)) is Post
+
+
+def _post_slug(post_id):
+    return Post.objects.filter(pk=post_id).values_list("slug", flat=True).first()
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_slug(sender, instance, **kwargs):
+    """Запоминает прежний slug, чтобы сбросить кэш старого URL при переименовании."""
+    instance._previous_slug = _post_slug(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    previous_slug = getattr(instance, "_previous_slug", None) or instance.slug
+    tags = [POSTS_TAG, TAGS_TAG, post_tag(instance.slug), post_tag(previous_slug)]
+    # Архив хранит только даты публикации, короткие ссылки — только slug
+    if getattr(instance, "_archive_changed", True):
+        tags.append(ARCHIVE_TAG)
+    if previous_slug != instance.slug:
+        tags.append(SHORTLINKS_TAG)
+    invalidate(*tags)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    # Короткие ссылки поста удаляются каскадом, их сигналы пропускаются
+    tags = [POSTS_TAG, TAGS_TAG, SHORTLINKS_TAG, post_tag(instance.slug)]
+    if instance.archive_date is not None:
+        tags.append(ARCHIVE_TAG)
+    invalidate(*tags)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tags(sender, instance, action, **kwargs):
+    if not action.startswith("post_"):
+        return
+    tags = [POSTS_TAG, TAGS_TAG]
+    if isinstance(instance, Post):
+        tags.append(post_tag(instance.slug))
+    invalidate(*tags)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag(sender, instance, **kwargs):
+    # Названия тегов входят в карточки и страницы постов
+    invalidate(TAGS_TAG, POSTS_TAG)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_rating(sender, instance, origin=None, **kwargs):
+    if _is_post_cascade(origin):
+        return
+    invalidate(POSTS_TAG, post_tag(_post_slug(instance.post_id)))
+
+
+@receiver(post_save, sender=ShortLink)
+@receiver(post_delete, sender=ShortLink)
+def invalidate_shortlink(sender, instance, origin=None, **kwargs):
+    if _is_post_cascade(origin):
+        return
+    invalidate(SHORTLINKS_TAG, POSTS_TAG, post_tag(_post_slug(instance.post_id)))
@@ -0,0 +1,183 @@
+import datetime
+from io import StringIO
+
+import factory
+import pytest
+from blog.models import ArchiveBucket, Post, archive_period
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+MOSCOW = timezone.get_default_timezone()
+
+
+def moment(year, month, day, hour=12):
+    return datetime.datetime(year, month, day, hour, tzinfo=MOSCOW)
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(lambda: moment(2024, 3, 15))
+    is_published = True
+
+
+def buckets():
+    return {(b.year, b.month, b.day): b.count for b in ArchiveBucket.objects.all()}
+
+
+@pytest.mark.django_db
+def test_archive_buckets_follow_publish_redate_and_delete():
+    post = PostFactory()
+    PostFactory()
+    assert buckets() == {(2024, 3, 15): 2}
+
+    post.first_published_at = moment(2024, 4, 1)
+    post.save()
+    assert buckets() == {(2024, 3, 15): 1, (2024, 4, 1): 1}
+
+    post.is_published = False
+    post.save()
+    assert buckets() == {(2024, 3, 15): 1}
+
+    post.is_published = True
+    post.save()
+    post.delete()
+    assert buckets() == {(2024, 3, 15): 1}
+
+
+@pytest.mark.django_db
+def test_archive_bucket_uses_moscow_day():
+    # 22:30 UTC — уже следующий день по Москве
+    PostFactory(
+        first_published_at=datetime.datetime(
+            2024, 3, 15, 22, 30, tzinfo=datetime.timezone.utc
+        )
+    )
+    assert buckets() == {(2024, 3, 16): 1}
+
+
+@pytest.mark.django_db
+def test_draft_and_unrelated_update_do_not_touch_archive():
+    draft = PostFactory(is_published=False, first_published_at=None)
+    assert buckets() == {}
+    post = PostFactory()
+    post.title = "Новый заголовок"
+    post.save(update_fields=["title"])
+    draft.delete()
+    assert buckets() == {(2024, 3, 15): 1}
+
+
+@pytest.mark.django_db
+def test_bulk_create_and_rebuild_archive():
+    Post.objects.bulk_create(
+        [
+            Post(
+                title="a",
+                slug="a",
+                is_published=True,
+                first_published_at=moment(2023, 1, 2),
+            ),
+            Post(title="b", slug="b", is_published=False),
+        ]
+    )
+    assert buckets() == {(2023, 1, 2): 1}
+
+    # Массовый update минует Post.save — календарь чинится командой
+    Post.objects.update(is_published=True, first_published_at=moment(2023, 1, 3))
+    call_command("rebuild_archive", stdout=StringIO())
+    assert buckets() == {(2023, 1, 3): 2}
+
+
+@pytest.mark.django_db
+def test_archive_summaries_read_buckets_only():
+    PostFactory.create_batch(2)
+    PostFactory(first_published_at=moment(2024, 5, 1))
+    PostFactory(first_published_at=moment(2023, 12, 31))
+    client = APIClient()
+    with CaptureQueriesContext(connection) as queries:
+        years = client.get(reverse("blog_api:archive-year-summary")).json()
+        months = client.get(
+            reverse("blog_api:archive-month-summary", args=[2024])
+        ).json()
+        days = client.get(
+            reverse("blog_api:archive-day-summary", args=[2024, 3])
+        ).json()
+    assert years == [{"year": 2024, "posts_count": 3}, {"year": 2023, "posts_count": 1}]
+    assert months == [{"month": 3, "posts_count": 2}, {"month": 5, "posts_count": 1}]
+    assert days == [{"day": 15, "posts_count": 2}]
+    assert len(queries) == 3
+    assert not any('"blog_post"' in query["sql"] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_archive_tree_in_one_query(django_assert_num_queries):
+    PostFactory.create_batch(2)
+    PostFactory(first_published_at=moment(2024, 3, 20))
+    PostFactory(first_published_at=moment(2024, 5, 1))
+    PostFactory(first_published_at=moment(2023, 12, 31))
+    with django_assert_num_queries(1):
+        response = APIClient().get(reverse("blog_api:archive-tree"))
+    assert response.json() == [
+        {
+            "year": 2024,
+            "posts_count": 4,
+            "months": [
+                {
+                    "month": 3,
+                    "posts_count": 3,
+                    "days": [
+                        {"day": 15, "posts_count": 2},
+                        {"day": 20, "posts_count": 1},
+                    ],
+                },
+                {"month": 5, "posts_count": 1, "days": [{"day": 1, "posts_count": 1}]},
+            ],
+        },
+        {
+            "year": 2023,
+            "posts_count": 1,
+            "months": [
+                {"month": 12, "posts_count": 1, "days": [{"day": 31, "posts_count": 1}]}
+            ],
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "args, start, end",
+    [
+        ((2024, 3, 15), moment(2024, 3, 15, 0), moment(2024, 3, 16, 0)),
+        ((2024, 12), moment(2024, 12, 1, 0), moment(2025, 1, 1, 0)),
+        ((2024,), moment(2024, 1, 1, 0), moment(2025, 1, 1, 0)),
+    ],
+)
+def test_archive_period_is_half_open_in_moscow(args, start, end):
+    assert archive_period(*args) == (start, end)
+
+
+def test_archive_period_rejects_invalid_date():
+    with pytest.raises(ValueError):
+        archive_period(2024, 2, 30)
+
+
+@pytest.mark.django_db
+def test_archive_day_posts_uses_moscow_range_without_extra_count(
+    django_assert_num_queries,
+):
+    inside = PostFactory(first_published_at=moment(2024, 3, 15, 23))
+    PostFactory(first_published_at=moment(2024, 3, 16, 0))
+    PostFactory(first_published_at=moment(2024, 3, 14, 23))
+    url = reverse("blog_api:archive-day-posts", args=[2024, 3, 15])
+    # COUNT пагинатора, страница постов и теги — без отдельного COUNT для лога
+    with django_assert_num_queries(3) as queries:
+        response = APIClient().get(url)
+    assert [item["slug"] for item in response.data["results"]] == [inside.slug]
+    assert not any("cast_date" in query["sql"] for query in queries.captured_queries)
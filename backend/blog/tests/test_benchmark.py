@@ -0,0 +1,83 @@
+import pytest
+from blog.benchmark import (
+    compare_with_baseline,
+    percentile,
+    run_benchmarks,
+    seed_dataset,
+)
+from blog.models import ArchiveBucket, Post, Rating, ShortLink, Tag
+
+
+def snapshot():
+    return list(
+        Post.objects.order_by("slug").values_list(
+            "slug", "first_published_at", "rating_count", "rating_sum", "short_code"
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_seed_dataset_is_deterministic():
+    seed_dataset(posts=40, tags=5, ratings=300, seed=7)
+    first = snapshot()
+    assert Rating.objects.count() == 300
+    assert ShortLink.objects.count() == 40
+    assert sum(row[2] for row in first) == 300
+    # Календарь архива заполняется при вставке постов
+    assert sum(ArchiveBucket.objects.values_list("count", flat=True)) == (
+        Post.objects.filter(is_published=True).count()
+    )
+
+    Post.objects.all().delete()
+    Tag.objects.all().delete()
+    seed_dataset(posts=40, tags=5, ratings=300, seed=7)
+    assert snapshot() == first
+
+
+@pytest.mark.django_db
+def test_run_benchmarks_reports_every_endpoint():
+    seed_dataset(posts=40, tags=5, ratings=100)
+    report = run_benchmarks(iterations=2, warmup=0)
+    assert {
+        "posts_list",
+        "posts_detail",
+        "tags_list",
+        "archive_tree",
+        "shortlink_redirect",
+    } <= set(report["endpoints"])
+    # Поиск требует PostgreSQL
+    assert "posts_search" not in report["endpoints"]
+    for result in report["endpoints"].values():
+        assert result["queries"] >= 1
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+
+def test_compare_with_baseline():
+    meta = {"vendor": "sqlite", "dataset": {"posts": 1}, "cache": False}
+    baseline = {
+        "meta": meta,
+        "endpoints": {"a": {"p95_ms": 10.0, "queries": 3}},
+    }
+
+    def report(p95, queries):
+        return {"meta": meta, "endpoints": {"a": {"p95_ms": p95, "queries": queries}}}
+
+    assert compare_with_baseline(report(12.0, 3), baseline) == []
+    assert len(compare_with_baseline(report(20.0, 3), baseline)) == 1
+    assert len(compare_with_baseline(report(10.0, 4), baseline)) == 1
+    # На другой СУБД задержки не сравниваются, запросы — да
+    other = {**report(20.0, 4), "meta": {**meta, "vendor": "postgresql"}}
+    assert len(compare_with_baseline(other, baseline)) == 1
+    # Эндпоинт без базовой линии не проходит незамеченным
+    extra = report(10.0, 3)
+    extra["endpoints"]["b"] = {"p95_ms": 1.0, "queries": 1}
+    assert compare_with_baseline(extra, baseline) == [
+        "b: нет в базовой линии (обновите её с --update-baseline)"
+    ]
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile([5], 0.99) == 5
@@ -0,0 +1,137 @@
+import factory
+import pytest
+from blog.models import Post, Rating, Tag
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class TagFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Tag
+
+    name = factory.Sequence(lambda n: f"tag{n}")
+    slug = factory.Sequence(lambda n: f"tag{n}")
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+@pytest.mark.django_db
+def test_post_detail_returns_304_for_matching_etag(django_assert_max_num_queries):
+    post = PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:post-detail", args=[post.slug])
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified")
+
+    # Только запрос валидаторов, без загрузки и сериализации поста
+    with django_assert_max_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_post_detail_etag_changes_after_rating():
+    post = PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:post-detail", args=[post.slug])
+    etag = client.get(url)["ETag"]
+    Rating.objects.create(post=post, score=5, user_hash="a")
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_post_detail_if_modified_since():
+    post = PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:post-detail", args=[post.slug])
+    last_modified = client.get(url)["Last-Modified"]
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_post_list_etag_changes_when_post_is_published():
+    PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:post-list")
+    etag = client.get(url)["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    PostFactory()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data["count"] == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("remove", ["unpublish", "delete"])
+def test_post_list_is_not_stale_when_newest_post_leaves(remove):
+    PostFactory()
+    newest = PostFactory()
+    tag = TagFactory()
+    newest.tags.add(tag)
+    client = APIClient()
+    for url in (
+        reverse("blog_api:post-list"),
+        reverse("blog_api:tag-posts", args=[tag.slug]),
+    ):
+        response = client.get(url)
+        # Для списков только ETag: дата по MAX(updated_at) может пойти назад
+        assert not response.has_header("Last-Modified")
+
+    url = reverse("blog_api:post-list")
+    since = client.get(reverse("blog_api:post-detail", args=[newest.slug]))[
+        "Last-Modified"
+    ]
+    if remove == "unpublish":
+        newest.is_published = False
+        newest.save()
+    else:
+        newest.delete()
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == 200
+    assert response.data["count"] == 1
+
+
+@pytest.mark.django_db
+def test_post_list_etag_differs_between_pages():
+    PostFactory.create_batch(11)
+    client = APIClient()
+    url = reverse("blog_api:post-list")
+    first = client.get(url)["ETag"]
+    second = client.get(url, {"page": 2})["ETag"]
+    assert first != second
+
+
+@pytest.mark.django_db
+def test_tag_list_and_posts_support_conditional_get():
+    tag = TagFactory()
+    PostFactory().tags.add(tag)
+    client = APIClient()
+    for url in (
+        reverse("blog_api:tag-list"),
+        reverse("blog_api:tag-posts", args=[tag.slug]),
+    ):
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    url = reverse("blog_api:tag-list")
+    etag = client.get(url)["ETag"]
+    tag.name = "Переименован"
+    tag.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,83 @@
+import factory
+import pytest
+from blog.models import Post
+from django.db import connection
+from django.utils import timezone
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Планы EXPLAIN проверяются на PostgreSQL"
+)
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+@pytest.fixture
+def posts():
+    PostFactory.create_batch(5)
+    PostFactory.create_batch(2, sitemap_include=False)
+    PostFactory.create_batch(3, is_published=False, first_published_at=None)
+
+
+def plan(queryset):
+    """План запроса без права на seq scan: на крошечной таблице он всегда дешевле."""
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+def test_post_indexes_exist_in_database():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, "blog_post")
+    names = set(constraints)
+    assert {
+        "blog_post_published_feed_idx",
+        "blog_post_sitemap_feed_idx",
+        "blog_post_drafts_idx",
+    } <= names
+    # slug уже проиндексирован ограничением UNIQUE
+    assert "blog_post_slug_cdb902_idx" not in names
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_feed_uses_published_partial_index(posts):
+    queryset = Post.objects.filter(is_published=True).order_by(
+        "-first_published_at", "-id"
+    )[:10]
+    assert "blog_post_published_feed_idx" in plan(queryset)
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_archive_range_uses_published_partial_index(posts):
+    today = timezone.localdate()
+    queryset = Post.objects.published_in(today.year, today.month)
+    assert "blog_post_published_feed_idx" in plan(queryset)
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_sitemap_uses_sitemap_partial_index(posts):
+    queryset = Post.objects.filter(is_published=True, sitemap_include=True).order_by(
+        "-first_published_at", "-id"
+    )
+    assert "blog_post_sitemap_feed_idx" in plan(queryset)
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_drafts_use_drafts_partial_index(posts):
+    queryset = Post.objects.filter(is_published=False).order_by(
+        "-first_published_at", "-id"
+    )
+    assert "blog_post_drafts_idx" in plan(queryset)
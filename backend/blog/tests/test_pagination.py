@@ -0,0 +1,101 @@
+import datetime
+
+import factory
+import pytest
+from blog.models import Post, Tag
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class TagFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Tag
+
+    name = factory.Sequence(lambda n: f"tag{n}")
+    slug = factory.Sequence(lambda n: f"tag{n}")
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+def collect_cursor_pages(client, url, params):
+    """Проходит все страницы по ссылкам next и возвращает слаги постов."""
+    slugs = []
+    response = client.get(url, params)
+    while True:
+        assert response.status_code == 200
+        assert "count" not in response.data
+        slugs.extend(item["slug"] for item in response.data["results"])
+        if not response.data["next"]:
+            return slugs
+        response = client.get(response.data["next"])
+
+
+@pytest.mark.django_db
+def test_post_list_cursor_mode_walks_all_posts_with_equal_dates():
+    """Тест: посты с одинаковой датой не теряются и не дублируются между страницами."""
+    moment = timezone.now()
+    posts = PostFactory.create_batch(25, first_published_at=moment)
+    client = APIClient()
+    slugs = collect_cursor_pages(
+        client, reverse("blog_api:post-list"), {"pagination": "cursor"}
+    )
+    expected = [p.slug for p in sorted(posts, key=lambda p: p.id, reverse=True)]
+    assert slugs == expected
+
+
+@pytest.mark.django_db
+def test_post_list_page_number_mode_is_default():
+    """Тест: без параметров сохраняется прежний page-number ответ."""
+    PostFactory.create_batch(3)
+    client = APIClient()
+    response = client.get(reverse("blog_api:post-list"))
+    assert response.status_code == 200
+    assert response.data["count"] == 3
+    assert "previous" in response.data
+
+
+@pytest.mark.django_db
+def test_post_list_invalid_cursor_returns_404():
+    client = APIClient()
+    response = client.get(reverse("blog_api:post-list"), {"cursor": "не-курсор"})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_tag_posts_cursor_mode():
+    """Тест: посты тега отдаются постранично в keyset-режиме."""
+    tag = TagFactory()
+    now = timezone.now()
+    for offset in range(12):
+        post = PostFactory(first_published_at=now - datetime.timedelta(hours=offset))
+        post.tags.add(tag)
+    client = APIClient()
+    url = reverse("blog_api:tag-posts", args=[tag.slug])
+    slugs = collect_cursor_pages(client, url, {"pagination": "cursor"})
+    assert len(slugs) == 12
+    assert len(set(slugs)) == 12
+
+
+@pytest.mark.django_db
+def test_archive_day_posts_cursor_mode():
+    """Тест: посты дня архива отдаются постранично в keyset-режиме."""
+    day = timezone.make_aware(datetime.datetime(2024, 3, 15, 12, 0))
+    PostFactory.create_batch(11, first_published_at=day)
+    client = APIClient()
+    url = reverse("blog_api:archive-day-posts", args=[2024, 3, 15])
+    response = client.get(url, {"pagination": "cursor"})
+    assert len(response.data["results"]) == 10
+    assert response.data["next"]
+    response = client.get(response.data["next"])
+    assert len(response.data["results"]) == 1
+    assert response.data["next"] is None
@@ -6,6 +6,9 @@ import pytest
 from blog.models import Post, Tag
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
 from PIL import Image as PilImage
 from rest_framework.test import APIClient
@@ -162,3 +165,183 @@ def test_post_image_non_webp_validation_fail():
 def test_post_body_text_for_search_update():
     """Тест: Проверка обновления поля body_text_for_search при сохранении."""
     # Закомментировано, если поле body_text_for_search не обновляется автоматически
+
+
+@pytest.mark.django_db
+def test_post_list_uses_slim_representation():
+    """Тест: список постов отдаёт карточки без body и sitemap-полей."""
+    tag = TagFactory()
+    post = PostFactory()
+    post.tags.add(tag)
+    client = APIClient()
+    response = client.get(reverse("blog_api:post-list"))
+    assert response.status_code == 200
+    item = response.data["results"][0]
+    assert item["slug"] == post.slug
+    assert item["tags_details"][0]["slug"] == tag.slug
+    assert "body" not in item
+    assert "sitemap_priority" not in item
+
+
+@pytest.mark.django_db
+def test_post_list_does_not_load_body_columns():
+    """Тест: выборка списка постов не читает body и body_text_for_search."""
+    PostFactory.create_batch(3)
+    client = APIClient()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("blog_api:post-list"))
+    assert response.status_code == 200
+    post_selects = [
+        q["sql"] for q in ctx.captured_queries if 'FROM "blog_post"' in q["sql"]
+    ]
+    assert post_selects
+    for sql in post_selects:
+        assert '"blog_post"."body"' not in sql
+        assert '"blog_post"."body_text_for_search"' not in sql
+
+
+@pytest.mark.django_db
+def test_post_detail_still_returns_body():
+    """Тест: детальная страница поста по-прежнему содержит body."""
+    post = PostFactory()
+    client = APIClient()
+    response = client.get(reverse("blog_api:post-detail", args=[post.slug]))
+    assert response.status_code == 200
+    assert "body" in response.data
+
+
+@pytest.mark.django_db
+def test_post_bulk_create_fills_search_text():
+    """Тест: bulk_create заполняет body_text_for_search так же, как save()."""
+    body = {
+        "type": "doc",
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": "привет"}]}
+        ],
+    }
+    Post.objects.bulk_create([Post(title="Bulk", slug="bulk", body=body)])
+    assert Post.objects.get(slug="bulk").body_text_for_search == "привет"
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Полнотекстовый поиск требует PostgreSQL"
+)
+@pytest.mark.django_db
+def test_post_search_uses_stored_vector():
+    """Тест: поиск находит пост по сохранённому search_vector."""
+    PostFactory(title="Муссоны и пассаты")
+    PostFactory(title="Другая тема")
+    client = APIClient()
+    response = client.get(reverse("blog_api:post-list"), {"search": "муссоны"})
+    assert response.status_code == 200
+    assert [item["title"] for item in response.data["results"]] == ["Муссоны и пассаты"]
+
+
+@pytest.mark.django_db
+def test_post_list_filters_by_all_tags():
+    """Тест: ?tags=a,b (mode=all) — посты сразу со всеми тегами."""
+    python, django, other = TagFactory(), TagFactory(), TagFactory()
+    both = PostFactory()
+    both.tags.add(python, django, other)
+    PostFactory().tags.add(python)
+    PostFactory().tags.add(django)
+    client = APIClient()
+    url = reverse("blog_api:post-list")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, {"tags": f"{python.slug},{django.slug}"})
+    assert response.status_code == 200
+    assert [item["slug"] for item in response.data["results"]] == [both.slug]
+    # Один подзапрос с GROUP BY по таблице связей, а не соединение на каждый тег
+    sql = next(q["sql"] for q in ctx.captured_queries if "GROUP BY" in q["sql"])
+    assert sql.count('"blog_post_tags"') == 1
+
+    response = client.get(url, {"tags": f"{python.slug},unknown"})
+    assert response.data["count"] == 0
+
+
+@pytest.mark.django_db
+def test_post_list_filters_by_any_tag():
+    """Тест: mode=any — посты хотя бы с одним тегом, без дублей."""
+    python, django = TagFactory(), TagFactory()
+    both = PostFactory()
+    both.tags.add(python, django)
+    only_python = PostFactory()
+    only_python.tags.add(python)
+    PostFactory()
+    response = APIClient().get(
+        reverse("blog_api:post-list"),
+        {"tags": f"{python.slug},{django.slug},unknown", "mode": "any"},
+    )
+    assert response.status_code == 200
+    assert sorted(item["slug"] for item in response.data["results"]) == sorted(
+        [both.slug, only_python.slug]
+    )
+
+
+@pytest.mark.django_db
+def test_post_list_rejects_unknown_tag_mode():
+    """Тест: неизвестный mode — ошибка 400."""
+    response = APIClient().get(
+        reverse("blog_api:post-list"), {"tags": "a", "mode": "some"}
+    )
+    assert response.status_code == 400
+    assert "mode" in response.data["message"]
+
+
+@pytest.mark.django_db
+def test_post_batch_by_slugs_preserves_requested_order(django_assert_num_queries):
+    """Тест: batch по slug — порядок запроса, черновики и неизвестные в missing."""
+    tag = TagFactory()
+    first, second, third = PostFactory.create_batch(3)
+    first.tags.add(tag)
+    draft = PostFactory(is_published=False)
+    slugs = [third.slug, "unknown", first.slug, draft.slug, second.slug, third.slug]
+    client = APIClient()
+    # Посты и их теги — два запроса независимо от числа slug
+    with django_assert_num_queries(2):
+        response = client.get(
+            reverse("blog_api:post-batch"), {"slugs": ",".join(slugs)}
+        )
+    assert response.status_code == 200
+    assert [item["slug"] for item in response.data["results"]] == [
+        third.slug,
+        first.slug,
+        second.slug,
+    ]
+    assert response.data["results"][1]["tags_details"][0]["slug"] == tag.slug
+    assert "body" not in response.data["results"][0]
+    assert response.data["missing"] == ["unknown", draft.slug]
+
+
+@pytest.mark.django_db
+def test_post_batch_by_ids():
+    """Тест: batch по id для разрешения коротких ссылок пачкой."""
+    first, second = PostFactory.create_batch(2)
+    response = APIClient().get(
+        reverse("blog_api:post-batch"), {"ids": f"{second.pk},{first.pk},999999"}
+    )
+    assert response.status_code == 200
+    assert [item["id"] for item in response.data["results"]] == [second.pk, first.pk]
+    assert response.data["missing"] == [999999]
+
+
+@pytest.mark.django_db
+def test_post_batch_validates_parameters():
+    """Тест: batch требует ровно один параметр, числовые id и ограничивает размер."""
+    client = APIClient()
+    url = reverse("blog_api:post-batch")
+    assert client.get(url).status_code == 400
+    assert client.get(url, {"slugs": "a", "ids": "1"}).status_code == 400
+    assert client.get(url, {"ids": "1,x"}).status_code == 400
+    too_many = ",".join(f"post-{i}" for i in range(51))
+    assert client.get(url, {"slugs": too_many}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_post_with_reserved_looking_slug_is_retrievable():
+    """Тест: списочные эндпоинты не перекрывают посты со служебными slug."""
+    for slug in ("batch", "ratings", "top-rated"):
+        post = PostFactory(slug=slug)
+        response = APIClient().get(reverse("blog_api:post-detail", args=[slug]))
+        assert response.status_code == 200
+        assert response.data["id"] == post.pk
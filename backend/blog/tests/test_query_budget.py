@@ -0,0 +1,95 @@
+import logging
+
+import factory
+import pytest
+from blog.models import Post, Tag
+from blog.query_budget import QueryBudgetExceeded, resolve_budget, with_query_budget
+from blog.views import ArchiveTreeView, PostViewSet, TagViewSet
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class TagFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Tag
+
+    name = factory.Sequence(lambda n: f"tag{n}")
+    slug = factory.Sequence(lambda n: f"tag{n}")
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+def test_resolve_budget_from_decorator_action_and_class():
+    factory_ = RequestFactory()
+    get = factory_.get("/")
+
+    @with_query_budget(3)
+    def view(request):
+        return None
+
+    assert resolve_budget(get, view) == 3
+    assert resolve_budget(get, PostViewSet.as_view({"get": "list"})) == 6
+    assert resolve_budget(get, PostViewSet.as_view({"get": "related"})) == 4
+    # HEAD обслуживается тем же action, что и GET
+    head = factory_.head("/")
+    assert resolve_budget(head, TagViewSet.as_view({"get": "posts"})) == 7
+    assert resolve_budget(get, ArchiveTreeView.as_view()) == 2
+    # Запись без объявленного бюджета не проверяется
+    post = factory_.post("/")
+    assert resolve_budget(post, PostViewSet.as_view({"post": "create"})) is None
+
+
+@pytest.mark.django_db
+def test_read_endpoints_fit_their_budgets():
+    tags = TagFactory.create_batch(3)
+    for post in PostFactory.create_batch(15):
+        post.tags.add(*tags)
+    post = Post.objects.first()
+    today = timezone.localdate()
+    client = APIClient()
+    # В тестах QUERY_BUDGET_MODE = "raise": превышение уронит запрос
+    for url in (
+        reverse("blog_api:post-list"),
+        reverse("blog_api:post-list") + f"?tags={tags[0].slug},{tags[1].slug}",
+        reverse("blog_api:post-detail", args=[post.slug]),
+        reverse("blog_api:post-related", args=[post.slug]),
+        reverse("blog_api:post-ratings") + f"?slugs={post.slug}",
+        reverse("blog_api:post-top-rated"),
+        reverse("blog_api:tag-list"),
+        reverse("blog_api:tag-posts", args=[tags[0].slug]),
+        reverse("blog_api:archive-tree"),
+        reverse("blog_api:archive-year-summary"),
+        reverse(
+            "blog_api:archive-day-posts", args=[today.year, today.month, today.day]
+        ),
+    ):
+        assert client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_exceeded_budget_raises_in_tests(monkeypatch):
+    monkeypatch.setattr(ArchiveTreeView, "query_budget", 0)
+    with pytest.raises(QueryBudgetExceeded, match="бюджете 0"):
+        APIClient().get(reverse("blog_api:archive-tree"))
+
+
+@pytest.mark.django_db
+def test_exceeded_action_budget_is_logged_in_log_mode(settings, monkeypatch, caplog):
+    settings.QUERY_BUDGET_MODE = "log"
+    monkeypatch.setattr(TagViewSet.posts, "query_budget", 1)
+    tag = TagFactory()
+    with caplog.at_level(logging.WARNING, logger="blog.query_budget"):
+        response = APIClient().get(reverse("blog_api:tag-posts", args=[tag.slug]))
+    assert response.status_code == 200
+    assert "SQL-запросов при бюджете 1" in caplog.text
@@ -0,0 +1,136 @@
+from io import StringIO
+
+import factory
+import pytest
+from blog.models import Post, PostRanking, Rating
+from blog.ranking import bayesian_average
+from blog.rating_buffer import RatingBuffer
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+def vote(post, *scores):
+    for index, score in enumerate(scores):
+        Rating.objects.create(post=post, score=score, user_hash=f"u{index}")
+
+
+def ranking():
+    return list(PostRanking.objects.values_list("post_id", "score", "rating_count"))
+
+
+def assert_matches_full_rebuild():
+    incremental = ranking()
+    PostRanking.rebuild()
+    assert incremental == ranking()
+
+
+def test_bayesian_average_damps_few_votes():
+    assert bayesian_average(0, 0, 3.0, 5) == 3.0
+    single_five = bayesian_average(5, 1, 3.0, 5)
+    many_fours = bayesian_average(4 * 20, 20, 3.0, 5)
+    assert single_five == pytest.approx(20 / 6)
+    assert many_fours > single_five
+
+
+@pytest.mark.django_db
+def test_ranking_follows_votes_and_publication(settings):
+    settings.TOP_RATED_MIN_VOTES = 2
+    post = PostFactory()
+    vote(post, 5)
+    # Одного голоса мало для рейтинга
+    assert ranking() == []
+
+    Rating.upsert(post.pk, "late", 4)
+    assert ranking() == [(post.pk, bayesian_average(9, 2, 3.0, 5), 2)]
+    assert_matches_full_rebuild()
+
+    Rating.objects.get(post=post, user_hash="u0").delete()
+    assert ranking() == []
+
+    vote(post, 5)
+    post.is_published = False
+    post.save()
+    assert ranking() == []
+    post.is_published = True
+    post.save()
+    assert [row[0] for row in ranking()] == [post.pk]
+    assert_matches_full_rebuild()
+
+
+@pytest.mark.django_db
+def test_buffered_votes_update_ranking_on_flush():
+    post = PostFactory()
+    buffer = RatingBuffer(max_items=100, start_worker=False)
+    buffer.add(post.pk, "a", 5)
+    buffer.add(post.pk, "b", 3)
+    assert ranking() == []
+    buffer.flush()
+    assert ranking() == [(post.pk, bayesian_average(8, 2, 3.0, 5), 2)]
+
+
+@pytest.mark.django_db
+def test_top_rated_endpoint_prefers_confident_ratings(django_assert_max_num_queries):
+    lucky = PostFactory()
+    vote(lucky, 5)
+    solid = PostFactory()
+    vote(solid, 5, 5, 4, 5, 4, 5, 4, 5)
+    weak = PostFactory()
+    vote(weak, 2, 1, 2)
+    PostFactory()
+    draft = PostFactory(is_published=False, first_published_at=None)
+    vote(draft, 5, 5, 5, 5, 5, 5, 5, 5, 5)
+
+    url = reverse("blog_api:post-top-rated")
+    # Топ с постами и теги карточек
+    with django_assert_max_num_queries(2):
+        response = APIClient().get(url)
+    assert response.status_code == 200
+    assert [card["slug"] for card in response.data] == [
+        solid.slug,
+        lucky.slug,
+        weak.slug,
+    ]
+    assert "body" not in response.data[0]
+
+    response = APIClient().get(url, {"limit": 1})
+    assert [card["slug"] for card in response.data] == [solid.slug]
+    assert APIClient().get(url, {"limit": 0}).status_code == 400
+    assert APIClient().get(url, {"limit": "x"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_rebuild_post_rankings_command():
+    post = PostFactory()
+    vote(post, 4, 5)
+    PostRanking.objects.all().delete()
+    out = StringIO()
+    call_command("rebuild_post_rankings", stdout=out)
+    assert ranking() == [(post.pk, bayesian_average(9, 2, 3.0, 5), 2)]
+    assert "1" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_recalculate_post_ratings_refreshes_only_given_posts():
+    post, other = PostFactory(), PostFactory()
+    vote(post, 5, 5)
+    vote(other, 1)
+    Post.objects.update(rating_count=0, rating_sum=0)
+    PostRanking.objects.filter(post=other).update(score=0.5)
+    call_command("recalculate_post_ratings", slug=[post.slug], stdout=StringIO())
+    assert dict(PostRanking.objects.values_list("post_id", "score")) == {
+        post.pk: bayesian_average(10, 2, 3.0, 5),
+        other.pk: 0.5,
+    }
@@ -1,6 +1,18 @@
+import time
+from io import StringIO
+
 import factory
 import pytest
-from blog.models import Post, Tag
+from blog import rating_buffer
+from blog.models import Post, Rating, Tag
+from blog.rating_buffer import RatingBuffer
+from blog.serializers import PostSerializer
+from blog.throttling import RatingTokenBucketThrottle, local_buckets
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from rest_framework.test import APIClient
 
 
@@ -41,3 +53,340 @@ class TestRatingAPI:
         # assert response.data["score"] == 5
         # assert response.data["user_hash"] == "abc123"
         pass
+
+
+@pytest.mark.django_db
+def test_rating_create_updates_post_counters():
+    post = PostFactory()
+    Rating.objects.create(post=post, score=5, user_hash="a")
+    Rating.objects.create(post=post, score=2, user_hash="b")
+    post.refresh_from_db()
+    assert post.rating_count == 2
+    assert post.rating_sum == 7
+    assert post.average_rating == 3.5
+
+
+@pytest.mark.django_db
+def test_rating_update_and_delete_adjust_post_counters():
+    post = PostFactory()
+    rating = Rating.objects.create(post=post, score=5, user_hash="a")
+    rating.score = 3
+    rating.save()
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (1, 3)
+
+    rating.delete()
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (0, 0)
+    assert post.average_rating is None
+
+
+@pytest.mark.django_db
+def test_rating_delete_with_drifted_counters_does_not_go_negative():
+    post = PostFactory()
+    rating = Rating.objects.create(post=post, score=5, user_hash="a")
+    # Счётчики сброшены в обход сигналов
+    Post.objects.filter(pk=post.pk).update(
+        rating_count=0, rating_sum=0, rating_5_count=0
+    )
+    rating.delete()
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum, post.rating_5_count) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_post_save_does_not_overwrite_rating_counters():
+    post = PostFactory()
+    stale = Post.objects.get(pk=post.pk)
+    Rating.objects.create(post=post, score=4, user_hash="a")
+    stale.title = "Новый заголовок"
+    stale.save()
+    post.refresh_from_db()
+    assert post.title == "Новый заголовок"
+    assert (post.rating_count, post.rating_sum) == (1, 4)
+
+
+@pytest.mark.django_db
+def test_post_copy_via_pk_none_is_inserted():
+    post = PostFactory()
+    Rating.objects.create(post=post, score=4, user_hash="a")
+    post.refresh_from_db()
+    post.pk = None
+    post.slug = "copy"
+    post.save()
+    assert post.pk is not None
+    assert Post.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_saving_deferred_instance_does_not_load_deferred_fields(
+    django_assert_max_num_queries,
+):
+    post = PostFactory()
+    Rating.objects.create(post=post, score=4, user_hash="a")
+    partial = Post.objects.only("id", "title", "is_published").get(pk=post.pk)
+    partial.title = "Новый заголовок"
+    # Отложенные поля не дочитываются по одному: UPDATE, чтение прежнего
+    # состояния для архива и slug для кэша (плюс точки сохранения)
+    with django_assert_max_num_queries(7):
+        partial.save()
+    post.refresh_from_db()
+    assert post.title == "Новый заголовок"
+    assert (post.rating_count, post.rating_sum) == (1, 4)
+
+
+@pytest.mark.django_db
+def test_serializer_average_rating_runs_no_queries(django_assert_num_queries):
+    post = PostFactory()
+    Rating.objects.create(post=post, score=4, user_hash="a")
+    Rating.objects.create(post=post, score=5, user_hash="b")
+    post = Post.objects.get(pk=post.pk)
+    with django_assert_num_queries(0):
+        value = PostSerializer().get_average_rating(post)
+    assert value == 4.5
+
+
+@pytest.mark.django_db
+def test_recalculate_post_ratings_command():
+    post = PostFactory()
+    Rating.objects.create(post=post, score=4, user_hash="a")
+    Post.objects.filter(pk=post.pk).update(
+        rating_count=0, rating_sum=0, rating_4_count=0, rating_1_count=7
+    )
+    call_command("recalculate_post_ratings", stdout=StringIO())
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (1, 4)
+    assert post.rating_distribution == {1: 0, 2: 0, 3: 0, 4: 1, 5: 0}
+
+
+@pytest.mark.django_db
+def test_rating_distribution_follows_votes():
+    post = PostFactory()
+    rating = Rating.objects.create(post=post, score=5, user_hash="a")
+    Rating.objects.create(post=post, score=5, user_hash="b")
+    Rating.upsert(post.pk, "c", 2)
+    Rating.upsert(post.pk, "b", 3)
+    rating.score = 1
+    rating.save()
+    post.refresh_from_db()
+    assert post.rating_distribution == {1: 1, 2: 1, 3: 1, 4: 0, 5: 0}
+
+    rating.delete()
+    post.refresh_from_db()
+    assert post.rating_distribution == {1: 0, 2: 1, 3: 1, 4: 0, 5: 0}
+    assert sum(post.rating_distribution.values()) == post.rating_count
+
+
+@pytest.mark.django_db
+def test_post_detail_includes_rating_distribution():
+    post = PostFactory()
+    Rating.objects.create(post=post, score=4, user_hash="a")
+    Rating.objects.create(post=post, score=4, user_hash="b")
+    response = APIClient().get(reverse("blog_api:post-detail", args=[post.slug]))
+    assert response.status_code == 200
+    assert response.json()["rating_distribution"] == {
+        "1": 0,
+        "2": 0,
+        "3": 0,
+        "4": 2,
+        "5": 0,
+    }
+    # В карточках списка распределения нет
+    response = APIClient().get(reverse("blog_api:post-list"))
+    assert "rating_distribution" not in response.json()["results"][0]
+
+
+@pytest.mark.django_db
+def test_ratings_endpoint_reads_counters_without_aggregation():
+    first, second = PostFactory(), PostFactory()
+    draft = PostFactory(is_published=False)
+    Rating.objects.create(post=first, score=5, user_hash="a")
+    Rating.objects.create(post=first, score=3, user_hash="b")
+    url = reverse("blog_api:post-ratings")
+    slugs = ",".join([second.slug, first.slug, draft.slug, "nope"])
+    with CaptureQueriesContext(connection) as ctx:
+        response = APIClient().get(url, {"slugs": slugs})
+    assert response.status_code == 200
+    assert len(ctx.captured_queries) == 1
+    assert "blog_rating" not in ctx.captured_queries[0]["sql"]
+    data = response.json()
+    assert [row["slug"] for row in data["results"]] == [second.slug, first.slug]
+    assert data["results"][1] == {
+        "id": first.pk,
+        "slug": first.slug,
+        "rating_count": 2,
+        "average_rating": 4.0,
+        "rating_distribution": {"1": 0, "2": 0, "3": 1, "4": 0, "5": 1},
+    }
+    assert data["missing"] == [draft.slug, "nope"]
+
+    response = APIClient().get(url, {"ids": f"{first.pk},x"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_rating_api_upserts_repeat_vote():
+    post = PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:rating-list")
+    data = {"post": post.pk, "score": 5, "user_hash": "abc"}
+    response = client.post(url, data, format="json")
+    assert response.status_code == 201
+    created_at = response.data["created_at"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(url, {**data, "score": 2}, format="json")
+    assert response.status_code == 200
+    assert response.data["score"] == 2
+    assert response.data["created_at"] == created_at
+    assert any("ON CONFLICT" in query["sql"] for query in ctx.captured_queries)
+
+    assert Rating.objects.filter(post=post).count() == 1
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (1, 2)
+
+
+@pytest.mark.django_db
+def test_rating_upsert_keeps_counters_consistent():
+    post = PostFactory()
+    _, created = Rating.upsert(post.pk, "a", 4)
+    assert created
+    Rating.upsert(post.pk, "b", 3)
+    rating, created = Rating.upsert(post.pk, "a", 1)
+    assert not created
+    Rating.upsert(post.pk, "a", 1)
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (2, 4)
+    # Счётчики совпадают с полным пересчётом
+    Post.objects.filter(pk=post.pk).recalculate_ratings()
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (2, 4)
+    assert rating.pk == Rating.objects.get(post=post, user_hash="a").pk
+
+
+@pytest.mark.django_db
+def test_rating_upsert_for_missing_post():
+    with pytest.raises(Post.DoesNotExist):
+        Rating.upsert(999999, "a", 3)
+    assert not Rating.objects.exists()
+
+
+@pytest.mark.django_db
+def test_buffered_rating_api_defers_writes_until_flush(settings, monkeypatch):
+    settings.RATING_BUFFER_ENABLED = True
+    buffer = RatingBuffer(max_items=100, start_worker=False)
+    monkeypatch.setattr(rating_buffer, "_buffer", buffer)
+    post = PostFactory()
+    Rating.objects.create(post=post, score=1, user_hash="old")
+    client = APIClient()
+    url = reverse("blog_api:rating-list")
+    for user_hash, score in (("a", 5), ("a", 3), ("b", 4), ("old", 2)):
+        response = client.post(
+            url, {"post": post.pk, "score": score, "user_hash": user_hash}
+        )
+        assert response.status_code == 202
+    assert Rating.objects.count() == 1
+    # Повторный голос внутри окна сливается с предыдущим
+    assert len(buffer) == 3
+
+    assert buffer.flush() == 3
+    assert dict(Rating.objects.values_list("user_hash", "score")) == {
+        "a": 3,
+        "b": 4,
+        "old": 2,
+    }
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (3, 9)
+    assert post.rating_distribution == {1: 0, 2: 1, 3: 1, 4: 1, 5: 0}
+    assert buffer.flush() == 0
+
+
+@pytest.mark.django_db
+def test_rating_buffer_flushes_when_full_and_skips_deleted_posts():
+    buffer = RatingBuffer(max_items=2, start_worker=False)
+    post = PostFactory()
+    buffer.add(999999, "a", 5)
+    assert len(buffer) == 1
+    buffer.add(post.pk, "a", 5)
+    assert len(buffer) == 0
+    assert list(Rating.objects.values_list("post_id", "score")) == [(post.pk, 5)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rating_buffer_worker_flushes_within_interval():
+    post = PostFactory()
+    buffer = RatingBuffer(interval_ms=20, max_items=100)
+    buffer.add(post.pk, "a", 4)
+    # Базу из основного потока не читаем, пока пишет фоновый: SQLite в памяти
+    # блокирует таблицы между соединениями
+    deadline = time.monotonic() + 5
+    while len(buffer) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(buffer) == 0
+    assert buffer.close() == 0
+    post.refresh_from_db()
+    assert (post.rating_count, post.rating_sum) == (1, 4)
+
+
+@pytest.fixture
+def throttle_clock(settings, monkeypatch):
+    settings.RATING_THROTTLE_IP_RATE = "5/min"
+    settings.RATING_THROTTLE_USER_RATE = "2/min"
+    local_buckets.clear()
+    clock = [1000.0]
+    monkeypatch.setattr(RatingTokenBucketThrottle, "timer", lambda self: clock[0])
+    yield clock
+    local_buckets.clear()
+
+
+def rate(client, post, user_hash, ip="10.0.0.1"):
+    return client.post(
+        reverse("blog_api:rating-list"),
+        {"post": post.pk, "score": 4, "user_hash": user_hash},
+        format="json",
+        REMOTE_ADDR=ip,
+    )
+
+
+@pytest.mark.django_db
+def test_rating_throttle_rejects_before_database_work(throttle_clock):
+    post = PostFactory()
+    client = APIClient()
+    assert rate(client, post, "a").status_code == 201
+    assert rate(client, post, "a").status_code == 200
+    with CaptureQueriesContext(connection) as ctx:
+        response = rate(client, post, "a")
+    assert response.status_code == 429
+    assert ctx.captured_queries == []
+    assert int(response["Retry-After"]) == 30
+
+    # Ведро пополняется со временем: 2 токена в минуту
+    throttle_clock[0] += 30
+    assert rate(client, post, "a").status_code == 200
+    assert rate(client, post, "a").status_code == 429
+
+
+@pytest.mark.django_db
+def test_rating_throttle_limits_rotating_user_hash_by_ip(throttle_clock):
+    post = PostFactory()
+    client = APIClient()
+    statuses = [rate(client, post, f"user-{n}").status_code for n in range(6)]
+    assert statuses == [201] * 5 + [429]
+    assert Rating.objects.count() == 5
+    # Другой IP тратит своё ведро
+    assert rate(client, post, "user-6", ip="10.0.0.2").status_code == 201
+
+
+@pytest.mark.django_db
+def test_rating_throttle_shares_buckets_through_django_cache(throttle_clock, settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    caches["default"].clear()
+    post = PostFactory()
+    client = APIClient()
+    assert rate(client, post, "a").status_code == 201
+    assert rate(client, post, "a").status_code == 200
+    assert rate(client, post, "a").status_code == 429
+    # Состояние лежит в кэше, а не в памяти процесса
+    assert not local_buckets._data
@@ -0,0 +1,172 @@
+import math
+from io import StringIO
+
+import factory
+import pytest
+from blog.models import Post, RelatedPost, Tag
+from blog.related import score_candidates, tag_weight, top_related
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class TagFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Tag
+
+    name = factory.Sequence(lambda n: f"tag{n}")
+    slug = factory.Sequence(lambda n: f"tag{n}")
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+def related_ids(post):
+    return list(
+        RelatedPost.objects.filter(post=post)
+        .order_by("-score", "-related_id")
+        .values_list("related_id", flat=True)
+    )
+
+
+def pairs():
+    # Веса после инкрементального пересчёта могут «дрейфовать», состав — нет
+    return sorted(RelatedPost.objects.values_list("post_id", "related_id"))
+
+
+def assert_matches_full_rebuild():
+    incremental = pairs()
+    RelatedPost.rebuild()
+    assert incremental == pairs()
+
+
+def test_score_prefers_rare_tags():
+    assert tag_weight(100, 2) > tag_weight(100, 50) > 0
+    assert tag_weight(100, 0) == 0
+    members = {1: [10, 11, 12], 2: [10, 12]}
+    weights = {1: 0.5, 2: 2.0}
+    scores = score_candidates(10, [1, 2], members, weights)
+    assert scores == {11: 0.5, 12: 2.5}
+    assert top_related(scores, 1) == [(12, 2.5)]
+
+
+@pytest.mark.django_db
+def test_related_posts_are_ranked_by_idf_weighted_shared_tags():
+    common, rare = TagFactory(), TagFactory()
+    post = PostFactory()
+    post.tags.add(common, rare)
+    by_common = PostFactory()
+    by_common.tags.add(common)
+    by_rare = PostFactory()
+    by_rare.tags.add(rare)
+    for _ in range(3):
+        PostFactory().tags.add(common)
+    # Веса, посчитанные по ходу наполнения, устарели — выравниваем полной пересборкой
+    RelatedPost.rebuild()
+
+    assert related_ids(post)[0] == by_rare.pk
+    assert by_common.pk in related_ids(post)
+    row = RelatedPost.objects.get(post=post, related=by_rare)
+    assert row.score == pytest.approx(math.log(1 + 6 / 2))
+
+
+@pytest.mark.django_db
+def test_related_posts_follow_tag_changes_incrementally(settings):
+    settings.RELATED_POSTS_LIMIT = 2
+    tag, other = TagFactory(), TagFactory()
+    posts = PostFactory.create_batch(4)
+    for post in posts:
+        post.tags.add(tag)
+    posts[0].tags.add(other)
+    posts[1].tags.add(other)
+    assert related_ids(posts[0])[0] == posts[1].pk
+    assert_matches_full_rebuild()
+
+    posts[1].tags.remove(other)
+    assert_matches_full_rebuild()
+
+    posts[2].tags.clear()
+    assert related_ids(posts[2]) == []
+    assert posts[2].pk not in RelatedPost.objects.values_list("related_id", flat=True)
+    assert_matches_full_rebuild()
+
+    other.posts.add(posts[3])
+    assert_matches_full_rebuild()
+
+
+@pytest.mark.django_db
+def test_unpublished_and_deleted_posts_leave_related_lists(settings):
+    settings.RELATED_POSTS_LIMIT = 2
+    tag = TagFactory()
+    posts = PostFactory.create_batch(4)
+    tag.posts.add(*posts)
+
+    posts[3].is_published = False
+    posts[3].save()
+    assert related_ids(posts[3]) == []
+    assert not RelatedPost.objects.filter(related=posts[3]).exists()
+
+    posts[2].delete()
+    # Освободившиеся места в списках соседей заняты оставшимися постами
+    assert related_ids(posts[0]) == [posts[1].pk]
+    assert_matches_full_rebuild()
+
+
+@pytest.mark.django_db
+def test_deleting_tag_refreshes_related_posts():
+    tag = TagFactory()
+    first, second = PostFactory(), PostFactory()
+    tag.posts.add(first, second)
+    assert related_ids(first) == [second.pk]
+    tag.delete()
+    assert not RelatedPost.objects.exists()
+
+
+@pytest.mark.django_db
+def test_related_endpoint_returns_cards_in_score_order(django_assert_max_num_queries):
+    common, rare = TagFactory(), TagFactory()
+    post = PostFactory()
+    post.tags.add(common, rare)
+    by_rare = PostFactory()
+    by_rare.tags.add(rare)
+    by_common = PostFactory()
+    by_common.tags.add(common)
+    PostFactory().tags.add(common)
+    RelatedPost.rebuild()
+
+    url = reverse("blog_api:post-related", args=[post.slug])
+    # Пост, похожие посты и их теги
+    with django_assert_max_num_queries(3):
+        response = APIClient().get(url)
+    assert response.status_code == 200
+    assert response.data[0]["slug"] == by_rare.slug
+    assert "body" not in response.data[0]
+    assert len(response.data) == 3
+
+
+@pytest.mark.django_db
+def test_related_endpoint_hides_drafts():
+    draft = PostFactory(is_published=False, first_published_at=None)
+    url = reverse("blog_api:post-related", args=[draft.slug])
+    assert APIClient().get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_rebuild_related_posts_command():
+    tag = TagFactory()
+    first, second = PostFactory(), PostFactory()
+    tag.posts.add(first, second)
+    RelatedPost.objects.all().delete()
+    out = StringIO()
+    call_command("rebuild_related_posts", stdout=out)
+    assert related_ids(first) == [second.pk]
+    assert "2" in out.getvalue()
@@ -0,0 +1,192 @@
+import factory
+import pytest
+from blog.models import Post, Rating, ShortLink, Tag
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class TagFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Tag
+
+    name = factory.Sequence(lambda n: f"tag{n}")
+    slug = factory.Sequence(lambda n: f"tag{n}")
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "blog-response-cache-tests",
+        }
+    }
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_post_list_is_served_from_cache(django_assert_num_queries):
+    PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:post-list")
+    first = client.get(url)
+    assert first["X-Cache"] == "MISS"
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second["X-Cache"] == "HIT"
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_post_save_invalidates_list_and_detail():
+    post = PostFactory(title="Старый")
+    client = APIClient()
+    list_url = reverse("blog_api:post-list")
+    detail_url = reverse("blog_api:post-detail", args=[post.slug])
+    client.get(list_url)
+    client.get(detail_url)
+
+    post.title = "Новый"
+    post.save()
+
+    response = client.get(detail_url)
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["title"] == "Новый"
+    assert client.get(list_url)["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_rating_invalidates_only_related_detail():
+    post = PostFactory()
+    other = PostFactory()
+    client = APIClient()
+    detail_url = reverse("blog_api:post-detail", args=[post.slug])
+    other_url = reverse("blog_api:post-detail", args=[other.slug])
+    client.get(detail_url)
+    client.get(other_url)
+
+    Rating.objects.create(post=post, score=4, user_hash="a")
+
+    response = client.get(detail_url)
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["average_rating"] == 4.0
+    assert client.get(other_url)["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_tag_changes_invalidate_tag_list():
+    tag = TagFactory()
+    post = PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:tag-list")
+    client.get(url)
+
+    post.tags.add(tag)
+    assert client.get(url)["X-Cache"] == "MISS"
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    tag.name = "Переименован"
+    tag.save()
+    assert client.get(url)["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_shortlink_redirect_is_cached_and_invalidated():
+    post = PostFactory()
+    shortlink = ShortLink.objects.get(post=post)
+    client = APIClient()
+    url = reverse("blog_api:shortlink-redirect", args=[shortlink.code])
+    assert client.get(url)["X-Cache"] == "MISS"
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    post.slug = "renamed"
+    post.save()
+    response = client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response["Location"].endswith("/posts/renamed/")
+
+
+@pytest.mark.django_db
+def test_authenticated_and_draft_requests_bypass_cache():
+    post = PostFactory(is_published=False, first_published_at=None)
+    user = get_user_model().objects.create_user(
+        email="editor@example.com", password="secret-pass"
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+    url = reverse("blog_api:post-list")
+    response = client.get(url, {"drafts": "true"})
+    assert not response.has_header("X-Cache")
+    assert response.data["results"][0]["slug"] == post.slug
+    assert not client.get(url).has_header("X-Cache")
+
+    anonymous = APIClient()
+    detail_url = reverse("blog_api:post-detail", args=[post.slug])
+    anonymous.get(detail_url)
+    # Черновик не сохраняется в кэш, поэтому повторный запрос не HIT
+    assert not anonymous.get(detail_url).has_header("X-Cache")
+
+
+@pytest.mark.django_db
+def test_archive_tree_is_cached_until_post_is_redated():
+    post = PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:archive-tree")
+    client.get(url)
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    post.first_published_at = post.first_published_at.replace(year=2001)
+    post.save()
+    response = client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response.json()[-1]["year"] == 2001
+
+
+@pytest.mark.django_db
+def test_title_edit_keeps_archive_and_shortlinks_cached():
+    post = PostFactory()
+    shortlink = ShortLink.objects.get(post=post)
+    client = APIClient()
+    urls = (
+        reverse("blog_api:archive-tree"),
+        reverse("blog_api:shortlink-redirect", args=[shortlink.code]),
+    )
+    for url in urls:
+        client.get(url)
+
+    post.title = "Новый заголовок"
+    post.save()
+    for url in urls:
+        assert client.get(url)["X-Cache"] == "HIT"
+    assert client.get(reverse("blog_api:post-list"))["X-Cache"] == "MISS"
+
+    post.is_published = False
+    post.save()
+    assert client.get(urls[0])["X-Cache"] == "MISS"
+    assert client.get(urls[1])["X-Cache"] == "HIT"
+
+    # Снятый с публикации пост уже выбыл из архива: удаление его не трогает
+    post.delete()
+    assert client.get(urls[0])["X-Cache"] == "HIT"
+    # Ссылка удалённого поста больше не отдаётся из кэша
+    assert client.get(urls[1]).get("X-Cache") != "HIT"
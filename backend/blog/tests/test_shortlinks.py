@@ -1,6 +1,7 @@
 import factory
 import pytest
 from blog.models import Post, ShortLink, Tag
+from blog.serializers import PostListSerializer
 from rest_framework.test import APIClient
 
 
@@ -56,3 +57,38 @@ class TestShortLinkAPI:
         # assert response.status_code == 200
         # assert response.data["id"] == self.shortlink.id
         pass
+
+
+@pytest.mark.django_db
+def test_post_short_code_is_populated_on_create():
+    post = PostFactory()
+    shortlink = ShortLink.objects.get(post=post)
+    assert post.short_code == shortlink.code
+    post.refresh_from_db()
+    assert post.short_code == shortlink.code
+
+
+@pytest.mark.django_db
+def test_post_short_code_moves_to_next_link_on_delete():
+    post = PostFactory()
+    first = ShortLink.objects.get(post=post)
+    second = ShortLink.objects.create(post=post)
+    first.delete()
+    post.refresh_from_db()
+    assert post.short_code == second.code
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("posts_count", [1, 15])
+def test_serializing_posts_runs_no_shortlink_queries(
+    posts_count, django_assert_num_queries
+):
+    tag = TagFactory()
+    for post in PostFactory.create_batch(posts_count):
+        post.tags.add(tag)
+    # Выборка постов + prefetch тегов, независимо от количества постов
+    with django_assert_num_queries(2):
+        posts = list(Post.objects.prefetch_related("tags"))
+        data = PostListSerializer(posts, many=True).data
+    assert len(data) == posts_count
+    assert all(item["shortlink"]["code"] for item in data)
@@ -0,0 +1,81 @@
+import json
+
+import factory
+import pytest
+from blog.models import Post
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+def read_stream(response):
+    assert response.streaming
+    return json.loads(b"".join(response.streaming_content))
+
+
+@pytest.mark.django_db
+def test_post_sitemap_streams_only_sitemap_fields():
+    post = PostFactory(sitemap_priority=0.9, sitemap_changefreq="daily")
+    PostFactory(is_published=False)
+    PostFactory(sitemap_include=False)
+    response = APIClient().get(reverse("blog_api:post-sitemap"))
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    assert read_stream(response) == [
+        {
+            "slug": post.slug,
+            "updated_at": post.updated_at.isoformat(),
+            "priority": 0.9,
+            "changefreq": "daily",
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_post_sitemap_chunks_do_not_break_json(monkeypatch):
+    from blog.views import PostSitemapView
+
+    monkeypatch.setattr(PostSitemapView, "chunk_size", 2)
+    PostFactory.create_batch(5)
+    data = read_stream(APIClient().get(reverse("blog_api:post-sitemap")))
+    assert len(data) == 5
+
+
+@pytest.mark.django_db
+def test_post_sitemap_empty_and_not_modified():
+    client = APIClient()
+    url = reverse("blog_api:post-sitemap")
+    assert read_stream(client.get(url)) == []
+
+    PostFactory()
+    etag = client.get(url)["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+def test_post_sitemap_changes_when_newest_post_is_unpublished():
+    PostFactory()
+    newest = PostFactory()
+    client = APIClient()
+    url = reverse("blog_api:post-sitemap")
+    response = client.get(url)
+    etag = response["ETag"]
+    # Как и у списков постов, валидатор один — ETag
+    assert not response.has_header("Last-Modified")
+
+    newest.is_published = False
+    newest.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert len(read_stream(response)) == 1
@@ -1,6 +1,13 @@
+from io import StringIO
+
 import factory
 import pytest
-from blog.models import Tag
+from blog.models import Post, Tag
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 
@@ -12,6 +19,17 @@ class TagFactory(factory.django.DjangoModelFactory):
     slug = factory.Sequence(lambda n: f"tag{n}")
 
 
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
 @pytest.mark.django_db
 class TestTagAPI:
     def setup_method(self):
@@ -33,3 +51,108 @@ class TestTagAPI:
     #     response = self.client.get(url)
     #     assert response.status_code == 200
     #     assert response.data["id"] == self.tag.id
+
+
+def count(tag):
+    tag.refresh_from_db()
+    return tag.published_posts_count
+
+
+@pytest.mark.django_db
+def test_published_posts_count_follows_m2m_changes():
+    tag, other = TagFactory(), TagFactory()
+    post = PostFactory()
+    draft = PostFactory(is_published=False)
+
+    post.tags.add(tag, other)
+    draft.tags.add(tag)
+    assert (count(tag), count(other)) == (1, 1)
+
+    post.tags.add(tag)  # повторное добавление ничего не меняет
+    post.tags.remove(other)
+    post.tags.remove(other)  # как и удаление отсутствующей связи
+    assert (count(tag), count(other)) == (1, 0)
+
+    other.posts.add(post, draft)
+    assert count(other) == 1
+    other.posts.clear()
+    post.tags.set([other])
+    assert (count(tag), count(other)) == (0, 1)
+    post.tags.clear()
+    assert count(other) == 0
+
+
+@pytest.mark.django_db
+def test_published_posts_count_follows_publish_toggle_and_delete():
+    tag = TagFactory()
+    post = PostFactory(is_published=False, first_published_at=None)
+    post.tags.add(tag)
+    assert count(tag) == 0
+
+    post.is_published = True
+    post.save()
+    assert count(tag) == 1
+
+    post.is_published = False
+    post.save(update_fields=["is_published"])
+    assert count(tag) == 0
+
+    post.is_published = True
+    post.save()
+    post.delete()
+    assert count(tag) == 0
+
+
+@pytest.mark.django_db
+def test_tag_list_reads_only_tags_table(django_assert_num_queries):
+    tag = TagFactory()
+    PostFactory.create_batch(3)
+    for post in Post.objects.all():
+        post.tags.add(tag)
+    # ETag-отпечаток, COUNT пагинатора и сама страница тегов
+    with django_assert_num_queries(3) as queries:
+        response = APIClient().get(reverse("blog_api:tag-list"))
+    assert response.data["results"][0]["posts_count"] == 3
+    assert not any('"blog_post"' in query["sql"] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_recalculate_tag_counts_command():
+    tag = TagFactory()
+    PostFactory().tags.add(tag)
+    Tag.objects.update(published_posts_count=0)
+    call_command("recalculate_tag_counts", stdout=StringIO())
+    assert count(tag) == 1
+
+
+@pytest.mark.django_db
+def test_tag_posts_are_paginated_cards():
+    tag = TagFactory()
+    for post in PostFactory.create_batch(12):
+        post.tags.add(tag)
+    client = APIClient()
+    url = reverse("blog_api:tag-posts", args=[tag.slug])
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data["count"] == 12
+    assert len(response.data["results"]) == 10
+    assert "body" not in response.data["results"][0]
+    assert len(client.get(url, {"page": 2}).data["results"]) == 2
+
+
+@pytest.mark.django_db
+def test_tag_posts_query_count_does_not_grow_with_tag():
+    tag, extra = TagFactory(), TagFactory()
+    client = APIClient()
+    url = reverse("blog_api:tag-posts", args=[tag.slug])
+
+    def query_count():
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).status_code == 200
+        return len(queries)
+
+    PostFactory().tags.add(tag, extra)
+    small = query_count()
+    for post in PostFactory.create_batch(15):
+        post.tags.add(tag, extra)
+    assert query_count() == small
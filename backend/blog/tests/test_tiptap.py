@@ -0,0 +1,251 @@
+import json
+
+import factory
+import pytest
+from blog.models import Post
+from blog.tiptap import render_tiptap_html
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Sequence(lambda n: f"Post {n}")
+    slug = factory.Sequence(lambda n: f"post-{n}")
+    description = "desc"
+    first_published_at = factory.LazyFunction(timezone.now)
+    is_published = True
+
+
+def doc(*content):
+    return {"type": "doc", "content": list(content)}
+
+
+def paragraph(*content):
+    return {"type": "paragraph", "content": list(content)}
+
+
+def test_render_marks_and_escaping():
+    html = render_tiptap_html(
+        doc(
+            paragraph(
+                {"type": "text", "text": "<b>", "marks": [{"type": "bold"}]},
+                {
+                    "type": "text",
+                    "text": "ссылка",
+                    "marks": [
+                        {"type": "italic"},
+                        {"type": "link", "attrs": {"href": "https://example.com"}},
+                    ],
+                },
+            )
+        )
+    )
+    assert html == (
+        "<p><strong>&lt;b&gt;</strong>"
+        '<a href="https://example.com"><em>ссылка</em></a></p>'
+    )
+
+
+def link(href):
+    return paragraph(
+        {
+            "type": "text",
+            "text": "x",
+            "marks": [{"type": "link", "attrs": {"href": href}}],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "href",
+    [
+        "javascript:alert(1)",
+        " JavaScript:alert(1)",
+        "java\tscript:alert(1)",
+        "java\nscript:alert(1)",
+        "\x01javascript:alert(1)",
+        "vbscript:msgbox(1)",
+        "data:text/html,<script>alert(1)</script>",
+    ],
+)
+def test_render_drops_unsafe_url(href):
+    html = render_tiptap_html(
+        doc(link(href), {"type": "image", "attrs": {"src": href}})
+    )
+    assert html == '<p><a>x</a></p><img class="tiptap-image">'
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/a?b=1",
+        "http://example.com",
+        "mailto:a@example.com",
+        "tel:+70000000000",
+        "/posts/slug/",
+        "#section",
+    ],
+)
+def test_render_keeps_allowed_url(url):
+    html = render_tiptap_html(doc(link(url)))
+    assert f'href="{url}"' in html
+
+
+def test_render_typography_nodes():
+    """Тест: узлы из скрипта create_typography_test_post рендерятся в HTML."""
+
+    def item(text):
+        return {
+            "type": "listItem",
+            "content": [paragraph({"type": "text", "text": text})],
+        }
+
+    html = render_tiptap_html(
+        json.dumps(
+            doc(
+                {
+                    "type": "heading",
+                    "attrs": {"level": 2},
+                    "content": [{"type": "text", "text": "H2"}],
+                },
+                {"type": "bulletList", "content": [item("a")]},
+                {"type": "orderedList", "attrs": {"order": 1}, "content": [item("b")]},
+                {
+                    "type": "blockquote",
+                    "content": [paragraph({"type": "text", "text": "q"})],
+                },
+                {
+                    "type": "codeBlock",
+                    "attrs": {"language": "python"},
+                    "content": [{"type": "text", "text": "print('<>')"}],
+                },
+                paragraph(
+                    {
+                        "type": "text",
+                        "text": "Google",
+                        "marks": [
+                            {
+                                "type": "link",
+                                "attrs": {
+                                    "href": "https://google.com",
+                                    "target": "_blank",
+                                },
+                            }
+                        ],
+                    }
+                ),
+                {
+                    "type": "image",
+                    "attrs": {"src": "/media/posts/example.webp", "alt": "Пример"},
+                },
+                {
+                    "type": "table",
+                    "content": [
+                        {
+                            "type": "tableRow",
+                            "content": [
+                                {
+                                    "type": "tableHeader",
+                                    "content": [{"type": "text", "text": "K"}],
+                                }
+                            ],
+                        },
+                        {
+                            "type": "tableRow",
+                            "content": [
+                                {
+                                    "type": "tableCell",
+                                    "content": [{"type": "text", "text": "V"}],
+                                }
+                            ],
+                        },
+                    ],
+                },
+            )
+        )
+    )
+    assert html == (
+        "<h2>H2</h2>"
+        "<ul><li><p>a</p></li></ul>"
+        "<ol><li><p>b</p></li></ol>"
+        "<blockquote><p>q</p></blockquote>"
+        '<pre><code class="language-python">print(&#x27;&lt;&gt;&#x27;)</code></pre>'
+        '<p><a href="https://google.com" target="_blank"'
+        ' rel="noopener noreferrer nofollow">Google</a></p>'
+        '<img src="/media/posts/example.webp" alt="Пример" class="tiptap-image">'
+        "<table><tbody><tr><th>K</th></tr><tr><td>V</td></tr></tbody></table>"
+    )
+
+
+def test_render_gallery():
+    images = [{"src": "/media/a.webp", "alt": "A", "title": ""}]
+    html = render_tiptap_html(
+        doc({"type": "gallery", "attrs": {"images": images, "loop": True}})
+    )
+    assert html.startswith('<div data-type="gallery"')
+    assert 'data-loop="true"' in html
+    assert 'data-autoplay-delay="3500"' in html
+    assert '<img src="/media/a.webp" alt="A">' in html
+
+
+def test_render_gallery_drops_unsafe_images_from_data_attribute():
+    images = [{"src": "java\tscript:alert(1)"}, {"src": "/media/b.webp"}]
+    html = render_tiptap_html(doc({"type": "gallery", "attrs": {"images": images}}))
+    assert "script" not in html
+    assert "/media/b.webp" in html
+
+
+@pytest.mark.parametrize("body", [None, "", "не json", '{"blocks": []}'])
+def test_render_empty_or_invalid_document(body):
+    assert render_tiptap_html(body) == ""
+
+
+@pytest.mark.django_db
+def test_post_save_renders_body_html():
+    post = PostFactory(body=doc(paragraph({"type": "text", "text": "Привет"})))
+    assert post.body_html == "<p>Привет</p>"
+
+    post.body = doc(paragraph({"type": "text", "text": "Пока"}))
+    post.save(update_fields=["body"])
+    post.refresh_from_db()
+    assert post.body_html == "<p>Пока</p>"
+
+
+@pytest.mark.django_db
+def test_post_bulk_create_renders_body_html():
+    Post.objects.bulk_create(
+        [
+            Post(
+                title="T",
+                slug="bulk",
+                body=doc(paragraph({"type": "text", "text": "Б"})),
+            )
+        ]
+    )
+    assert Post.objects.get(slug="bulk").body_html == "<p>Б</p>"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "body_format, present, absent",
+    [
+        (None, {"body"}, {"body_html"}),
+        ("html", {"body_html"}, {"body"}),
+        ("both", {"body", "body_html"}, set()),
+    ],
+)
+def test_post_detail_body_format(body_format, present, absent):
+    post = PostFactory(body=doc(paragraph({"type": "text", "text": "Текст"})))
+    params = {"body_format": body_format} if body_format else {}
+    response = APIClient().get(
+        reverse("blog_api:post-detail", args=[post.slug]), params
+    )
+    assert response.status_code == 200
+    assert present <= set(response.data)
+    assert not absent & set(response.data)
+    if "body_html" in present:
+        assert response.data["body_html"] == "<p>Текст</p>"
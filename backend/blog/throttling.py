@@ -0,0 +1,145 @@
+"""
+Ограничение частоты анонимных оценок алгоритмом token bucket.
+
+У каждого клиента два ведра: по IP и по user_hash. Ведро вмещает N
+токенов и пополняется со скоростью N за период из строки вида "N/min"
+(RATING_THROTTLE_IP_RATE, RATING_THROTTLE_USER_RATE; None — без
+ограничения). Запрос тратит по токену из обоих вёдер и отклоняется с 429,
+если хотя бы одно пусто: смена user_hash не обходит ведро IP. Проверка
+идёт в DRF initial() до сериализатора, то есть до любых запросов к базе.
+
+Состояние вёдер хранится в кэше Django, общем для воркеров. Если кэш
+не хранит данные (DummyCache) или недоступен, используется словарь в
+памяти процесса: лимит тогда действует на каждый процесс отдельно.
+Чтение и запись ведра не атомарны, так что в гонке параллельных запросов
+клиент может получить лишний токен — для защиты от флуда это допустимо.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "blog:rating-throttle"
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+DEFAULT_RATES = {"ip": "30/min", "user_hash": "10/min"}
+
+
+def parse_rate(rate):
+    """ "N/period" -> (вместимость ведра, токенов в секунду) или None."""
+    if not rate:
+        return None
+    count, period = rate.split("/")
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """Хранилище вёдер в памяти процесса с вытеснением давно не виденных."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        with self._lock:
+            return {key: self._data[key] for key in keys if key in self._data}
+
+    def set_many(self, values, timeout=None):
+        with self._lock:
+            for key, value in values.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_buckets = LocalBucketStore()
+
+
+class RatingTokenBucketThrottle(BaseThrottle):
+    """Token bucket по IP клиента и user_hash из тела запроса."""
+
+    timer = time.time
+
+    def get_rates(self):
+        return {
+            "ip": parse_rate(
+                getattr(settings, "RATING_THROTTLE_IP_RATE", DEFAULT_RATES["ip"])
+            ),
+            "user_hash": parse_rate(
+                getattr(
+                    settings, "RATING_THROTTLE_USER_RATE", DEFAULT_RATES["user_hash"]
+                )
+            ),
+        }
+
+    def get_buckets(self, request, view):
+        """{ключ кэша: (вместимость, скорость)} для вёдер запроса."""
+        rates = self.get_rates()
+        idents = {"ip": self.get_ident(request)}
+        user_hash = request.data.get("user_hash") if request.data else None
+        if isinstance(user_hash, str) and user_hash:
+            idents["user_hash"] = user_hash
+        buckets = {}
+        for scope, ident in idents.items():
+            if rates[scope] is None:
+                continue
+            digest = hashlib.sha1(ident.encode()).hexdigest()
+            buckets[f"{KEY_PREFIX}:{scope}:{digest}"] = rates[scope]
+        return buckets
+
+    @staticmethod
+    def get_store():
+        cache = caches["default"]
+        return local_buckets if isinstance(cache, DummyCache) else cache
+
+    def allow_request(self, request, view):
+        buckets = self.get_buckets(request, view)
+        if not buckets:
+            return True
+        now = self.timer()
+        store = self.get_store()
+        try:
+            state = store.get_many(list(buckets))
+        except Exception:
+            logger.warning("Кэш недоступен, ограничение оценок — в памяти процесса")
+            store = local_buckets
+            state = store.get_many(list(buckets))
+
+        levels = {}
+        for key, (capacity, rate) in buckets.items():
+            tokens, updated_at = state.get(key, (capacity, now))
+            levels[key] = min(capacity, tokens + (now - updated_at) * rate)
+        if any(tokens < 1 for tokens in levels.values()):
+            self.wait_seconds = max(
+                (1 - tokens) / buckets[key][1]
+                for key, tokens in levels.items()
+                if tokens < 1
+            )
+            return False
+
+        # Ведро без запросов полностью наполняется за capacity / rate секунд
+        timeout = max(capacity / rate for capacity, rate in buckets.values())
+        values = {key: (tokens - 1, now) for key, tokens in levels.items()}
+        try:
+            store.set_many(values, timeout=int(timeout) + 1)
+        except Exception:
+            local_buckets.set_many(values)
+        return True
+
+    def wait(self):
+        return getattr(self, "wait_seconds", None)
@@ -0,0 +1,215 @@
+"""
+Серверный рендер документа Tiptap (ProseMirror JSON) в HTML.
+
+Повторяет разметку, которую строит редактор на фронтенде
+(frontend/src/components/post-body): StarterKit, ссылки, изображения,
+таблицы, блоки кода, типографика и галерея. Текст и атрибуты
+экранируются; в href/src допускаются только относительные адреса и
+схемы из SAFE_URL_SCHEMES.
+"""
+
+import json
+import logging
+import re
+
+from django.utils.html import escape
+
+logger = logging.getLogger(__name__)
+
+# Схемы, допустимые в href/src; адрес с любой другой схемой отбрасывается
+SAFE_URL_SCHEMES = ("http", "https", "mailto", "tel")
+# Управляющие символы ASCII и пробелы: браузер вырезает их из адреса,
+# поэтому "java\tscript:" для него то же, что "javascript:"
+URL_IGNORED_CHARS = re.compile(r"[\x00-\x20\x7f]+")
+URL_SCHEME = re.compile(r"^([a-z][a-z0-9+.\-]*):", re.IGNORECASE)
+
+# Простые узлы: тип -> HTML-тег
+BLOCK_TAGS = {
+    "paragraph": "p",
+    "blockquote": "blockquote",
+    "bulletList": "ul",
+    "listItem": "li",
+    "tableRow": "tr",
+}
+# Метки: тип -> HTML-тег (link обрабатывается отдельно)
+MARK_TAGS = {
+    "bold": "strong",
+    "italic": "em",
+    "strike": "s",
+    "underline": "u",
+    "code": "code",
+    "subscript": "sub",
+    "superscript": "sup",
+    "highlight": "mark",
+}
+GALLERY_DEFAULT_AUTOPLAY_DELAY = 3500
+GALLERY_DEFAULT_HEIGHT = 320
+
+
+def _safe_url(url):
+    """Адрес из allowlist: относительный, #якорь или схема из SAFE_URL_SCHEMES."""
+    url = URL_IGNORED_CHARS.sub("", str(url or ""))
+    scheme = URL_SCHEME.match(url)
+    if scheme and scheme.group(1).lower() not in SAFE_URL_SCHEMES:
+        return ""
+    return url
+
+
+def _attrs(**attrs):
+    """Строка HTML-атрибутов; None и False пропускаются, True — булев атрибут."""
+    parts = []
+    for name, value in attrs.items():
+        if value is None or value is False or value == "":
+            continue
+        name = name.rstrip("_").replace("_", "-")
+        if value is True:
+            parts.append(f" {name}")
+        else:
+            parts.append(f' {name}="{escape(value)}"')
+    return "".join(parts)
+
+
+def _render_marks(text, marks):
+    html = escape(text)
+    for mark in marks or ():
+        mark_type = mark.get("type")
+        attrs = mark.get("attrs") or {}
+        if mark_type == "link":
+            target = attrs.get("target")
+            html = "<a{}>{}</a>".format(
+                _attrs(
+                    href=_safe_url(attrs.get("href")),
+                    target=target,
+                    rel=attrs.get("rel")
+                    or ("noopener noreferrer nofollow" if target else None),
+                ),
+                html,
+            )
+        elif mark_type in MARK_TAGS:
+            tag = MARK_TAGS[mark_type]
+            html = f"<{tag}>{html}</{tag}>"
+    return html
+
+
+def _render_children(node):
+    return "".join(_render_node(child) for child in node.get("content") or ())
+
+
+def _render_image(attrs, css_class="tiptap-image"):
+    width = attrs.get("width")
+    return "<img{}>".format(
+        _attrs(
+            src=_safe_url(attrs.get("src")),
+            alt=attrs.get("alt"),
+            title=attrs.get("title"),
+            class_=css_class,
+            style=f"width: {width}" if width else None,
+        )
+    )
+
+
+def _render_gallery(attrs):
+    images = attrs.get("images") or []
+    if isinstance(images, str):
+        try:
+            images = json.loads(images)
+        except json.JSONDecodeError:
+            images = []
+    # Фронтенд поднимает слайдер по data-images, поэтому адреса чистятся и там
+    images = [
+        {**image, "src": _safe_url(image.get("src"))}
+        for image in images
+        if isinstance(image, dict) and _safe_url(image.get("src"))
+    ]
+    # Картинки внутри контейнера оставляют галерею читаемой и без JS
+    items = "".join(_render_image(image, css_class=None) for image in images)
+    return "<div{}>{}</div>".format(
+        _attrs(
+            data_type="gallery",
+            data_images=json.dumps(images, ensure_ascii=False, separators=(",", ":")),
+            data_loop=str(bool(attrs.get("loop", False))).lower(),
+            data_autoplay=str(bool(attrs.get("autoplay", False))).lower(),
+            data_autoplay_delay=attrs.get(
+                "autoplayDelay", GALLERY_DEFAULT_AUTOPLAY_DELAY
+            ),
+            data_gallery_height=attrs.get("galleryHeight", GALLERY_DEFAULT_HEIGHT),
+        ),
+        items,
+    )
+
+
+def _render_node(node):
+    if not isinstance(node, dict):
+        return ""
+    node_type = node.get("type")
+    attrs = node.get("attrs") or {}
+
+    if node_type == "text":
+        return _render_marks(node.get("text", ""), node.get("marks"))
+    if node_type == "doc":
+        return _render_children(node)
+    if node_type in BLOCK_TAGS:
+        tag = BLOCK_TAGS[node_type]
+        return f"<{tag}>{_render_children(node)}</{tag}>"
+    if node_type == "heading":
+        try:
+            level = min(max(int(attrs.get("level", 1)), 1), 6)
+        except (TypeError, ValueError):
+            level = 1
+        return f"<h{level}>{_render_children(node)}</h{level}>"
+    if node_type == "orderedList":
+        start = attrs.get("start", attrs.get("order", 1))
+        start_attr = _attrs(start=start) if start not in (None, 1) else ""
+        return f"<ol{start_attr}>{_render_children(node)}</ol>"
+    if node_type == "codeBlock":
+        language = attrs.get("language")
+        code_attrs = _attrs(class_=f"language-{language}" if language else None)
+        # Внутри блока кода метки не применяются
+        code = "".join(
+            escape(child.get("text", ""))
+            for child in node.get("content") or ()
+            if isinstance(child, dict)
+        )
+        return f"<pre><code{code_attrs}>{code}</code></pre>"
+    if node_type == "hardBreak":
+        return "<br>"
+    if node_type == "horizontalRule":
+        return "<hr>"
+    if node_type == "image":
+        return _render_image(attrs)
+    if node_type == "table":
+        return f"<table><tbody>{_render_children(node)}</tbody></table>"
+    if node_type in ("tableCell", "tableHeader"):
+        tag = "th" if node_type == "tableHeader" else "td"
+        colspan = attrs.get("colspan")
+        rowspan = attrs.get("rowspan")
+        cell_attrs = _attrs(
+            colspan=colspan if colspan not in (None, 1) else None,
+            rowspan=rowspan if rowspan not in (None, 1) else None,
+        )
+        return f"<{tag}{cell_attrs}>{_render_children(node)}</{tag}>"
+    if node_type == "gallery":
+        return _render_gallery(attrs)
+
+    # Неизвестный узел: выводим содержимое, чтобы не терять текст
+    logger.debug("Неизвестный тип узла Tiptap: %s", node_type)
+    return _render_children(node)
+
+
+def render_tiptap_html(document):
+    """
+    Рендерит документ Tiptap (dict или JSON-строку) в HTML.
+
+    Для пустого или некорректного документа возвращает пустую строку.
+    """
+    if isinstance(document, str):
+        if not document.strip():
+            return ""
+        try:
+            document = json.loads(document)
+        except json.JSONDecodeError:
+            logger.warning("Не удалось разобрать JSON документа Tiptap")
+            return ""
+    if not isinstance(document, dict):
+        return ""
+    return _render_node(document)
@@ -5,13 +5,18 @@ from .views import (
     ArchiveDayPostsView,
     ArchiveDaySummaryView,
     ArchiveMonthSummaryView,
+    ArchiveTreeView,
     ArchiveYearSummaryView,
     ImageUploadView,
+    PostBatchView,
+    PostRatingsBatchView,
+    PostSitemapView,
     PostViewSet,
     RatingViewSet,
     ShortLinkRedirectView,
     ShortLinkViewSet,
     TagViewSet,
+    TopRatedPostsView,
 )
 
 app_name = "blog_api"
@@ -29,6 +34,7 @@ archive_urlpatterns = [
         ArchiveYearSummaryView.as_view(),
         name="archive-year-summary",
     ),
+    path("archive/tree/", ArchiveTreeView.as_view(), name="archive-tree"),
     path(
         "archive/<int:year>/summary/",
         ArchiveMonthSummaryView.as_view(),
@@ -51,6 +57,10 @@ urlpatterns = (
     + archive_urlpatterns
     + [
         path("image-upload/", ImageUploadView.as_view(), name="image-upload"),
+        path("batch/posts/", PostBatchView.as_view(), name="post-batch"),
+        path("batch/ratings/", PostRatingsBatchView.as_view(), name="post-ratings"),
+        path("rankings/top/", TopRatedPostsView.as_view(), name="post-top-rated"),
+        path("sitemap/posts/", PostSitemapView.as_view(), name="post-sitemap"),
         path(
             "api/v1/shortlinks/<str:code>/",
             ShortLinkRedirectView.as_view(),
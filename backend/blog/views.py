@@ -1,48 +1,81 @@
-import datetime
+import json
 import logging  # Добавляем импорт logging
 import os
 import uuid
 from io import BytesIO
 
 from django.conf import settings
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from django.db.models import Count, Q
-from django.db.models.functions import TruncDay, TruncMonth, TruncYear
-from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.db.models import F, Sum
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.utils.text import slugify  # <--- ДОБАВЛЯЕМ ЭТОТ ИМПОРТ
 from PIL import Image as PilImage
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView, View
 
-from .models import Post, Rating, ShortLink, Tag
+from . import rating_buffer
+from .conditional import (
+    ConditionalGetMixin,
+    build_validators,
+    not_modified_response,
+    post_list_fingerprint,
+    post_object_fingerprint,
+    set_validators,
+    sitemap_fingerprint,
+    tag_list_fingerprint,
+)
+from .models import ArchiveBucket, Post, Rating, ShortLink, Tag
+from .pagination import PostPagination
+from .query_budget import with_query_budget
+from .response_cache import (
+    ARCHIVE_TAG,
+    POSTS_TAG,
+    SHORTLINKS_TAG,
+    TAGS_TAG,
+    ResponseCacheMixin,
+    post_tag,
+)
 from .serializers import (
     DayArchiveSerializer,
     MonthArchiveSerializer,
+    PostListSerializer,
+    PostRatingSummarySerializer,
     PostSerializer,
     RatingSerializer,
     ShortLinkSerializer,
     TagSerializer,
     YearArchiveSerializer,
+    YearArchiveTreeSerializer,
 )
+from .throttling import RatingTokenBucketThrottle
 
 # Получаем логгер
 logger = logging.getLogger(__name__)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ResponseCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """API для постов блога."""
 
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     lookup_field = "slug"
-    pagination_class = PageNumberPagination  # Возвращаем стандартный пагинатор
+    pagination_class = PostPagination  # page-number по умолчанию, keyset по запросу
+    TAG_FILTER_MODES = ("all", "any")
+    # Бюджеты SQL-запросов (blog.query_budget); +1 запрос на пользователя JWT
+    query_budget = {"list": 6, "retrieve": 4}
+    MAX_FILTER_TAGS = 20
 
     def get_queryset(self):
         if self.action in ["retrieve", "update", "partial_update", "destroy"]:
@@ -63,28 +96,88 @@ class PostViewSet(viewsets.ModelViewSet):
             queryset = queryset.order_by("-first_published_at")
         elif search_term:
             search_language = getattr(settings, "SEARCH_LANGUAGE", "russian")
-            vector = SearchVector(
-                "title",
-                "slug",
-                "description",
-                "body_text_for_search",
-                config=search_language,
-            )
             query = SearchQuery(
                 search_term, config=search_language, search_type="websearch"
             )
+            # Поиск по сохранённому search_vector идёт через GIN-индекс
             queryset = (
-                queryset.annotate(rank=SearchRank(vector, query))
-                .filter(rank__gte=0.01)
+                queryset.filter(search_vector=query)
+                .annotate(rank=SearchRank(F("search_vector"), query))
                 .order_by("-rank", "-first_published_at")
             )
         elif self.action == "list":
             queryset = queryset.order_by("-first_published_at")
 
+        if self.action == "list":
+            queryset = self.filter_by_tags(queryset)
+
+        if self.get_serializer_class() is PostListSerializer:
+            # Карточкам не нужны body и поисковый текст — не тянем их из БД
+            queryset = queryset.only(*PostListSerializer.LIST_ONLY_FIELDS)
+
         # Оптимизация: подгружаем связанные объекты
-        queryset = queryset.prefetch_related("tags", "ratings", "shortlinks")
+        queryset = queryset.prefetch_related("tags")
         return queryset
 
+    def filter_by_tags(self, queryset):
+        """Фильтр ?tags=a,b,c&mode=all|any (по умолчанию all)."""
+        raw_tags = self.request.query_params.get("tags", "")
+        slugs = [slug.strip() for slug in raw_tags.split(",") if slug.strip()]
+        if not slugs:
+            return queryset
+        mode = self.request.query_params.get("mode", "all").lower()
+        if mode not in self.TAG_FILTER_MODES:
+            raise ValidationError(
+                {"mode": f"Допустимые значения: {', '.join(self.TAG_FILTER_MODES)}."}
+            )
+        if len(slugs) > self.MAX_FILTER_TAGS:
+            raise ValidationError(
+                {"tags": f"Не больше {self.MAX_FILTER_TAGS} тегов в фильтре."}
+            )
+        return queryset.with_tags(slugs, mode=mode)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        not_modified = self.check_not_modified(request, post_list_fingerprint(queryset))
+        if not_modified is not None:
+            return not_modified
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = Post.objects.filter(**{self.lookup_field: kwargs[self.lookup_field]})
+        not_modified = self.check_not_modified(
+            request, post_object_fingerprint(queryset)
+        )
+        if not_modified is not None:
+            return not_modified
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_serializer_class(self):
+        """Для списка используем облегчённое представление без body."""
+        is_for_sitemap = (
+            self.request.query_params.get("for_sitemap", "false").lower() == "true"
+        )
+        if self.action == "list" and not is_for_sitemap:
+            return PostListSerializer
+        return super().get_serializer_class()
+
+    def get_response_cache_tags(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if action == "retrieve":
+            return [post_tag(kwargs.get(self.lookup_field)), TAGS_TAG]
+        if action in ("list", "get_by_id", "related"):
+            return [POSTS_TAG]
+        return []
+
+    def keyset_pagination_allowed(self):
+        """Keyset-режим только для хронологических списков опубликованных постов."""
+        params = self.request.query_params
+        return not (
+            params.get("search")
+            or params.get("drafts", "false").lower() == "true"
+            or params.get("for_sitemap", "false").lower() == "true"
+        )
+
     def paginate_queryset(self, queryset):
         """Отключаем пагинацию, если запрошено для sitemap."""
         is_for_sitemap = (
@@ -98,7 +191,35 @@ class PostViewSet(viewsets.ModelViewSet):
         logger.debug("Using default pagination.")
         return super().paginate_queryset(queryset)
 
+    @action(detail=True, methods=["get"], url_path="related")
+    @with_query_budget(4)
+    def related(self, request, slug=None):
+        """Похожие посты карточками, по убыванию веса общих тегов.
+
+        Список читается из предвычисленной таблицы RelatedPost: не больше
+        RELATED_POSTS_LIMIT строк по уникальному индексу (post, related),
+        без самосоединения тегов на каждый запрос.
+        """
+        post_id = (
+            Post.objects.filter(slug=slug, is_published=True)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if post_id is None:
+            raise Http404
+        related = (
+            Post.objects.filter(is_published=True, related_to__post_id=post_id)
+            .order_by("-related_to__score", "-id")
+            .only(*PostListSerializer.LIST_ONLY_FIELDS)
+            .prefetch_related("tags")
+        )
+        serializer = PostListSerializer(
+            related, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
     @action(detail=True, methods=["get"], url_path="by-id")
+    @with_query_budget(3)
     def get_by_id(self, request, slug=None):
         """Получить пост по ID (для коротких ссылок)."""
         try:
@@ -125,29 +246,175 @@ class PostViewSet(viewsets.ModelViewSet):
             )
 
 
-class TagViewSet(viewsets.ModelViewSet):
+def parse_batch_keys(request, limit):
+    """Ключи ?slugs=a,b,c или ?ids=1,2,3 без повторов: (поле, ключи)."""
+    params = request.query_params
+    if bool(params.get("slugs")) == bool(params.get("ids")):
+        raise ValidationError(
+            {"detail": "Нужен ровно один из параметров: slugs или ids."}
+        )
+    field = "slug" if params.get("slugs") else "id"
+    raw = params.get("slugs") or params.get("ids")
+    keys = list(dict.fromkeys(key.strip() for key in raw.split(",") if key.strip()))
+    if len(keys) > limit:
+        raise ValidationError({field: f"Не больше {limit} постов за запрос."})
+    if field == "id":
+        try:
+            keys = list(dict.fromkeys(int(key) for key in keys))
+        except ValueError:
+            raise ValidationError({"ids": "Идентификаторы должны быть числами."})
+    return field, keys
+
+
+class PostBatchView(ResponseCacheMixin, APIView):
+    """
+    Опубликованные посты по списку ?slugs=a,b,c или ?ids=1,2,3.
+
+    Посты отдаются карточками в запрошенном порядке одним запросом (плюс
+    подгрузка тегов); ненайденные ключи перечисляются в missing. Маршрут
+    вынесен из posts/, чтобы не перекрывать пост со slug «batch».
+    """
+
+    permission_classes = [permissions.AllowAny]
+    response_cache_tags = [POSTS_TAG]
+    query_budget = 3
+    MAX_BATCH_SIZE = 50
+
+    def get(self, request, *args, **kwargs):
+        field, keys = parse_batch_keys(request, self.MAX_BATCH_SIZE)
+        posts = (
+            Post.objects.filter(is_published=True, **{f"{field}__in": keys})
+            .only(*PostListSerializer.LIST_ONLY_FIELDS)
+            .prefetch_related("tags")
+        )
+        by_key = {getattr(post, field): post for post in posts}
+        ordered = [by_key[key] for key in keys if key in by_key]
+        serializer = PostListSerializer(
+            ordered, many=True, context={"request": request}
+        )
+        return Response(
+            {
+                "results": serializer.data,
+                "missing": [key for key in keys if key not in by_key],
+            }
+        )
+
+
+class PostRatingsBatchView(PostBatchView):
+    """
+    Сводки рейтинга опубликованных постов по ?slugs= или ?ids=.
+
+    Распределение оценок читается из счётчиков поста одним запросом, без
+    агрегации по таблице оценок; ненайденные ключи — в missing.
+    """
+
+    query_budget = 2
+
+    def get(self, request, *args, **kwargs):
+        field, keys = parse_batch_keys(request, self.MAX_BATCH_SIZE)
+        posts = Post.objects.filter(is_published=True, **{f"{field}__in": keys}).only(
+            *PostRatingSummarySerializer.ONLY_FIELDS
+        )
+        by_key = {getattr(post, field): post for post in posts}
+        ordered = [by_key[key] for key in keys if key in by_key]
+        return Response(
+            {
+                "results": PostRatingSummarySerializer(ordered, many=True).data,
+                "missing": [key for key in keys if key not in by_key],
+            }
+        )
+
+
+class TopRatedPostsView(ResponseCacheMixin, APIView):
+    """
+    Лучшие посты карточками, по убыванию байесовской средней оценки.
+
+    Порядок читается из предвычисленной таблицы PostRanking по индексу
+    (score, rating_count, post): запрос проходит ровно ?limit= строк
+    (по умолчанию TOP_RATED_LIMIT), без агрегации по оценкам.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    response_cache_tags = [POSTS_TAG]
+    query_budget = 3
+    TOP_RATED_LIMIT = 10
+    MAX_TOP_RATED_LIMIT = 50
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get("limit", self.TOP_RATED_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Лимит должен быть числом."})
+        if not 1 <= limit <= self.MAX_TOP_RATED_LIMIT:
+            raise ValidationError(
+                {"limit": f"Лимит от 1 до {self.MAX_TOP_RATED_LIMIT}."}
+            )
+        posts = (
+            Post.objects.filter(is_published=True, ranking__isnull=False)
+            .order_by("-ranking__score", "-ranking__rating_count", "-id")
+            .only(*PostListSerializer.LIST_ONLY_FIELDS)
+            .prefetch_related("tags")[:limit]
+        )
+        serializer = PostListSerializer(posts, many=True, context={"request": request})
+        return Response(serializer.data)
+
+
+class TagViewSet(ResponseCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """API для тегов."""
 
-    queryset = Tag.objects.all().order_by("name").prefetch_related("posts")
+    # Счётчик постов хранится в самом теге: список — одно чтение по индексу name
+    queryset = Tag.objects.all().order_by("name")
     serializer_class = TagSerializer
+    query_budget = {"list": 4, "retrieve": 3}
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     lookup_field = "slug"
 
-    def get_queryset(self):
-        qs = Tag.objects.all().order_by("name").prefetch_related("posts")
-        if self.action == "list":
-            return qs.annotate(
-                posts_count=Count("posts", filter=Q(posts__is_published=True))
-            )
-        return qs
+    def get_response_cache_tags(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if action in ("list", "retrieve"):
+            return [TAGS_TAG]
+        if action == "posts":
+            return [TAGS_TAG, POSTS_TAG]
+        return []
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(Tag.objects.all())
+        not_modified = self.check_not_modified(request, tag_list_fingerprint(queryset))
+        if not_modified is not None:
+            return not_modified
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = Tag.objects.filter(slug=kwargs["slug"])
+        not_modified = self.check_not_modified(request, tag_list_fingerprint(queryset))
+        if not_modified is not None:
+            return not_modified
+        return super().retrieve(request, *args, **kwargs)
 
     @action(detail=True, methods=["get"], url_path="posts")
+    @with_query_budget(7)
     def posts(self, request, slug=None):
-        """Получить все опубликованные посты по тегу (slug)."""
+        """Получить опубликованные посты по тегу (slug).
+
+        Ответ постраничный, как у списка постов: page-number по умолчанию,
+        keyset-режим по ?pagination=cursor. Посты отдаются карточками
+        (PostListSerializer), теги подгружаются одним запросом, поэтому
+        число запросов не зависит от размера тега.
+        """
         tag = self.get_object()
-        posts = tag.posts.filter(is_published=True).order_by("-first_published_at")
-        serializer = PostSerializer(posts, many=True, context={"request": request})
-        return Response(serializer.data)
+        posts = Post.objects.filter(is_published=True, tags=tag).order_by(
+            "-first_published_at", "-id"
+        )
+        not_modified = self.check_not_modified(request, post_list_fingerprint(posts))
+        if not_modified is not None:
+            return not_modified
+        posts = posts.only(*PostListSerializer.LIST_ONLY_FIELDS).prefetch_related(
+            "tags"
+        )
+        paginator = PostPagination()
+        page = paginator.paginate_queryset(posts, request, view=self)
+        serializer = PostListSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class RatingViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
@@ -156,11 +423,46 @@ class RatingViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     queryset = Rating.objects.all()
     serializer_class = RatingSerializer
     permission_classes = [permissions.AllowAny]
+    # Оценки анонимны: без JWT-аутентификации троттлинг отсекает флуд до
+    # первого запроса к базе (см. blog.throttling)
+    authentication_classes = []
+    throttle_classes = [RatingTokenBucketThrottle]
+
+    def create(self, request, *args, **kwargs):
+        """Новая оценка — 201, смена оценки тем же user_hash — 200.
+
+        В буферизованном режиме (RATING_BUFFER_ENABLED) проверенная оценка
+        ставится в очередь процесса и ответ — 202 без id: запись в базу
+        произойдёт при ближайшем сбросе буфера (см. blog.rating_buffer).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if rating_buffer.is_enabled():
+            data = serializer.validated_data
+            rating_buffer.get_buffer().add(
+                data["post"].pk, data["user_hash"], data["score"]
+            )
+            return Response(
+                {
+                    "post": data["post"].pk,
+                    "score": data["score"],
+                    "user_hash": data["user_hash"],
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+        serializer.save()
+        return Response(
+            serializer.data,
+            status=(
+                status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK
+            ),
+        )
 
 
-class ShortLinkViewSet(viewsets.ReadOnlyModelViewSet):
+class ShortLinkViewSet(ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
     """API для коротких ссылок."""
 
+    response_cache_tags = [SHORTLINKS_TAG]
     queryset = ShortLink.objects.all().order_by("id")
     serializer_class = ShortLinkSerializer
     permission_classes = [permissions.AllowAny]
@@ -169,96 +471,100 @@ class ShortLinkViewSet(viewsets.ReadOnlyModelViewSet):
 # --- API Архива --- #
 
 
-class ArchiveYearSummaryView(APIView):
+class ArchiveYearSummaryView(ResponseCacheMixin, APIView):
     """Возвращает сводку по годам: год и количество постов."""
 
     permission_classes = [permissions.AllowAny]  # Архив доступен всем
+    response_cache_tags = [ARCHIVE_TAG]
+    query_budget = 2
 
     def get(self, request, *args, **kwargs):
-        # Группируем опубликованные посты по году, считаем количество
+        # Сводки читаются из календаря ArchiveBucket, а не агрегируются по постам
         summary = (
-            Post.objects.filter(is_published=True)
-            .annotate(year=TruncYear("first_published_at"))
-            .values("year")
-            .annotate(posts_count=Count("id"))
-            .values("year", "posts_count")
-            .order_by("-year")  # Сортируем по убыванию года
+            ArchiveBucket.objects.values("year")
+            .annotate(posts_count=Sum("count"))
+            .order_by("-year")
         )
-        # Преобразуем год из datetime в integer
-        for item in summary:
-            if item["year"]:  # Проверка, что год не None
-                item["year"] = item["year"].year
-            else:
-                # Обработка случая, если first_published_at = None
-                item["year"] = 0
-                item["posts_count"] = 0
-        # Убираем записи с None/0 годом, если они появились
-        summary = [item for item in summary if item["year"] != 0]
-
         serializer = YearArchiveSerializer(summary, many=True)
         return Response(serializer.data)
 
 
-class ArchiveMonthSummaryView(APIView):
+class ArchiveMonthSummaryView(ResponseCacheMixin, APIView):
     """Возвращает сводку по месяцам для указанного года."""
 
     permission_classes = [permissions.AllowAny]
+    response_cache_tags = [ARCHIVE_TAG]
+    query_budget = 2
 
     def get(self, request, year, *args, **kwargs):
         summary = (
-            Post.objects.filter(is_published=True, first_published_at__year=year)
-            .annotate(month=TruncMonth("first_published_at"))
+            ArchiveBucket.objects.filter(year=year)
             .values("month")
-            .annotate(posts_count=Count("id"))
-            .values("month", "posts_count")
+            .annotate(posts_count=Sum("count"))
             .order_by("month")
         )
-        for item in summary:
-            if item["month"]:
-                item["month"] = item["month"].month
-            else:
-                item["month"] = 0
-                item["posts_count"] = 0
-        summary = [item for item in summary if item["month"] != 0]
         serializer = MonthArchiveSerializer(summary, many=True)
         return Response(serializer.data)
 
 
-class ArchiveDaySummaryView(APIView):
+class ArchiveDaySummaryView(ResponseCacheMixin, APIView):
     """Возвращает сводку по дням для указанного года и месяца."""
 
     permission_classes = [permissions.AllowAny]
+    response_cache_tags = [ARCHIVE_TAG]
+    query_budget = 2
 
     def get(self, request, year, month, *args, **kwargs):
         summary = (
-            Post.objects.filter(
-                is_published=True,
-                first_published_at__year=year,
-                first_published_at__month=month,
-            )
-            .annotate(day=TruncDay("first_published_at"))
-            .values("day")
-            .annotate(posts_count=Count("id"))
+            ArchiveBucket.objects.filter(year=year, month=month)
+            .annotate(posts_count=F("count"))
             .values("day", "posts_count")
             .order_by("day")
         )
-        for item in summary:
-            if item["day"]:
-                item["day"] = item["day"].day
-            else:
-                item["day"] = 0
-                item["posts_count"] = 0
-        summary = [item for item in summary if item["day"] != 0]
         serializer = DayArchiveSerializer(summary, many=True)
         return Response(serializer.data)
 
 
-class ArchiveDayPostsView(ListAPIView):
+class ArchiveTreeView(ResponseCacheMixin, APIView):
+    """
+    Всё дерево архива год → месяц → день с количеством постов.
+
+    Строится одним запросом к календарю ArchiveBucket и кэшируется целиком
+    под тегом архива, который сбрасывается при публикации, снятии с
+    публикации, смене даты и удалении поста.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    response_cache_tags = [ARCHIVE_TAG]
+    query_budget = 2
+
+    def get(self, request, *args, **kwargs):
+        tree = []
+        rows = ArchiveBucket.objects.order_by("-year", "month", "day").values_list(
+            "year", "month", "day", "count"
+        )
+        for year, month, day, count in rows:
+            if not tree or tree[-1]["year"] != year:
+                tree.append({"year": year, "posts_count": 0, "months": []})
+            year_node = tree[-1]
+            months = year_node["months"]
+            if not months or months[-1]["month"] != month:
+                months.append({"month": month, "posts_count": 0, "days": []})
+            months[-1]["days"].append({"day": day, "posts_count": count})
+            months[-1]["posts_count"] += count
+            year_node["posts_count"] += count
+        serializer = YearArchiveTreeSerializer(tree, many=True)
+        return Response(serializer.data)
+
+
+class ArchiveDayPostsView(ResponseCacheMixin, ListAPIView):
     """Возвращает пагинированный список постов за указанный день."""
 
-    serializer_class = PostSerializer
+    serializer_class = PostListSerializer
     permission_classes = [permissions.AllowAny]
-    # Пагинация будет использоваться из глобальных настроек REST_FRAMEWORK
+    pagination_class = PostPagination
+    response_cache_tags = [POSTS_TAG]
+    query_budget = 4
 
     def get_queryset(self):
         year = self.kwargs.get("year")
@@ -272,33 +578,19 @@ class ArchiveDayPostsView(ListAPIView):
             return Post.objects.none()
 
         try:
-            target_date = datetime.date(year, month, day)
-            logger.info(
-                f"[Archive Log] Attempting to fetch posts for date: {target_date}"
-            )
-
-            queryset = Post.objects.filter(
-                is_published=True, first_published_at__date=target_date
-            ).order_by("-first_published_at")
-
-            logger.info(
-                f"[Archive Log] Found {queryset.count()} posts for date {target_date} before pagination."
-            )
-
-            return queryset
+            # Диапазон [начало дня, начало следующего дня) по Москве — через индекс
+            queryset = Post.objects.published_in(year, month, day)
         except ValueError:
             logger.warning(
                 f"[Archive Log] ValueError: Invalid date components: year={year}, month={month}, day={day}"
             )
             return Post.objects.none()
-        except Exception as e:
-            # import traceback # traceback можно убрать, если логгируем исключение полностью
-            logger.error(
-                f"[Archive Log] Unexpected error in get_queryset for {year}-{month}-{day}: {type(e).__name__} - {str(e)}",
-                exc_info=True,
-            )
-            # traceback.print_exc() # Заменено на exc_info=True в логгере
-            raise
+
+        return (
+            queryset.only(*PostListSerializer.LIST_ONLY_FIELDS)
+            .prefetch_related("tags")
+            .order_by("-first_published_at")
+        )
 
 
 # Наш view-обертка, который теперь будет выполнять конвертацию
@@ -519,12 +811,69 @@ class ImageUploadView(APIView):
             )
 
 
-class ShortLinkRedirectView(View):
+class ShortLinkRedirectView(ResponseCacheMixin, View):
     """Редирект по короткой ссылке на пост."""
 
+    response_cache_tags = [SHORTLINKS_TAG]
+
     def get(self, request, code):
         try:
             shortlink = ShortLink.objects.get(code=code)
             return HttpResponseRedirect(shortlink.get_redirect_url())
         except ShortLink.DoesNotExist:
             raise Http404("Короткая ссылка не найдена")
+
+
+class PostSitemapView(View):
+    """
+    Данные для sitemap.xml: slug, updated_at, priority и changefreq постов.
+
+    Ответ — JSON-массив, который отдаётся потоком: строки читаются
+    серверным курсором пачками по chunk_size и сразу пишутся в ответ,
+    поэтому память не растёт с числом постов. Заменяет тяжёлый
+    /posts/?for_sitemap=true с полной сериализацией.
+    """
+
+    chunk_size = 2000
+    fields = ("slug", "updated_at", "sitemap_priority", "sitemap_changefreq")
+
+    def get_queryset(self):
+        return Post.objects.filter(is_published=True, sitemap_include=True)
+
+    def get(self, request):
+        queryset = self.get_queryset()
+        validators = build_validators(request, sitemap_fingerprint(queryset))
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        response = StreamingHttpResponse(
+            self.stream(queryset), content_type="application/json"
+        )
+        return set_validators(response, validators)
+
+    def stream(self, queryset):
+        rows = (
+            queryset.order_by("-first_published_at", "-id")
+            .values_list(*self.fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        yield "["
+        separator = ""
+        batch = []
+        for slug, updated_at, priority, changefreq in rows:
+            item = {
+                "slug": slug,
+                "updated_at": updated_at.isoformat(),
+                "priority": float(priority),
+                "changefreq": changefreq,
+            }
+            batch.append(json.dumps(item, ensure_ascii=False))
+            # Пишем в ответ пачками, чтобы не дробить поток на мелкие куски
+            if len(batch) >= self.chunk_size:
+                yield separator + ",".join(batch)
+                separator = ","
+                batch = []
+        if batch:
+            yield separator + ",".join(batch)
+        yield "]"
@@ -78,6 +78,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "blog.query_budget.QueryBudgetMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -115,6 +116,43 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# По умолчанию — локальная память процесса; для нескольких воркеров
+# задайте DJANGO_CACHE_URL, например redis://redis:6379/1
+
+CACHES = {"default": env.cache("DJANGO_CACHE_URL", default="locmemcache://")}
+
+# Страховочный TTL кэша ответов API (актуальность обеспечивают сигналы)
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", default=300)
+
+# Сколько похожих постов хранится для каждого поста (см. blog.RelatedPost)
+RELATED_POSTS_LIMIT = env.int("RELATED_POSTS_LIMIT", default=6)
+
+# Бюджет SQL-запросов представлений (blog.query_budget): off | log | raise.
+# По умолчанию превышения пишутся в лог при DEBUG и не проверяются в продакшене
+QUERY_BUDGET_MODE = env.str("QUERY_BUDGET_MODE", default="log" if DEBUG else "off")
+
+# Буферизованный приём оценок (blog.rating_buffer): оценки пишутся в базу
+# пачками не позже чем через RATING_BUFFER_FLUSH_INTERVAL_MS после приёма
+RATING_BUFFER_ENABLED = env.bool("RATING_BUFFER_ENABLED", default=False)
+RATING_BUFFER_FLUSH_INTERVAL_MS = env.int(
+    "RATING_BUFFER_FLUSH_INTERVAL_MS", default=500
+)
+RATING_BUFFER_MAX_ITEMS = env.int("RATING_BUFFER_MAX_ITEMS", default=200)
+
+# Рейтинг «лучших» постов (blog.PostRanking): байесовская средняя с
+# TOP_RATED_PRIOR_WEIGHT «виртуальными» голосами со средним TOP_RATED_PRIOR_MEAN
+TOP_RATED_PRIOR_MEAN = env.float("TOP_RATED_PRIOR_MEAN", default=3.0)
+TOP_RATED_PRIOR_WEIGHT = env.int("TOP_RATED_PRIOR_WEIGHT", default=5)
+TOP_RATED_MIN_VOTES = env.int("TOP_RATED_MIN_VOTES", default=1)
+
+# Token bucket для анонимных оценок (blog.throttling): "N/период" — ведро на
+# N запросов, пополняемое N токенами за период; пустая строка — без лимита
+RATING_THROTTLE_IP_RATE = env.str("RATING_THROTTLE_IP_RATE", default="30/min")
+RATING_THROTTLE_USER_RATE = env.str("RATING_THROTTLE_USER_RATE", default="10/min")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -18,4 +18,16 @@ DATABASES = {
     }
 }
 
+# Кэш между тестами не переживает откат транзакций, поэтому по умолчанию
+# он отключён; тесты кэша включают LocMemCache через фикстуру settings
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+# Вёдра ограничения оценок при DummyCache живут в памяти процесса и копились
+# бы между тестами; тесты троттлинга задают лимиты через фикстуру settings
+RATING_THROTTLE_IP_RATE = None
+RATING_THROTTLE_USER_RATE = None
+
+# Превышение бюджета SQL-запросов представлением роняет тест
+QUERY_BUDGET_MODE = "raise"
+
 del base_settings
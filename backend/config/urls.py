@@ -18,6 +18,7 @@ Including another URLconf
 import logging
 
 from blog.models import ShortLink
+from blog.response_cache import SHORTLINKS_TAG, cache_response
 from blog.views import custom_ckeditor_upload_file_view
 from django.conf import settings
 from django.conf.urls.static import static
@@ -79,6 +80,7 @@ urlpatterns = [
 ]
 
 
+@cache_response([SHORTLINKS_TAG])
 def shortlink_redirect(request, code: str):
     """Редирект с короткой ссылки на пост."""
     frontend_base_url = getattr(settings, "FRONTEND_URL", "http://localhost:3000")
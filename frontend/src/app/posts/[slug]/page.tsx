@@ -1,12 +1,13 @@
 import React from "react";
 import type { Post, Tag } from "@/types/blog";
 import Image from "next/image";
-import { fetchPost } from "@/services/api";
+import { fetchPost, fetchRelatedPosts } from "@/services/api";
 import { getAbsoluteImageUrl } from "@/lib/media";
 
 import PostRating from "@/components/post-rating";
 import { notFound } from "next/navigation";
 import PostBody from "@/components/post-body";
+import PostBodyHtml from "@/components/post-body-html";
 import { format } from "date-fns";
 import { ru } from "date-fns/locale";
 import styles from "@/components/blog-post-preview/styles.module.css";
@@ -89,6 +90,8 @@ const PostPage = async ({
   }
   if (!post || error) return notFound();
 
+  const relatedPosts = await fetchRelatedPosts(params.slug);
+
   // ОТЛАДКА: логируем тело поста
 
   // Формат даты: 2 мая 2025 года
@@ -178,9 +181,36 @@ const PostPage = async ({
               letterSpacing: "0.02em",
             }}
           >
-            <PostBody content={post.body as any} />
+            {typeof post.body_html === "string" ? (
+              <PostBodyHtml html={post.body_html} />
+            ) : (
+              <PostBody content={post.body as any} />
+            )}
           </div>
         </div>
+
+        {relatedPosts.length > 0 && (
+          <aside className="w-full max-w-[800px] px-4 md:px-0 mt-12">
+            <h2
+              className="font-lora text-[#222] text-2xl font-bold mb-4"
+              style={{ fontFamily: "'Lora', serif" }}
+            >
+              Похожие посты
+            </h2>
+            <ul className="flex flex-col gap-2">
+              {relatedPosts.map((related) => (
+                <li key={related.id}>
+                  <a
+                    href={`/posts/${related.slug}`}
+                    className={`${styles.hoverCloneEffect} no-underline text-[#888] hover:text-accentDark transition-colors duration-200`}
+                  >
+                    {related.title}
+                  </a>
+                </li>
+              ))}
+            </ul>
+          </aside>
+        )}
       </article>
     </section>
   );
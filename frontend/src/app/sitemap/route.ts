@@ -23,13 +23,15 @@ export async function GET(): Promise<Response> {
   });
 
   try {
-    const postsData = await fetchJson('/api/v1/posts/?page=1');
-    postsData.results.forEach((post: { slug: string; updated_at: string; sitemap_priority?: number; sitemap_changefreq?: string; first_published_at?: string }) => {
+    // Лёгкий потоковый эндпоинт: только slug, updated_at, priority и changefreq
+    const posts: { slug: string; updated_at: string; priority: number; changefreq: string }[] =
+      await fetchJson('/api/v1/sitemap/posts/');
+    posts.forEach((post) => {
       sitemap.push({
         url: `${BASE_URL}/posts/${post.slug}`,
-        lastModified: new Date(post.updated_at || post.first_published_at || new Date()),
-        changeFrequency: (post.sitemap_changefreq || 'weekly') as MetadataRoute.Sitemap[0]['changeFrequency'],
-        priority: post.sitemap_priority ?? 0.8,
+        lastModified: new Date(post.updated_at),
+        changeFrequency: (post.changefreq || 'weekly') as MetadataRoute.Sitemap[0]['changeFrequency'],
+        priority: post.priority ?? 0.8,
       });
     });
   } catch (e) {
@@ -8,7 +8,7 @@ import Pagination from "@/components/pagination"; // Добавляем Paginati
 // Явно указываем динамический рендеринг
 export const dynamic = 'force-dynamic';
 
-const POSTS_PER_PAGE = 10; // Это значение должно быть согласовано с API, если API делает свою пагинацию
+const POSTS_PER_PAGE = 10; // Должно совпадать с PAGE_SIZE пагинации API
 
 interface TagPageProps {
   params: { slug: string };
@@ -37,18 +37,20 @@ const TagPage = async ({ params: initialParams, searchParams: initialSearchParam
   
   let tag: Tag | null = null;
   let error = "";
-  let allPostsForTag: Post[] = []; // Будем хранить все посты для тега для ручной пагинации
+  let paginatedPosts: Post[] = [];
+  let totalPosts = 0;
 
   try {
-    // fetchPostsByTag, судя по всему, возвращает ВСЕ посты для тега, а не пагинированный список.
-    // Если это так, пагинацию нужно делать на клиенте (в данном Server Component).
-    allPostsForTag = await fetchPostsByTag(params.slug);
+    // API отдаёт посты тега постранично — загружаем только текущую страницу
+    const postsResponse = await fetchPostsByTag(params.slug, currentPage);
+    paginatedPosts = postsResponse.results;
+    totalPosts = postsResponse.count;
     
     const tagsResponse: PaginatedTagsResponse = await fetchTags(1); // Предполагаем, что fetchTags возвращает все теги или достаточное их количество для поиска текущего
     const tagsArray = tagsResponse?.results ?? [];
     tag = tagsArray.find((t) => t.slug === params.slug) || null;
 
-    if (!tag && allPostsForTag.length === 0) { // Если тег не найден и постов нет, вероятно, 404
+    if (!tag && totalPosts === 0) { // Если тег не найден и постов нет, вероятно, 404
         // Проверяем, был ли запрос к fetchPostsByTag успешным, но вернул пустой массив
         // или сам fetchPostsByTag выбросил 404 (что должно было обработаться notFound() внутри него, если бы он так делал)
         // В данном случае, если тег не найден в общем списке тегов и постов по этому слагу нет, считаем 404.
@@ -64,8 +66,6 @@ const TagPage = async ({ params: initialParams, searchParams: initialSearchParam
     // notFound(); 
   }
   
-  const totalPosts = allPostsForTag.length;
-  const paginatedPosts = allPostsForTag.slice((currentPage - 1) * POSTS_PER_PAGE, currentPage * POSTS_PER_PAGE);
   const totalPages = Math.ceil(totalPosts / POSTS_PER_PAGE);
 
   if (!tag && totalPosts > 0) {
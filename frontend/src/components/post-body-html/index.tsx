@@ -0,0 +1,86 @@
+"use client";
+
+import React, { useEffect, useRef } from "react";
+import { createRoot, Root } from "react-dom/client";
+import type { NodeViewProps } from "@tiptap/react";
+import TiptapGallery from "@/components/tiptap-gallery";
+
+/**
+ * Компонент для вывода HTML поста, заранее отрендеренного на бэкенде (body_html).
+ * В отличие от PostBody не поднимает редактор Tiptap в браузере: интерактивны
+ * только галереи — контейнеры div[data-type="gallery"] после монтирования
+ * заменяются слайдером TiptapGallery, до этого видны статичные картинки.
+ */
+
+interface PostBodyHtmlProps {
+  html: string;
+}
+
+// Относительные пути /media/ в HTML заменяем на адрес медиа-сервера Django
+const withMediaBase = (html: string, mediaUrlBase: string): string =>
+  html.replace(/(src=")\/media\//g, `$1${mediaUrlBase}`);
+
+// Атрибуты узла галереи из data-* контейнера (см. blog.tiptap._render_gallery)
+const readGalleryAttrs = (el: HTMLElement) => {
+  let images: unknown = [];
+  try {
+    images = JSON.parse(el.dataset.images || "[]");
+  } catch {
+    images = [];
+  }
+  return {
+    images: Array.isArray(images) ? images : [],
+    loop: el.dataset.loop === "true",
+    autoplay: el.dataset.autoplay === "true",
+    autoplayDelay: parseInt(el.dataset.autoplayDelay || "", 10) || 3500,
+    galleryHeight: parseInt(el.dataset.galleryHeight || "", 10) || 320,
+  };
+};
+
+// TiptapGallery — NodeView редактора; вне редактора даём ему узел только для чтения
+const readOnlyGalleryProps = (attrs: ReturnType<typeof readGalleryAttrs>) =>
+  ({
+    node: { attrs },
+    editor: { isEditable: false },
+    updateAttributes: () => undefined,
+  }) as unknown as NodeViewProps;
+
+const PostBodyHtml: React.FC<PostBodyHtmlProps> = ({ html }) => {
+  const containerRef = useRef<HTMLDivElement>(null);
+  const djangoMediaUrl =
+    process.env.NEXT_PUBLIC_DJANGO_MEDIA_URL || "http://localhost:8000/media/";
+  const mediaUrlBase = djangoMediaUrl.endsWith("/")
+    ? djangoMediaUrl
+    : `${djangoMediaUrl}/`;
+
+  useEffect(() => {
+    const container = containerRef.current;
+    if (!container) return;
+    const roots: Root[] = [];
+    container
+      .querySelectorAll<HTMLElement>('div[data-type="gallery"]')
+      .forEach((el) => {
+        const attrs = readGalleryAttrs(el);
+        if (attrs.images.length === 0) return;
+        el.replaceChildren();
+        const root = createRoot(el);
+        root.render(<TiptapGallery {...readOnlyGalleryProps(attrs)} />);
+        roots.push(root);
+      });
+    return () => {
+      // Откладываем unmount: React не даёт размонтировать корень во время рендера
+      setTimeout(() => roots.forEach((root) => root.unmount()));
+    };
+  }, [html]);
+
+  return (
+    <div
+      ref={containerRef}
+      className="tiptap ProseMirror prose prose-lg max-w-none w-full text-[#444]"
+      // HTML формируется и экранируется на бэкенде (blog.tiptap)
+      dangerouslySetInnerHTML={{ __html: withMediaBase(html, mediaUrlBase) }}
+    />
+  );
+};
+
+export default PostBodyHtml;
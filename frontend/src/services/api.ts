@@ -160,7 +160,8 @@ export async function fetchPost(slug: string): Promise<Post> {
     } as Post;
   }
   try {
-    return await fetchService<Post>(`posts/${slug}/`, {
+    // Готовый HTML вместо JSON документа: рендерить Tiptap на клиенте не нужно
+    return await fetchService<Post>(`posts/${slug}/?body_format=html`, {
       isPublic: true,
       tags: ["posts", `post-${slug}`],
       cache: "no-store",
@@ -202,24 +203,52 @@ export async function fetchTags(
 }
 
 /**
- * Получить список постов по тегу (slug).
+ * Получить страницу постов по тегу (slug).
+ * @param slug Слаг тега
+ * @param page Номер страницы (по умолчанию 1)
  */
-export async function fetchPostsByTag(slug: string): Promise<Post[]> {
+export async function fetchPostsByTag(
+  slug: string,
+  page: number = 1,
+): Promise<PaginatedPostsResponse> {
   if (USE_MOCK_DATA) {
-    return [];
+    return { count: 0, next: null, previous: null, results: [] };
   }
   try {
-    return await fetchService<Post[]>(`tags/${slug}/posts/`, {
-      isPublic: true,
-    });
+    return await fetchService<PaginatedPostsResponse>(
+      `tags/${slug}/posts/?page=${page}`,
+      {
+        isPublic: true,
+      },
+    );
   } catch (e) {
     if (USE_MOCK_DATA) {
-      return [];
+      return { count: 0, next: null, previous: null, results: [] };
     }
     throw e;
   }
 }
 
+/**
+ * Получить похожие посты (по общим тегам) для поста.
+ * Ошибка загрузки не должна ломать страницу поста — возвращаем пустой список.
+ * @param slug Слаг поста
+ */
+export async function fetchRelatedPosts(slug: string): Promise<Post[]> {
+  if (USE_MOCK_DATA) {
+    return [];
+  }
+  try {
+    return await fetchService<Post[]>(`posts/${slug}/related/`, {
+      isPublic: true,
+      tags: ["posts"],
+    });
+  } catch (e) {
+    console.error("Error fetching related posts:", e);
+    return [];
+  }
+}
+
 /**
  * Получить пост по ID (для коротких ссылок).
  */
@@ -241,18 +270,29 @@ export interface DaySummary {
   posts_count: number;
 }
 
+export interface ArchiveTreeMonth extends MonthSummary {
+  days: DaySummary[];
+}
+
+export interface ArchiveTreeYear extends YearSummary {
+  months: ArchiveTreeMonth[];
+}
+
 // --- API Функции для Архива --- //
 
 /**
- * Получить годовую сводку архива (год, кол-во постов).
+ * Получить всё дерево архива год → месяц → день одним запросом.
+ * Сводки ниже берутся из него, поэтому навигация по архиву не делает
+ * отдельный запрос на каждый уровень.
  */
-export async function fetchArchiveYearsSummary(): Promise<YearSummary[]> {
+export async function fetchArchiveTree(): Promise<ArchiveTreeYear[]> {
   if (USE_MOCK_DATA) {
     return [];
   }
   try {
-    return await fetchService<YearSummary[]>("archive/summary/", {
+    return await fetchService<ArchiveTreeYear[]>("archive/tree/", {
       isPublic: true,
+      tags: ["archive"],
     });
   } catch (e) {
     if (USE_MOCK_DATA) {
@@ -262,6 +302,14 @@ export async function fetchArchiveYearsSummary(): Promise<YearSummary[]> {
   }
 }
 
+/**
+ * Получить годовую сводку архива (год, кол-во постов).
+ */
+export async function fetchArchiveYearsSummary(): Promise<YearSummary[]> {
+  const tree = await fetchArchiveTree();
+  return tree.map(({ year, posts_count }) => ({ year, posts_count }));
+}
+
 /**
  * Получить месячную сводку архива для года (месяц, кол-во постов).
  * @param year Год
@@ -269,19 +317,12 @@ export async function fetchArchiveYearsSummary(): Promise<YearSummary[]> {
 export async function fetchArchiveMonthsSummary(
   year: number,
 ): Promise<MonthSummary[]> {
-  if (USE_MOCK_DATA) {
-    return [];
-  }
-  try {
-    return await fetchService<MonthSummary[]>(`archive/${year}/summary/`, {
-      isPublic: true,
-    });
-  } catch (e) {
-    if (USE_MOCK_DATA) {
-      return [];
-    }
-    throw e;
-  }
+  const tree = await fetchArchiveTree();
+  const yearNode = tree.find((node) => node.year === year);
+  return (yearNode?.months ?? []).map(({ month, posts_count }) => ({
+    month,
+    posts_count,
+  }));
 }
 
 /**
@@ -293,23 +334,11 @@ export async function fetchArchiveDaysSummary(
   year: number,
   month: number,
 ): Promise<DaySummary[]> {
-  const monthPadded = month.toString();
-  if (USE_MOCK_DATA) {
-    return [];
-  }
-  try {
-    return await fetchService<DaySummary[]>(
-      `archive/${year}/${monthPadded}/summary/`,
-      {
-        isPublic: true,
-      },
-    );
-  } catch (e) {
-    if (USE_MOCK_DATA) {
-      return [];
-    }
-    throw e;
-  }
+  const tree = await fetchArchiveTree();
+  const monthNode = tree
+    .find((node) => node.year === year)
+    ?.months.find((node) => node.month === month);
+  return monthNode?.days ?? [];
 }
 
 /**
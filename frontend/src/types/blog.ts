@@ -36,6 +36,8 @@ export interface Post {
   content: string;
   description?: string;
   body?: unknown;
+  /** HTML контента, отрендеренный на бэкенде (?body_format=html) */
+  body_html?: string;
   created_at: string;
   updated_at: string;
   first_published_at: string;